@@ -0,0 +1,221 @@
+"""
+This module provides the batch job mode used by `python main.py batch <input> <output>`.
+
+Rows are streamed from a CSV or JSONL operation file in fixed-size chunks. Each chunk
+is grouped by operation so every plugin runs one vectorized `execute_batch` call per
+group, and the results are written back in input order to a CSV or JSONL output file.
+With `parallel`, large float64 groups are split across the WorkerPool through a
+shared-memory block (see app.shared_batch) instead of running in-process.
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from app.lazy_import import lazy_import
+from app.command import Command
+
+np = lazy_import("numpy")
+# multiprocessing is only needed by parallel float batches.
+shared_batch = lazy_import("app.shared_batch")
+
+INPUT_FIELDS = ["operand1", "operand2", "operation"]
+OUTPUT_FIELDS = ["operand1", "operand2", "operation", "result", "error"]
+DEFAULT_CHUNK_SIZE = 10000
+PARALLEL_CHUNK_SIZE = 500_000
+
+
+def _is_jsonl(path: str) -> bool:
+    """
+    Returns True when the path should be treated as JSON Lines rather than CSV.
+    """
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+
+def read_rows(path: str):
+    """
+    Lazily yields operation rows from a CSV or JSONL file.
+
+    CSV files must have an `operand1,operand2,operation` header. JSONL files hold one
+    object per line with the same keys.
+
+    Args:
+        path (str): Source file path.
+
+    Yields:
+        dict: A row with the operand strings and the operation name.
+    """
+    with open(path, newline="", encoding="utf-8") as source:
+        if _is_jsonl(path):
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(source)
+
+
+class _RowWriter:
+    """
+    Writes result rows in CSV or JSONL format depending on the output file extension.
+    """
+
+    def __init__(self, stream, jsonl: bool):
+        self.stream = stream
+        self.jsonl = jsonl
+        if not jsonl:
+            self.writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+            self.writer.writeheader()
+
+    def write_rows(self, rows):
+        """
+        Writes a sequence of result rows.
+        """
+        if self.jsonl:
+            self.stream.writelines(json.dumps(row) + "\n" for row in rows)
+        else:
+            self.writer.writerows(rows)
+
+
+def _execute_group(command, operands1, operands2, backend: str, parallel: bool = False):
+    """
+    Runs one operation over a group of operand pairs with a single `execute_batch` call.
+
+    Parallel float groups go through the shared-memory transport instead.
+
+    Masked (failed) pairs are re-run through the scalar path to recover their error
+    message, so a single bad pair such as a division by zero does not abort the group.
+    A kernel that raises an arithmetic error for the whole group falls back to the
+    per-pair loop of `Command.execute_batch`, which masks just the failing pairs.
+
+    Returns:
+        list: (result, error) tuples in the same order as the operands.
+    """
+    try:
+        if parallel and backend == "float":
+            results = shared_batch.execute_batch_shared(command, operands1, operands2)
+        else:
+            results = command.execute_batch(operands1, operands2, backend)
+    except ArithmeticError:
+        results = Command.execute_batch(command, operands1, operands2, backend)
+    mask = np.ma.getmaskarray(results)
+    outcomes = []
+    for position, value in enumerate(results.data):
+        if not mask[position]:
+            outcomes.append((value, ""))
+            continue
+        try:
+            command.execute(Decimal(operands1[position]), Decimal(operands2[position]))
+            outcomes.append((None, "Undefined result"))
+        except (ArithmeticError, ValueError) as error:
+            # Decimal signals raised by the context carry a list of conditions, not a message.
+            message = error.args[0] if error.args and isinstance(error.args[0], str) else ""
+            outcomes.append((None, message or type(error).__name__))
+    return outcomes
+
+
+def process_chunk(rows, commands, backend: str = "decimal", parallel: bool = False):
+    """
+    Processes a chunk of rows, dispatching each operation group once.
+
+    Args:
+        rows (list): Input rows as dictionaries.
+        commands (dict): Registered command objects.
+        backend (str): "decimal" for exact results, "float" for float64 results.
+        parallel (bool): Run large float groups on the WorkerPool via shared memory.
+
+    Returns:
+        list: Output rows in input order, each with a `result` and an `error` field.
+    """
+    output = []
+    groups = {}
+    parse = Decimal if backend == "decimal" else float
+
+    for position, row in enumerate(rows):
+        operand1, operand2 = str(row.get("operand1", "")), str(row.get("operand2", ""))
+        operation_key = str(row.get("operation", "")).strip()
+        result_row = {
+            "operand1": operand1, "operand2": operand2, "operation": operation_key,
+            "result": "", "error": ""
+        }
+        output.append(result_row)
+        if operation_key not in commands:
+            result_row["error"] = f"Unknown operation '{operation_key}'"
+            continue
+        try:
+            num1, num2 = parse(operand1), parse(operand2)
+        except (InvalidOperation, ValueError):
+            result_row["error"] = "Invalid number"
+            continue
+        group = groups.setdefault(operation_key, ([], [], []))
+        group[0].append(position)
+        group[1].append(num1)
+        group[2].append(num2)
+
+    for operation_key, (positions, operands1, operands2) in groups.items():
+        outcomes = _execute_group(commands[operation_key], operands1, operands2, backend, parallel)
+        for position, (result, error) in zip(positions, outcomes):
+            output[position]["result"] = "" if result is None else str(result)
+            output[position]["error"] = error
+
+    return output
+
+
+def run_batch(input_path: str, output_path: str, commands,
+              chunk_size: int = None, backend: str = "decimal", parallel: bool = False) -> dict:
+    """
+    Streams an operation file through the registered plugins and writes the results.
+
+    Args:
+        input_path (str): CSV or JSONL file with operand1, operand2 and operation columns.
+        output_path (str): CSV or JSONL file receiving the results in input order.
+        commands (dict): Registered command objects.
+        chunk_size (int): Number of rows held in memory at a time. Defaults to
+            DEFAULT_CHUNK_SIZE, or PARALLEL_CHUNK_SIZE for parallel runs.
+        backend (str): "decimal" for exact results, "float" for faster float64 results.
+        parallel (bool): Split large float64 groups across the WorkerPool.
+
+    Returns:
+        dict: Summary with the row count, error count, elapsed seconds and rows/sec.
+
+    Raises:
+        OSError: If the input cannot be read or the output cannot be written.
+        ValueError: If the output is the input file, or a JSONL line is not valid JSON.
+    """
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError("The batch output file must differ from the input file.")
+    chunk_size = chunk_size or (PARALLEL_CHUNK_SIZE if parallel else DEFAULT_CHUNK_SIZE)
+    rows_total = errors_total = 0
+    start = time.perf_counter()
+    rows = read_rows(input_path)
+    # Reading the first chunk opens the input before anything is written.
+    chunk = list(islice(rows, chunk_size))
+
+    # Results go to a temporary file that replaces the output only once the job succeeds.
+    temporary_path = f"{output_path}.tmp"
+    try:
+        with open(temporary_path, "w", newline="", encoding="utf-8") as destination:
+            writer = _RowWriter(destination, _is_jsonl(output_path))
+            while chunk:
+                results = process_chunk(chunk, commands, backend, parallel)
+                writer.write_rows(results)
+                rows_total += len(results)
+                errors_total += sum(1 for row in results if row["error"])
+                chunk = list(islice(rows, chunk_size))
+        os.replace(temporary_path, output_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": rows_total,
+        "errors": errors_total,
+        "seconds": elapsed,
+        "rows_per_sec": rows_total / elapsed if elapsed > 0 else 0.0
+    }
+    logging.info(f"Batch processed {rows_total} rows ({errors_total} errors) "
+                 f"in {elapsed:.3f}s ({summary['rows_per_sec']:.0f} rows/sec)")
+    return summary
@@ -4,10 +4,13 @@ class Calculation:
     """
     Represents a single calculation between two operands using a specified operation.
     """
-    def __init__(self, operand1: Decimal, operand2: Decimal, operation):
+    __slots__ = ("operand1", "operand2", "operation", "backend", "result")
+
+    def __init__(self, operand1: Decimal, operand2: Decimal, operation, backend: str = "decimal"):
         self.operand1 = operand1
         self.operand2 = operand2
         self.operation = operation
+        self.backend = backend
         self.result = None
 
     def operate(self) -> Decimal:
@@ -3,9 +3,16 @@ Calculations module: Manages a collection of arithmetic calculation records.
 Leverages the PandasFacade for simplified data operations.
 """
 
-import pandas as pd
+import csv
+import os
+from app.lazy_import import lazy_import
 from app.calculation import Calculation
-from app.pandas_facade import PandasFacade
+from app.pandas_facade import COLUMNS, PandasFacade
+from app.history_format import is_binary_history
+from app.history_query import parse_query
+from app.history_journal import HistoryJournal, DEFAULT_COMMIT_INTERVAL, DEFAULT_COMMIT_SIZE
+
+pd = lazy_import("pandas")
 
 class Calculations:
     """
@@ -13,6 +20,48 @@ class Calculations:
     """
 
     _history_facade = PandasFacade()
+    _journal = None
+    # Per-file record of the last save: rows written, facade edit count and file stat.
+    _save_watermarks = {}
+
+    @classmethod
+    def enable_journal(cls, path: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                       commit_size: int = DEFAULT_COMMIT_SIZE):
+        """
+        Rebuilds the history from a write-ahead journal (if it exists) and journals
+        every later change to it.
+
+        Args:
+            path (str): Journal file path.
+            commit_interval (float): Maximum seconds between fsyncs.
+            commit_size (int): Number of pending records that forces an fsync.
+        """
+        cls.disable_journal()
+        if os.path.exists(path):
+            cls._history_facade.load_columns(HistoryJournal.replay(path))
+        cls._journal = HistoryJournal(path, commit_interval, commit_size)
+
+    @classmethod
+    def disable_journal(cls):
+        """
+        Commits and closes the active journal, if any.
+        """
+        if cls._journal is not None:
+            cls._journal.close()
+            cls._journal = None
+
+    @classmethod
+    def configure_retention(cls, max_rows: int = None, max_bytes: int = None, spill_directory: str = None):
+        """
+        Bounds the history kept in memory. Older rows are spilled to disk and still
+        appear in the history, filters and saves.
+
+        Args:
+            max_rows (int): Most rows kept in memory, or None for no row limit.
+            max_bytes (int): Most estimated bytes of rows kept in memory, or None.
+            spill_directory (str): Parent directory of the spill files.
+        """
+        cls._history_facade.configure_retention(max_rows, max_bytes, spill_directory)
 
     @classmethod
     def add_calculation(cls, calculation: Calculation):
@@ -26,9 +75,12 @@ class Calculations:
             "operation": calculation.operation.operation_name,
             "operand1": calculation.operand1,
             "operand2": calculation.operand2,
-            "result": calculation.result
+            "result": calculation.result,
+            "backend": calculation.backend
         }
         cls._history_facade.add_record(record)
+        if cls._journal is not None:
+            cls._journal.append_add(record)
 
     @classmethod
     def clear_history(cls):
@@ -36,9 +88,11 @@ class Calculations:
         Removes all stored calculation records.
         """
         cls._history_facade.clear()
+        if cls._journal is not None:
+            cls._journal.append_clear()
 
     @classmethod
-    def get_all_calculations(cls) -> pd.DataFrame:
+    def get_all_calculations(cls) -> "pd.DataFrame":
         """
         Retrieves all stored calculations.
 
@@ -48,7 +102,7 @@ class Calculations:
         return cls._history_facade.dataframe
 
     @classmethod
-    def filter_by_operation(cls, operation_name: str) -> pd.DataFrame:
+    def filter_by_operation(cls, operation_name: str) -> "pd.DataFrame":
         """
         Filters calculation records by a specific operation type.
 
@@ -60,25 +114,96 @@ class Calculations:
         """
         return cls._history_facade.filter_by_operation(operation_name)
 
+    @classmethod
+    def query(cls, text: str) -> "pd.DataFrame":
+        """
+        Runs a history query such as `operation=divide and result > 100 order by result limit 10`.
+
+        Args:
+            text (str): The query.
+
+        Returns:
+            pd.DataFrame: Matching records in query order.
+
+        Raises:
+            QueryError: If the query cannot be parsed.
+        """
+        return cls._history_facade.query(parse_query(text))
+
+    @classmethod
+    def explain(cls, text: str) -> str:
+        """
+        Describes the plan of a history query.
+
+        Raises:
+            QueryError: If the query cannot be parsed.
+        """
+        return cls._history_facade.explain(parse_query(text))
+
     @classmethod
     def save_history(cls, file_path: str):
         """
         Persists the current history into a CSV file.
 
+        When the file was last written or loaded by this process with the current columns,
+        has not been modified since and no earlier row was deleted, only the rows added
+        since that save are appended. Otherwise (and always for binary `.calchist` files)
+        the file is rewritten.
+
         Args:
             file_path (str): The output file path.
         """
-        cls._history_facade.save_to_file(file_path)
+        facade = cls._history_facade
+        key = os.path.abspath(file_path)
+        watermark = cls._save_watermarks.get(key)
+        if (watermark is not None and not is_binary_history(file_path)
+                and cls._file_matches(file_path, watermark)
+                and facade.is_prefix_unchanged(watermark["rows"], watermark["removals"])):
+            facade.append_to_csv(file_path, watermark["rows"])
+        else:
+            facade.save_to_file(file_path)
+        cls._record_watermark(file_path)
+
+    @classmethod
+    def _file_matches(cls, file_path: str, watermark: dict) -> bool:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (watermark["size"], watermark["mtime_ns"])
+
+    @classmethod
+    def _has_current_header(cls, file_path: str) -> bool:
+        with open(file_path, newline="", encoding="utf-8-sig") as stream:
+            return next(csv.reader(stream), []) == COLUMNS
+
+    @classmethod
+    def _record_watermark(cls, file_path: str):
+        stat = os.stat(file_path)
+        cls._save_watermarks[os.path.abspath(file_path)] = {
+            "rows": len(cls._history_facade),
+            "removals": cls._history_facade.removal_count,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
 
     @classmethod
-    def load_history(cls, file_path: str):
+    def load_history(cls, file_path: str, progress=None):
         """
         Imports calculation records from a CSV file.
 
         Args:
             file_path (str): The source CSV file path.
+            progress: Optional callable receiving (bytes read, total bytes) during the load.
         """
-        cls._history_facade.load_from_file(file_path)
+        cls._history_facade.load_from_file(file_path, progress)
+        if is_binary_history(file_path) or cls._has_current_header(file_path):
+            cls._record_watermark(file_path)
+        else:
+            # Files from before the backend column must be rewritten, not appended to.
+            cls._save_watermarks.pop(os.path.abspath(file_path), None)
+        if cls._journal is not None:
+            cls._journal.rewrite(cls._history_facade.columns)
 
     @classmethod
     def delete_history(cls, index: int):
@@ -88,4 +213,5 @@ class Calculations:
         Args:
             index (int): The index of the record to delete.
         """
-        cls._history_facade.delete_record(index)
+        if cls._history_facade.delete_record(index) and cls._journal is not None:
+            cls._journal.append_delete(index)
@@ -4,6 +4,42 @@ Declares an abstract base class for all command operations. Each command execute
 
 from decimal import Decimal
 from abc import ABC, abstractmethod
+from app.lazy_import import lazy_import
+from app.running_stats import RunningStats
+
+np = lazy_import("numpy")
+
+BATCH_BACKENDS = ("decimal", "float")
+
+def as_batch_arrays(operands1, operands2, backend: str = "decimal"):
+    """
+    Converts two operand sequences into arrays for batch execution.
+
+    Args:
+        operands1: Sequence of first operands.
+        operands2: Sequence of second operands.
+        backend (str): "decimal" for object arrays of exact Decimals, "float" for float64 arrays.
+
+    Returns:
+        tuple: The two operand arrays.
+
+    Raises:
+        ValueError: If the backend is unknown or the sequences differ in length.
+    """
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend '{backend}'")
+    if len(operands1) != len(operands2):
+        raise ValueError("Operand sequences must have the same length.")
+    if backend == "float":
+        return np.asarray(operands1, dtype=np.float64), np.asarray(operands2, dtype=np.float64)
+    return _as_decimal_array(operands1), _as_decimal_array(operands2)
+
+def _as_decimal_array(values) -> "np.ndarray":
+    # np.fromiter avoids numpy probing every Decimal as a possible sequence.
+    return np.fromiter(
+        (value if isinstance(value, Decimal) else Decimal(str(value)) for value in values),
+        dtype=object, count=len(values)
+    )
 
 class Command(ABC):
     """
@@ -11,6 +47,14 @@ class Command(ABC):
     """
 
     operation_name: str
+    # True when the result depends only on the operands and the Decimal context,
+    # which lets ResultCache memoize it.
+    pure: bool = False
+    # True for commands that accept any number of operands through `execute_many`.
+    nary: bool = False
+    # True when a single execution is expensive enough that the calculation server
+    # should run it on the worker pool instead of its event loop.
+    cpu_heavy: bool = False
 
     @abstractmethod
     def execute(self, operand1: Decimal, operand2: Decimal) -> Decimal:
@@ -37,3 +81,70 @@ class Command(ABC):
             result_queue: A multiprocessing.Queue to capture the result.
         """
         pass
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Executes the command over many operand pairs at once.
+
+        The default implementation loops over `execute` with exact Decimal operands;
+        plugins override it with array kernels.
+
+        Args:
+            operands1: Sequence of first operands.
+            operands2: Sequence of second operands.
+            backend (str): "decimal" for exact Decimal results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: Results in operand order. Pairs whose computation raised an
+            arithmetic error (such as division by zero) are masked.
+        """
+        if backend not in BATCH_BACKENDS:
+            raise ValueError(f"Unknown batch backend '{backend}'")
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, "decimal")
+        results = np.empty(len(numbers1), dtype=object)
+        mask = np.zeros(len(numbers1), dtype=bool)
+        for position, (num1, num2) in enumerate(zip(numbers1, numbers2)):
+            try:
+                results[position] = self.execute(num1, num2)
+            except ArithmeticError:
+                mask[position] = True
+                results[position] = Decimal(0)
+        if backend == "float":
+            results = results.astype(np.float64)
+        return np.ma.masked_array(results, mask=mask)
+
+
+class StatisticCommand(Command):
+    """
+    Base class for commands that summarize any number of operands with RunningStats.
+
+    Subclasses implement `statistic`; the two-operand methods treat the operands as a
+    two-value sample, and `execute_many` accepts any iterable of numbers.
+    """
+
+    pure = True
+    nary = True
+
+    @abstractmethod
+    def statistic(self, stats: RunningStats) -> Decimal:
+        """
+        Reads this command's statistic from accumulated RunningStats.
+        """
+
+    def execute(self, operand1: Decimal, operand2: Decimal) -> Decimal:
+        return self.statistic(RunningStats.of((operand1, operand2)))
+
+    def execute_many(self, operands) -> Decimal:
+        """
+        Computes the statistic over any number of operands in a single pass.
+
+        Args:
+            operands: Iterable of numbers.
+
+        Returns:
+            Decimal: The statistic.
+        """
+        return self.statistic(RunningStats.of(operands))
+
+    def execute_multiprocessing(self, operand1: Decimal, operand2: Decimal, result_queue):
+        result_queue.put(self.execute(operand1, operand2))
@@ -0,0 +1,287 @@
+"""
+This module provides DagScheduler, which runs a workload of dependent calculations.
+
+A workload names intermediate results, one definition per line, in the expression
+language of `eval`:
+
+    # comments and blank lines are ignored
+    subtotal = add(120.50, 79.50)
+    tax = subtotal * 0.2
+    total = subtotal + tax
+    average = mean(subtotal, total)
+
+Definitions may appear in any order. Every plugin call in every definition becomes a
+task. Identical subexpressions (the same plugin over the same operands, after names
+are resolved) are deduplicated into a single task, and unary minus is lowered to a
+multiplication by -1. A task's level is one more than the highest level among its
+dependencies. Each level is one wave, and the tasks in a wave are independent. Waves
+run in order. The tasks of a wave are split into chunks across the WorkerPool, so
+they run concurrently. A chunk is a handful of plugin calls, which keeps the process
+hand-off from dominating.
+
+The run reports:
+
+- the critical path: the longest dependency chain, in tasks and in measured execution time;
+- the total work: the sum of all task execution times;
+- the achieved speedup: total work divided by wall time;
+- the ideal speedup: total work divided by the critical path time.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from app.expression import Call, ExpressionError, Negate, Number, Variable, parse
+from app.numeric_backend import NumericBackend, parse_operand
+from app.worker_pool import WorkerPool
+
+CHUNKS_PER_WORKER = 4
+
+
+def parse_workload(lines) -> OrderedDict:
+    """
+    Reads `name = expression` definitions, skipping blank lines and `#` comments.
+
+    Args:
+        lines: Iterable of workload lines.
+
+    Returns:
+        OrderedDict: Name -> parsed expression tree, in file order.
+
+    Raises:
+        ExpressionError: On a malformed line, a bad name or a name defined twice.
+    """
+    definitions = OrderedDict()
+    for number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        name, separator, source = line.partition("=")
+        name = name.strip()
+        if not separator or not name.isidentifier():
+            raise ExpressionError(f"Line {number}: expected '<name> = <expression>'")
+        if name in definitions:
+            raise ExpressionError(f"Line {number}: '{name}' is defined twice")
+        definitions[name] = parse(source)
+    return definitions
+
+
+def _variables(node) -> list:
+    """
+    Returns the names a parsed expression refers to, in order, walking it with a stack.
+    """
+    names, stack = [], [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Variable):
+            names.append(node.name)
+        elif isinstance(node, Negate):
+            stack.append(node.operand)
+        elif isinstance(node, Call):
+            stack.extend(reversed(node.arguments))
+    return names
+
+
+def _run_tasks(tasks: list) -> list:
+    """
+    Worker-side entry point: runs a chunk of independent plugin calls.
+
+    Args:
+        tasks (list): (command, operands) pairs.
+
+    Returns:
+        list: (result, execution seconds, error message or None) per task.
+    """
+    outcomes = []
+    for command, operands in tasks:
+        start = time.perf_counter()
+        try:
+            if len(operands) == 2:
+                result, error = command.execute(*operands), None
+            else:
+                result, error = command.execute_many(operands), None
+        except ArithmeticError as failure:
+            result, error = None, str(failure) or type(failure).__name__
+        outcomes.append((result, time.perf_counter() - start, error))
+    return outcomes
+
+
+class _Task:
+    """
+    One deduplicated plugin call. Operands are constants or other tasks.
+    """
+
+    __slots__ = ("command", "operands", "level", "result", "error", "seconds", "finish")
+
+    def __init__(self, command, operands: tuple, level: int):
+        self.command = command
+        self.operands = operands
+        self.level = level
+        self.result = None
+        self.error = None
+        self.seconds = 0.0
+        self.finish = 0.0
+
+
+class DagScheduler:
+    """
+    Builds the deduplicated task DAG of a workload and runs it in topological waves.
+    """
+
+    def __init__(self, definitions: OrderedDict, commands, backend: str = None):
+        """
+        Args:
+            definitions (OrderedDict): Name -> expression tree, as from `parse_workload`.
+            commands (dict): Registered command objects.
+            backend (str): Numeric backend for literals; defaults to the session backend.
+
+        Raises:
+            ExpressionError: On an unknown name or plugin, a wrong arity or a cyclic definition.
+        """
+        self.commands = commands
+        self.backend = backend or NumericBackend.current()
+        self.definitions = definitions
+        self.calls = 0
+        self._tasks = {}
+        self._outputs = {}
+        for name in self._order():
+            self._outputs[name] = self._build(definitions[name])
+        self.waves = [[] for _ in range(max((task.level for task in self._tasks.values()), default=0))]
+        for task in self._tasks.values():
+            self.waves[task.level - 1].append(task)
+
+    @classmethod
+    def from_file(cls, path: str, commands, backend: str = None) -> "DagScheduler":
+        """
+        Builds a scheduler from a workload file.
+        """
+        with open(path, encoding="utf-8") as stream:
+            return cls(parse_workload(stream), commands, backend)
+
+    def _order(self) -> list:
+        """
+        Returns the definition names with every name after the names it refers to.
+
+        The depth-first search keeps an explicit stack, so a long chain of definitions
+        written in reverse order does not hit the recursion limit.
+
+        Raises:
+            ExpressionError: On an undefined name or a cyclic definition.
+        """
+        order, finished = [], {}
+        for root in self.definitions:
+            if root in finished:
+                continue
+            finished[root] = False
+            stack = [(root, iter(_variables(self.definitions[root])))]
+            while stack:
+                name, dependencies = stack[-1]
+                dependency = next(dependencies, None)
+                if dependency is None:
+                    stack.pop()
+                    finished[name] = True
+                    order.append(name)
+                elif dependency not in self.definitions:
+                    raise ExpressionError(f"'{dependency}' is not defined")
+                elif dependency not in finished:
+                    finished[dependency] = False
+                    stack.append((dependency, iter(_variables(self.definitions[dependency]))))
+                elif not finished[dependency]:
+                    raise ExpressionError(f"'{dependency}' depends on itself")
+        return order
+
+    def _build(self, node):
+        if isinstance(node, Number):
+            return parse_operand(node.text, self.backend)
+        if isinstance(node, Variable):
+            return self._outputs[node.name]
+        if isinstance(node, Negate):
+            node = Call("multiply", (node.operand, Number("-1")))
+        self.calls += 1
+        command = self.commands.get(node.name)
+        if command is None:
+            raise ExpressionError(f"Unknown function '{node.name}'")
+        if len(node.arguments) != 2 and not getattr(command, "nary", False):
+            raise ExpressionError(f"'{node.name}' takes 2 arguments, got {len(node.arguments)}")
+        operands = tuple(self._build(argument) for argument in node.arguments)
+        # Tasks are keyed by identity, constants by type and exact text.
+        key = (node.name,) + tuple(operand if isinstance(operand, _Task)
+                                   else (type(operand).__name__, str(operand)) for operand in operands)
+        task = self._tasks.get(key)
+        if task is None:
+            level = 1 + max((operand.level for operand in operands if isinstance(operand, _Task)), default=0)
+            task = self._tasks[key] = _Task(command, operands, level)
+        return task
+
+    @property
+    def task_count(self) -> int:
+        """
+        Number of distinct plugin calls after deduplication.
+        """
+        return len(self._tasks)
+
+    def run(self, parallel: bool = True) -> dict:
+        """
+        Runs every wave in order and returns the named results with a timing report.
+
+        Args:
+            parallel (bool): Split each wave across the WorkerPool (when it has more than one
+                worker); otherwise run it in-process.
+
+        Returns:
+            dict: "results" (name -> value, or the error message of a failed call) and
+                the report figures: calls, tasks, waves, critical_path_tasks,
+                critical_path_seconds, work_seconds, wall_seconds, speedup, ideal_speedup.
+        """
+        start = time.perf_counter()
+        workers = WorkerPool.worker_count()
+        for wave in self.waves:
+            runnable = []
+            for task in wave:
+                failed = next((operand for operand in task.operands
+                               if isinstance(operand, _Task) and operand.error), None)
+                if failed is not None:
+                    task.error = failed.error
+                else:
+                    runnable.append(task)
+            work = [(task.command, tuple(operand.result if isinstance(operand, _Task) else operand
+                                         for operand in task.operands)) for task in runnable]
+            # A single worker can only add hand-off cost to an in-process run.
+            if parallel and workers > 1 and len(work) > 1:
+                size = math.ceil(len(work) / (workers * CHUNKS_PER_WORKER))
+                futures = [WorkerPool.submit(_run_tasks, work[position:position + size])
+                           for position in range(0, len(work), size)]
+                outcomes = [outcome for future in futures for outcome in future.result()]
+            else:
+                outcomes = _run_tasks(work)
+            for task, (result, seconds, error) in zip(runnable, outcomes):
+                task.result, task.seconds, task.error = result, seconds, error
+        wall = time.perf_counter() - start
+
+        for wave in self.waves:
+            for task in wave:
+                task.finish = task.seconds + max((operand.finish for operand in task.operands
+                                                  if isinstance(operand, _Task)), default=0.0)
+        work_seconds = sum(task.seconds for task in self._tasks.values())
+        critical_path = max((task.finish for task in self._tasks.values()), default=0.0)
+        report = {
+            "results": {name: self._value(output) for name, output in self._outputs.items()},
+            "calls": self.calls,
+            "tasks": self.task_count,
+            "waves": len(self.waves),
+            "critical_path_tasks": len(self.waves),
+            "critical_path_seconds": critical_path,
+            "work_seconds": work_seconds,
+            "wall_seconds": wall,
+            "speedup": work_seconds / wall if wall else 0.0,
+            "ideal_speedup": work_seconds / critical_path if critical_path else 0.0,
+        }
+        logging.info(f"DAG run: {report['tasks']} tasks ({report['calls']} calls) in {report['waves']} waves, "
+                     f"wall {wall * 1000:.3f}ms, speedup {report['speedup']:.2f}x")
+        return report
+
+    @staticmethod
+    def _value(output):
+        if not isinstance(output, _Task):
+            return output
+        return output.result if output.error is None else f"Error: {output.error}"
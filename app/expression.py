@@ -0,0 +1,486 @@
+"""
+This module provides the expression language behind the `eval` command.
+
+An expression combines numbers, variables, the four arithmetic operators and calls to
+any registered plugin:
+
+    (a + b) * mean(c, d) / 3
+
+`+`, `-`, `*` and `/` map to the add, subtract, multiply and divide plugins. A call
+such as `mean(c, d)` runs the plugin's `execute`; N-ary plugins called with any other
+number of arguments run `execute_many`. The parsed tree is compiled once into a
+Python function that calls the plugins' bound methods directly, with number literals
+parsed for the numeric backend at compile time. Expressions.compile caches compiled
+expressions by source text and backend, so evaluating a formula again (or over many
+variable bindings with `evaluate_many`) skips parsing entirely.
+
+Only the top-level result is recorded in history: the root plugin call with its two
+evaluated operands. With tracing on, every two-operand plugin call is recorded
+instead. Calls with any other number of operands have no history row shape and are
+never recorded.
+"""
+
+import keyword
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import NamedTuple
+from app.calculation import Calculation
+from app.calculations import Calculations
+from app.metrics import Metrics
+from app.numeric_backend import NumericBackend, parse_operand
+
+DEFAULT_CACHE_SIZE = 256
+TOO_DEEP = "Expression is nested too deeply"
+OPERATORS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide"}
+_TOKEN = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+                    r"|(?P<name>[A-Za-z]\w*)|(?P<symbol>[-+*/(),]))")
+
+
+class ExpressionError(ValueError):
+    """
+    Raised for expressions that cannot be parsed, compiled or bound.
+    """
+
+
+class Number(NamedTuple):
+    """
+    A number literal, kept as text until it is parsed for a backend.
+    """
+    text: str
+
+
+class Variable(NamedTuple):
+    """
+    A variable bound to a value at evaluation time.
+    """
+    name: str
+
+
+class Negate(NamedTuple):
+    """
+    Unary minus applied to an operand.
+    """
+    operand: object
+
+
+class Call(NamedTuple):
+    """
+    A plugin call; operators are calls to the add, subtract, multiply and divide plugins.
+    """
+    name: str
+    arguments: tuple
+
+
+def tokenize(source: str) -> list:
+    """
+    Splits an expression into (kind, text) tokens.
+
+    Raises:
+        ExpressionError: On a character that cannot start a token.
+    """
+    tokens, position, end = [], 0, len(source.rstrip())
+    while position < end:
+        match = _TOKEN.match(source, position)
+        if match is None:
+            raise ExpressionError(f"Unexpected character '{source[position:].lstrip()[:1]}' in expression")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser with the usual precedence: unary minus, then * /, then + -.
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple:
+        """
+        Returns the next token without consuming it, or (None, None) at the end.
+        """
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, symbol: str = None) -> tuple:
+        """
+        Consumes the next token, which must be `symbol` when one is given.
+
+        Raises:
+            ExpressionError: At the end of the expression or on a different token.
+        """
+        token = self.peek()
+        if token[0] is None or (symbol is not None and token != ("symbol", symbol)):
+            found = f"'{token[1]}'" if token[1] else "end of expression"
+            raise ExpressionError(f"Expected '{symbol or 'a value'}' but found {found}")
+        self.position += 1
+        return token
+
+    def expression(self):
+        """
+        Parses a sum or difference of terms.
+        """
+        node = self.term()
+        while self.peek() in (("symbol", "+"), ("symbol", "-")):
+            node = Call(OPERATORS[self.take()[1]], (node, self.term()))
+        return node
+
+    def term(self):
+        """
+        Parses a product or quotient of unary operands.
+        """
+        node = self.unary()
+        while self.peek() in (("symbol", "*"), ("symbol", "/")):
+            node = Call(OPERATORS[self.take()[1]], (node, self.unary()))
+        return node
+
+    def unary(self):
+        """
+        Parses an operand with any leading signs.
+        """
+        if self.peek() == ("symbol", "-"):
+            self.take()
+            return Negate(self.unary())
+        if self.peek() == ("symbol", "+"):
+            self.take()
+            return self.unary()
+        return self.primary()
+
+    def primary(self):
+        """
+        Parses a number, a variable, a call or a parenthesized expression.
+        """
+        kind, text = self.take()
+        if kind == "number":
+            return Number(text)
+        if kind == "name":
+            if self.peek() != ("symbol", "("):
+                return Variable(text)
+            self.take("(")
+            arguments = []
+            if self.peek() != ("symbol", ")"):
+                arguments.append(self.expression())
+                while self.peek() == ("symbol", ","):
+                    self.take()
+                    arguments.append(self.expression())
+            self.take(")")
+            return Call(text, tuple(arguments))
+        if text == "(":
+            node = self.expression()
+            self.take(")")
+            return node
+        raise ExpressionError(f"Unexpected '{text}' in expression")
+
+
+def parse(source: str):
+    """
+    Parses an expression into a tree of Number, Variable, Negate and Call nodes.
+
+    Raises:
+        ExpressionError: If the expression is empty, malformed or nested too deeply.
+    """
+    parser = _Parser(tokenize(source))
+    try:
+        node = parser.expression()
+    except RecursionError:
+        raise ExpressionError(TOO_DEEP) from None
+    if parser.peek()[0] is not None:
+        raise ExpressionError(f"Unexpected '{parser.peek()[1]}' after the expression")
+    return node
+
+
+class _CodeGenerator:
+    """
+    Turns a parsed tree into the source of a Python function over the expression's variables.
+    """
+
+    def __init__(self, commands, backend: str, trace: bool):
+        self.commands = commands
+        self.backend = backend
+        self.trace = trace
+        self.namespace = {}
+        self.variables = []
+
+    def constant(self, value) -> str:
+        """
+        Stores a value in the function's namespace and returns the name it is stored under.
+        """
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def function(self, node: Call):
+        """
+        Returns the namespace name of the callable that runs a Call node.
+
+        Raises:
+            ExpressionError: For an unknown plugin or the wrong number of arguments.
+        """
+        command = self.commands.get(node.name)
+        if command is None:
+            raise ExpressionError(f"Unknown function '{node.name}'")
+        if len(node.arguments) == 2:
+            if self.trace:
+                return self.constant(_traced(command, self.backend))
+            return self.constant(command.execute)
+        if not getattr(command, "nary", False):
+            raise ExpressionError(f"'{node.name}' takes 2 arguments, got {len(node.arguments)}")
+        return self.constant(lambda *operands: command.execute_many(operands))
+
+    def emit(self, node) -> str:
+        """
+        Returns the Python source of a node, collecting its variables.
+        """
+        if isinstance(node, Number):
+            return self.constant(parse_operand(node.text, self.backend))
+        if isinstance(node, Variable):
+            if keyword.iskeyword(node.name):
+                raise ExpressionError(f"'{node.name}' cannot be used as a variable name")
+            if node.name not in self.variables:
+                self.variables.append(node.name)
+            return node.name
+        if isinstance(node, Negate):
+            return f"(-{self.emit(node.operand)})"
+        function = self.function(node)
+        arguments = [self.emit(argument) for argument in node.arguments]
+        if self.trace and len(arguments) == 2:
+            arguments.insert(0, "_record")
+        return f"{function}({', '.join(arguments)})"
+
+    def build(self, body: str):
+        """
+        Compiles the function returning `body` and returns it.
+        """
+        # Variable names cannot start with an underscore, so `_record` never collides.
+        parameters = (["_record"] if self.trace else []) + self.variables
+        source = f"def _expression({', '.join(parameters)}):\n    return {body}\n"
+        exec(compile(source, "<expression>", "exec"), self.namespace)  # pylint: disable=exec-used
+        return self.namespace["_expression"]
+
+
+def _traced(command, backend: str):
+    """
+    Wraps a plugin's execute so that each call is appended to the caller's `record` list.
+    """
+    def execute(record, operand1, operand2):
+        calculation = Calculation(operand1, operand2, command, backend)
+        calculation.result = command.execute(operand1, operand2)
+        record.append(calculation)
+        return calculation.result
+    return execute
+
+
+def _compile(node, commands, backend: str, trace: bool = False, root_operands: bool = False):
+    """
+    Compiles a tree into (function, variable names).
+
+    With `root_operands`, the function returns the evaluated operands of the root call
+    instead of its result, so the caller can run and record the root call itself. With
+    `trace`, it takes a list as its first argument and appends every two-operand call to it.
+
+    Raises:
+        ExpressionError: If the tree calls an unknown plugin or is nested too deeply.
+    """
+    generator = _CodeGenerator(commands, backend, trace)
+    try:
+        if root_operands:
+            body = f"({', '.join(generator.emit(argument) for argument in node.arguments)},)"
+        else:
+            body = generator.emit(node)
+        return generator.build(body), generator.variables
+    except (RecursionError, SyntaxError):
+        # Python's compiler also caps nesting (at about 200 parentheses).
+        raise ExpressionError(TOO_DEEP) from None
+
+
+class CompiledExpression:
+    """
+    An expression compiled for one plugin registry and numeric backend.
+    """
+
+    def __init__(self, source: str, commands, backend: str):
+        """
+        Args:
+            source (str): Expression text.
+            commands (dict): Registered command objects.
+            backend (str): Numeric backend for literals and history rows.
+
+        Raises:
+            ExpressionError: If the expression is malformed or calls an unknown plugin.
+        """
+        self.source = source
+        self.commands = commands
+        self.backend = backend
+        self.tree = parse(source)
+        self._function, self.variables = _compile(self.tree, commands, backend)
+        self._traced = None
+        self._root = None
+        if isinstance(self.tree, Call) and len(self.tree.arguments) == 2:
+            operands, _ = _compile(self.tree, commands, backend, root_operands=True)
+            self._root = (commands.get(self.tree.name), operands)
+
+    def _arguments(self, bindings: dict) -> list:
+        """
+        Returns the bound values in variable order.
+
+        Raises:
+            ExpressionError: If a variable has no value.
+        """
+        missing = [name for name in self.variables if name not in bindings]
+        if missing:
+            raise ExpressionError(f"No value bound for: {', '.join(missing)}")
+        return [bindings[name] for name in self.variables]
+
+    def evaluate(self, bindings: dict = None, record: bool = False):
+        """
+        Evaluates the expression for one set of variable values.
+
+        Args:
+            bindings (dict): Variable name -> number of the expression's backend.
+            record (bool): Record the top-level result in history (every two-operand
+                call instead, while tracing is on).
+
+        Returns:
+            The result, in the backend's number type.
+        """
+        arguments = self._arguments(bindings or {})
+        with Metrics.stage("execute", "eval"):
+            if not record:
+                return self._function(*arguments)
+            result, calculations = self._run(arguments)
+        for calculation in calculations:
+            Calculations.add_calculation(calculation)
+        return result
+
+    def _run(self, arguments) -> tuple:
+        """
+        Evaluates one binding for recording, without touching history yet.
+
+        Returns:
+            tuple: (result, calculations to record).
+        """
+        if Expressions.is_tracing():
+            if self._traced is None:
+                self._traced, _ = _compile(self.tree, self.commands, self.backend, trace=True)
+            calculations = []
+            return self._traced(calculations, *arguments), calculations
+        if self._root is None:
+            return self._function(*arguments), []
+        command, operands = self._root
+        calculation = Calculation(*operands(*arguments), command, self.backend)
+        calculation.result = command.execute(calculation.operand1, calculation.operand2)
+        return calculation.result, [calculation]
+
+    def evaluate_many(self, columns: dict, record: bool = False) -> list:
+        """
+        Evaluates the expression over many bindings given as equal-length value columns.
+
+        Args:
+            columns (dict): Variable name -> sequence of numbers.
+            record (bool): Record each top-level result in history, as `evaluate` does.
+                Nothing is recorded unless every binding evaluates successfully.
+
+        Returns:
+            list: One result per binding, in order.
+        """
+        arguments = self._arguments(columns)
+        if len(set(map(len, arguments))) > 1:
+            raise ExpressionError("Every variable needs the same number of values")
+        if record:
+            with Metrics.stage("execute", "eval"):
+                outcomes = [self._run(values) for values in (zip(*arguments) if arguments else [()])]
+            for _, calculations in outcomes:
+                for calculation in calculations:
+                    Calculations.add_calculation(calculation)
+            return [result for result, _ in outcomes]
+        if not arguments:
+            return [self._function()]
+        with Metrics.stage("execute", "eval"):
+            return list(map(self._function, *arguments))
+
+
+class Expressions:
+    """
+    Application-wide LRU cache of compiled expressions, plus the tracing switch.
+    """
+
+    _entries = OrderedDict()
+    _max_size = None
+    _tracing = False
+    _stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def configure(cls, max_size: int = None):
+        """
+        Sets the cache capacity (default EXPRESSION_CACHE_SIZE, then 256) and empties the cache.
+        """
+        cls._max_size = max_size
+        cls.clear()
+
+    @classmethod
+    def max_size(cls) -> int:
+        """
+        Returns the configured capacity.
+        """
+        if cls._max_size is not None:
+            return cls._max_size
+        return int(os.getenv("EXPRESSION_CACHE_SIZE", str(DEFAULT_CACHE_SIZE)))
+
+    @classmethod
+    def compile(cls, source: str, commands, backend: str = None) -> CompiledExpression:
+        """
+        Returns the compiled expression for `source`, compiling it on a cache miss.
+
+        Args:
+            source (str): Expression text.
+            commands (dict): Registered command objects.
+            backend (str): Numeric backend; defaults to the session backend.
+        """
+        backend = backend or NumericBackend.current()
+        key = (" ".join(source.split()), backend)
+        compiled = cls._entries.get(key)
+        if compiled is not None and compiled.commands is commands:
+            cls._entries.move_to_end(key)
+            cls._stats["hits"] += 1
+            return compiled
+        cls._stats["misses"] += 1
+        with Metrics.stage("parse", "eval"):
+            compiled = CompiledExpression(key[0], commands, backend)
+        logging.info(f"Compiled expression '{key[0]}' for the {backend} backend")
+        if cls.max_size() > 0:
+            cls._entries[key] = compiled
+            while len(cls._entries) > cls.max_size():
+                cls._entries.popitem(last=False)
+        return compiled
+
+    @classmethod
+    def enable_tracing(cls, enabled: bool = True):
+        """
+        Records every two-operand plugin call of recorded evaluations, not just the top level.
+        """
+        cls._tracing = enabled
+
+    @classmethod
+    def is_tracing(cls) -> bool:
+        """
+        Returns True while tracing is on (enable_tracing, or EXPRESSION_TRACE=1).
+        """
+        return cls._tracing or os.getenv("EXPRESSION_TRACE", "").lower() in ("1", "true", "yes")
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns the cache size and hit/miss counts.
+        """
+        return {"size": len(cls._entries), **cls._stats}
+
+    @classmethod
+    def clear(cls):
+        """
+        Empties the cache and resets its counters.
+        """
+        cls._entries = OrderedDict()
+        cls._stats = {"hits": 0, "misses": 0}
@@ -0,0 +1,351 @@
+"""
+This module provides HistoryColumns, the typed in-memory row store behind PandasFacade.
+
+Rows are kept in compact arrays instead of lists of Python objects:
+
+    operation   array('H') of codes into `operations` (a categorical column)
+    backend     array('B') of codes into `backends`
+    operand1    array('q') fixed-point value * 10**SCALE
+    operand2    array('q')
+    result      array('q')
+
+A Decimal is stored in fixed point when its text has no exponent, at most SCALE
+decimal places and no trailing fractional zeros, and it fits well inside the int64
+range. Such a value decodes back to an equal Decimal with the same text. Any other
+value holds the OVERFLOW sentinel, and the value itself is kept in a per-column
+overflow list next to a sorted array of the rows that use it. This covers repeating
+quotients, floats, fractions, NaN and very large values. A fixed-point row takes 27
+bytes, against about 350 bytes for three Decimal objects in lists.
+"""
+
+import array
+import sys
+from bisect import bisect_left
+from decimal import Context, Decimal
+from app.lazy_import import lazy_import
+from app.history_format import OVERFLOW, HistorySegment, write_encoded
+from app.numeric_backend import DEFAULT_BACKEND, NUMERIC_COLUMNS
+
+np = lazy_import("numpy")
+
+SCALE = 6
+ROW_BYTES = 2 + 1 + 8 * len(NUMERIC_COLUMNS)
+_UNIT = Decimal(10 ** SCALE)
+_LIMIT = 10 ** 18
+_POWERS = [10 ** (SCALE - places) for places in range(SCALE + 1)]
+# Column -> (array typecode, numpy dtype, largest code).
+_CODE_TYPES = {"operation": ("H", "<u2", 65535), "backend": ("B", "u1", 255)}
+# Exact for every fixed-point value, whatever precision the session context uses.
+_CONTEXT = Context(prec=40)
+_COLUMN_ORDER = ("operation",) + NUMERIC_COLUMNS + ("backend",)
+# Text -> encoded value. Histories repeat values heavily, and parsing the text is
+# most of the cost of an append.
+_ENCODED = {}
+_ENCODED_LIMIT = 2 ** 16
+_MISSING = object()
+
+
+def encode_fixed(value):
+    """
+    Returns a Decimal as a fixed-point integer, or None when it would not round-trip exactly.
+    """
+    if not isinstance(value, Decimal):
+        return None
+    text = str(value)
+    scaled = _ENCODED.get(text, _MISSING)
+    if scaled is _MISSING:
+        if len(_ENCODED) >= _ENCODED_LIMIT:
+            _ENCODED.clear()
+        scaled = _ENCODED[text] = _parse_fixed(text)
+    return scaled
+
+
+def _parse_fixed(text: str):
+    whole, _, fraction = text.partition(".")
+    if len(fraction) > SCALE or fraction.endswith("0") or text == "-0":
+        return None
+    try:
+        scaled = int(whole + fraction) * _POWERS[len(fraction)]
+    except ValueError:  # exponent notation, NaN or Infinity
+        return None
+    return scaled if -_LIMIT < scaled < _LIMIT else None
+
+
+def _encode_column(values: list) -> list:
+    """
+    Encodes a whole column, converting each distinct object only once.
+
+    Loaders hand over columns in which repeated values are the same object, so
+    deduplicating by identity skips most of the conversions.
+    """
+    identities = list(map(id, values))
+    encoded = dict(zip(identities, values))
+    for identity, value in encoded.items():
+        encoded[identity] = encode_fixed(value)
+    return list(map(encoded.__getitem__, identities))
+
+
+def decode_fixed(scaled: int) -> Decimal:
+    """
+    Converts a fixed-point integer back to the Decimal it was encoded from.
+
+    An exact division keeps the smallest exponent that represents the quotient, which
+    is the exponent of the encoded text (2500000 -> 2.5, 10000000 -> 10).
+    """
+    return _CONTEXT.divide(Decimal(scaled), _UNIT)
+
+
+class HistoryColumns:
+    """
+    Append-optimized typed storage for history rows.
+    """
+
+    def __init__(self, columns: dict = None):
+        """
+        Args:
+            columns (dict): Optional history column lists to start with.
+        """
+        self.operations = []
+        self.backends = []
+        self._names = {"operation": {}, "backend": {}}
+        self._codes = {name: array.array(typecode) for name, (typecode, _, _) in _CODE_TYPES.items()}
+        self._fixed = {name: array.array("q") for name in NUMERIC_COLUMNS}
+        # Column -> (sorted overflow row numbers, their values).
+        self._overflow = {name: (array.array("q"), []) for name in NUMERIC_COLUMNS}
+        if columns is not None:
+            self.extend(columns)
+
+    def __len__(self) -> int:
+        return len(self._codes["operation"])
+
+    def _code(self, column: str, name: str) -> int:
+        """
+        Returns the categorical code of a name, registering it on first use.
+        """
+        codes = self._names[column]
+        code = codes.get(name)
+        if code is None:
+            names = self.operations if column == "operation" else self.backends
+            if len(names) > _CODE_TYPES[column][2]:
+                raise ValueError(f"Too many distinct {column} names for the history store.")
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def _overflowed(self, column: str, row: int, value) -> int:
+        rows, values = self._overflow[column]
+        rows.append(row)
+        values.append(value)
+        return OVERFLOW
+
+    def append(self, operation: str, operand1, operand2, result, backend: str = DEFAULT_BACKEND):
+        """
+        Appends one row.
+        """
+        # Unrolled: this runs once per calculation.
+        codes, names, fixed = self._codes, self._names, self._fixed
+        row = len(codes["operation"])
+        code = names["operation"].get(operation)
+        codes["operation"].append(self._code("operation", operation) if code is None else code)
+        code = names["backend"].get(backend)
+        codes["backend"].append(self._code("backend", backend) if code is None else code)
+        scaled = encode_fixed(operand1)
+        fixed["operand1"].append(self._overflowed("operand1", row, operand1) if scaled is None else scaled)
+        scaled = encode_fixed(operand2)
+        fixed["operand2"].append(self._overflowed("operand2", row, operand2) if scaled is None else scaled)
+        scaled = encode_fixed(result)
+        fixed["result"].append(self._overflowed("result", row, result) if scaled is None else scaled)
+
+    def extend(self, columns: dict):
+        """
+        Appends rows given as history column lists. A missing backend column means Decimal rows.
+        """
+        start = len(self)
+        count = len(columns["operation"])
+        for column in _CODE_TYPES:
+            values = columns.get(column, [DEFAULT_BACKEND] * count)
+            for name in dict.fromkeys(values):
+                self._code(column, name)
+            self._codes[column].extend(map(self._names[column].__getitem__, values))
+        for column in NUMERIC_COLUMNS:
+            values = columns[column]
+            encoded = _encode_column(values)
+            overflowed = [offset for offset, scaled in enumerate(encoded) if scaled is None]
+            if overflowed:
+                overflow_rows, overflow_values = self._overflow[column]
+                overflow_rows.extend(start + offset for offset in overflowed)
+                overflow_values.extend(map(values.__getitem__, overflowed))
+                for offset in overflowed:
+                    encoded[offset] = OVERFLOW
+            self._fixed[column].extend(encoded)
+
+    def extend_segment(self, segment: HistorySegment):
+        """
+        Appends the rows of a binary history segment.
+
+        Fixed-point blocks at this store's scale are copied without decoding. Only the
+        segment's overflow values, and rows of non-Decimal backends (stored as Decimal
+        in the file), are decoded into the overflow path.
+        """
+        if segment.scale != SCALE:
+            self.extend(segment.to_columns())
+            return
+        start = len(self)
+        for column, names, block in (("operation", segment.operations, segment.block("operation")),
+                                     ("backend", segment.backends, segment.backend_codes())):
+            remap = np.asarray([self._code(column, name) for name in names], dtype=np.int64)
+            codes = remap[np.asarray(block, dtype=np.int64)] if len(block) else np.empty(0, dtype=np.int64)
+            self._codes[column].frombytes(codes.astype(_CODE_TYPES[column][1]).tobytes())
+        default = segment.backends.index(DEFAULT_BACKEND) if DEFAULT_BACKEND in segment.backends else -1
+        converted = np.flatnonzero(np.asarray(segment.backend_codes()) != default)
+        needed = {column: np.union1d(np.asarray(segment.block(f"{column}.overflow_rows"), dtype=np.int64), converted)
+                  for column in NUMERIC_COLUMNS}
+        decoded_rows = np.unique(np.concatenate(list(needed.values())))
+        decoded = segment.to_columns(decoded_rows) if len(decoded_rows) else None
+        for column in NUMERIC_COLUMNS:
+            scaled = np.array(segment.block(column), dtype="<i8")
+            rows = needed[column]
+            if len(rows):
+                scaled[rows] = OVERFLOW
+                overflow_rows, overflow_values = self._overflow[column]
+                overflow_rows.frombytes((rows + start).astype("<i8").tobytes())
+                values = decoded[column]
+                overflow_values.extend(values[position] for position in
+                                       np.searchsorted(decoded_rows, rows).tolist())
+            self._fixed[column].frombytes(scaled.tobytes())
+
+    def operation(self, row: int) -> str:
+        """
+        Returns the operation name of one row.
+        """
+        return self.operations[self._codes["operation"][row]]
+
+    def operation_rows(self) -> dict:
+        """
+        Returns operation name -> sorted row numbers, from one pass over the code column.
+        """
+        codes = self.select("operation", slice(None))
+        return {self.operations[code]: np.flatnonzero(codes == code).tolist()
+                for code in np.unique(codes).tolist()}
+
+    def select(self, column: str, rows) -> "np.ndarray":
+        """
+        Copies the selected entries of one array, given a slice or an array of row numbers:
+        name codes for operation and backend, fixed-point integers (OVERFLOW for overflow
+        rows) for the numeric columns.
+
+        Slicing copies the array first: a numpy view would keep its buffer exported and
+        block later appends.
+        """
+        if column in self._codes:
+            values, dtype = self._codes[column], _CODE_TYPES[column][1]
+        else:
+            values, dtype = self._fixed[column], "<i8"
+        if isinstance(rows, slice):
+            return np.frombuffer(values[rows], dtype=dtype)
+        return np.frombuffer(values, dtype=dtype)[rows]
+
+    def _decode(self, column: str, rows) -> list:
+        selected = self.select(column, rows)
+        if column in self._codes:
+            names = self.operations if column == "operation" else self.backends
+            return np.asarray(names, dtype=object)[selected].tolist()
+        # Histories repeat values heavily, so each distinct integer is decoded once.
+        distinct, inverse = np.unique(selected, return_inverse=True)
+        decoded = np.fromiter(map(decode_fixed, distinct.tolist()), dtype=object, count=len(distinct))
+        values = decoded[inverse.reshape(-1)].tolist()
+        overflow_rows, overflow_values = self._overflow[column]
+        if overflow_values:
+            positions = np.flatnonzero(selected == OVERFLOW)
+            numbers = (np.arange(len(self))[rows][positions] if isinstance(rows, slice)
+                       else rows[positions])
+            slots = np.searchsorted(np.frombuffer(overflow_rows, dtype="<i8"), numbers)
+            for position, slot in zip(positions.tolist(), slots.tolist()):
+                values[position] = overflow_values[slot]
+        return values
+
+    def to_columns(self, start: int = 0, stop: int = None) -> dict:
+        """
+        Decodes rows [start, stop) into history column lists.
+        """
+        rows = slice(start, len(self) if stop is None else stop)
+        return {column: self._decode(column, rows) for column in _COLUMN_ORDER}
+
+    def take(self, rows) -> dict:
+        """
+        Decodes the given row numbers into history column lists.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return {column: self._decode(column, rows) for column in _COLUMN_ORDER}
+
+    def values(self, column: str, rows) -> list:
+        """
+        Decodes one column at the given row numbers.
+        """
+        return self._decode(column, np.asarray(rows, dtype=np.int64))
+
+    def write(self, path: str, start: int = 0, stop: int = None):
+        """
+        Writes rows [start, stop) to a binary history file without decoding them.
+
+        The code and fixed-point arrays are written as they are; only the overflow values
+        are turned into text.
+        """
+        stop = len(self) if stop is None else stop
+        rows = slice(start, stop)
+        numeric = {}
+        for column in NUMERIC_COLUMNS:
+            overflow_rows, overflow_values = self._overflow[column]
+            first, last = bisect_left(overflow_rows, start), bisect_left(overflow_rows, stop)
+            numeric[column] = (self.select(column, rows),
+                               np.frombuffer(overflow_rows[first:last], dtype="<i8") - start,
+                               [str(value) for value in overflow_values[first:last]])
+        codes = {column: self.select(column, rows) for column in _CODE_TYPES}
+        write_encoded(path, self.operations, self.backends, codes, numeric, SCALE)
+
+    def _arrays(self) -> list:
+        return list(self._codes.values()) + list(self._fixed.values())
+
+    def _shift_overflow(self, first_kept: int, shift: int):
+        """
+        Drops overflow entries of the `shift` rows before `first_kept` and renumbers the later ones.
+        """
+        for column, (rows, values) in self._overflow.items():
+            first = bisect_left(rows, first_kept - shift)
+            kept = bisect_left(rows, first_kept)
+            del values[first:kept]
+            renumbered = np.frombuffer(rows[kept:], dtype="<i8") - shift
+            self._overflow[column] = (rows[:first] + array.array("q", renumbered.tobytes()), values)
+
+    def delete(self, row: int):
+        """
+        Deletes one row.
+        """
+        for values in self._arrays():
+            del values[row]
+        self._shift_overflow(row + 1, 1)
+
+    def delete_prefix(self, count: int):
+        """
+        Deletes the first `count` rows.
+        """
+        for values in self._arrays():
+            del values[:count]
+        self._shift_overflow(count, count)
+
+    def overflow_count(self, column: str = None) -> int:
+        """
+        Returns how many stored numbers use the overflow path, in one column or in all of them.
+        """
+        if column is not None:
+            return len(self._overflow[column][1])
+        return sum(len(values) for _, values in self._overflow.values())
+
+    def nbytes(self) -> int:
+        """
+        Estimates the memory held by the rows: the arrays plus the overflow values.
+        """
+        total = ROW_BYTES * len(self)
+        for rows, values in self._overflow.values():
+            total += 8 * len(rows) + sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+        return total
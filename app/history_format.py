@@ -0,0 +1,399 @@
+"""
+This module implements the columnar binary history format (`.calchist` files).
+
+Layout:
+
+    8 bytes   magic b"CALCHST1"
+    4 bytes   little-endian header length
+    N bytes   UTF-8 JSON header: row count, scale, operation and backend names and
+              the dtype/offset/length of every column block
+    ...       8-byte aligned column blocks
+
+Operations are stored as a uint16 code column indexing the header's operation names,
+and numeric backends as a uint8 code column indexing its backend names. Operands and
+results are int64 fixed-point columns holding value * 10**scale. Values that do not
+fit exactly (too many decimal places, out of range, NaN/Infinity) hold a sentinel and
+are kept exactly in a per-column overflow block: sorted row numbers, string offsets
+and a UTF-8 text blob. Decimals whose text would change in fixed point (trailing
+fractional zeros as in 2.50, exponents as in 1E+2, or -0) are kept there too, so
+values are restored with their text. Float and fraction rows are decoded back to
+their backend's type. Version 1 files (without a backend column) are still read, as
+Decimal rows.
+
+HistorySegment memory-maps a file and only decodes the columns (and rows) it is asked for.
+merge_history concatenates several files block by block, without decoding values.
+"""
+
+import json
+import os
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, InvalidOperation
+from fractions import Fraction
+from app.lazy_import import lazy_import
+from app.numeric_backend import DEFAULT_BACKEND, parse_number, restore_backend_types
+
+np = lazy_import("numpy")
+
+MAGIC = b"CALCHST1"
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+DEFAULT_SCALE = 6
+MERGE_CHUNK_ROWS = 2 ** 20
+EXTENSION = ".calchist"
+NUMERIC_COLUMNS = ("operand1", "operand2", "result")
+OVERFLOW = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+_ONE = Decimal(1)
+# Exact for every value scaleb sees, whatever precision the session context uses.
+_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+def is_binary_history(path: str) -> bool:
+    """
+    Returns True when the path uses the binary history extension.
+    """
+    return str(path).lower().endswith(EXTENSION)
+
+
+def _keeps_text(number: Decimal) -> bool:
+    """
+    Returns True when `_from_scaled` gives back the same text: an integer with exponent 0,
+    or a fraction without trailing zeros. Values such as 2.50, 1E+2 or -0 do not.
+    """
+    sign, digits, exponent = number.as_tuple()
+    if exponent == 0:
+        return not (sign and number.is_zero())
+    return exponent < 0 and digits[-1] != 0
+
+
+def _encode_numeric(values, scale: int):
+    """
+    Encodes values as scaled int64s, collecting those that do not fit as overflow text.
+
+    Decimals whose text the fixed-point form would change (2.50 decodes as 2.5) are kept
+    as overflow text too, so a history reads back exactly as it was written.
+
+    Returns:
+        tuple: (int64 array, overflow row numbers, overflow strings).
+    """
+    encoded = np.empty(len(values), dtype="<i8")
+    overflow_rows, overflow_text = [], []
+    for row, value in enumerate(values):
+        if isinstance(value, Fraction):
+            scaled = value * 10 ** scale
+            if scaled.denominator == 1 and OVERFLOW < scaled <= _INT64_MAX:
+                encoded[row] = scaled.numerator
+            else:
+                encoded[row] = OVERFLOW
+                overflow_rows.append(row)
+                overflow_text.append(str(value))
+            continue
+        number = value if isinstance(value, Decimal) else Decimal(str(value))
+        scaled = None
+        # Other backends are restored to their own type, so only a Decimal's text matters.
+        if number.is_finite() and (number is not value or _keeps_text(number)):
+            try:
+                scaled = number.scaleb(scale, _CONTEXT)
+                if scaled != scaled.to_integral_value(context=_CONTEXT) or not OVERFLOW < scaled <= _INT64_MAX:
+                    scaled = None
+            except InvalidOperation:
+                scaled = None
+        if scaled is None:
+            encoded[row] = OVERFLOW
+            overflow_rows.append(row)
+            overflow_text.append(str(number))
+        else:
+            encoded[row] = int(scaled)
+    return encoded, overflow_rows, overflow_text
+
+
+def write_history(path: str, columns: dict, scale: int = DEFAULT_SCALE):
+    """
+    Writes history columns to a binary history file, replacing it atomically.
+
+    Args:
+        path (str): Destination `.calchist` path.
+        columns (dict): History columns (operation, operand1, operand2, result, backend).
+        scale (int): Number of decimal places held in the fixed-point columns.
+    """
+    operations = list(dict.fromkeys(columns["operation"]))
+    if len(operations) > 65535:
+        raise ValueError("Too many distinct operations for the binary history format.")
+    operation_codes = {name: code for code, name in enumerate(operations)}
+    backend_column = columns.get("backend", [DEFAULT_BACKEND] * len(columns["operation"]))
+    backends = list(dict.fromkeys(backend_column))
+    backend_codes = {name: code for code, name in enumerate(backends)}
+    codes = {"operation": np.fromiter((operation_codes[name] for name in columns["operation"]),
+                                      dtype="<u2", count=len(columns["operation"])),
+             "backend": np.fromiter((backend_codes[name] for name in backend_column),
+                                    dtype="u1", count=len(backend_column))}
+    numeric = {name: _encode_numeric(columns[name], scale) for name in NUMERIC_COLUMNS}
+    write_encoded(path, operations, backends, codes, numeric, scale)
+
+
+def write_encoded(path: str, operations: list, backends: list, codes: dict, numeric: dict,
+                  scale: int = DEFAULT_SCALE):
+    """
+    Writes already encoded history columns to a binary history file, replacing it atomically.
+
+    Args:
+        path (str): Destination `.calchist` path.
+        operations (list): Operation names, indexed by code.
+        backends (list): Backend names, indexed by code.
+        codes (dict): "operation" and "backend" -> arrays of name codes.
+        numeric (dict): Numeric column -> (scaled int64 array holding OVERFLOW at overflow
+            rows, overflow row numbers, overflow strings).
+        scale (int): Number of decimal places held in the fixed-point columns.
+    """
+    blocks = {"operation": np.asarray(codes["operation"], dtype="<u2"),
+              "backend": np.asarray(codes["backend"], dtype="u1")}
+    for name in NUMERIC_COLUMNS:
+        encoded, rows, texts = numeric[name]
+        blob = "".join(texts).encode("utf-8")
+        offsets = np.zeros(len(texts) + 1, dtype="<i8")
+        np.cumsum([len(text.encode("utf-8")) for text in texts], out=offsets[1:])
+        blocks[name] = np.asarray(encoded, dtype="<i8")
+        blocks[f"{name}.overflow_rows"] = np.asarray(rows, dtype="<i8")
+        blocks[f"{name}.overflow_offsets"] = offsets
+        blocks[f"{name}.overflow_text"] = np.frombuffer(blob, dtype="u1")
+
+    _write_file(path, len(blocks["operation"]), scale, operations, backends,
+                {name: (block.dtype.str, len(block), [block]) for name, block in blocks.items()})
+
+
+def _write_file(path: str, rows: int, scale: int, operations: list, backends: list, blocks: dict):
+    """
+    Writes the header and column blocks of a binary history file, replacing it atomically.
+
+    Args:
+        blocks (dict): Block name -> (dtype string, length, iterable of arrays whose
+            concatenation is the block). Parts are written one at a time.
+    """
+    layout, position = {}, 0
+    for name, (dtype, length, _) in blocks.items():
+        layout[name] = {"dtype": dtype, "offset": position, "length": length}
+        position += (np.dtype(dtype).itemsize * length + 7) // 8 * 8
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "rows": rows,
+        "scale": scale,
+        "operations": operations,
+        "backends": backends,
+        "columns": layout,
+    }).encode("utf-8")
+    data_start = (len(MAGIC) + 4 + len(header) + 7) // 8 * 8
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as stream:
+        stream.write(MAGIC)
+        stream.write(len(header).to_bytes(4, "little"))
+        stream.write(header)
+        for name, (dtype, _, parts) in blocks.items():
+            stream.seek(data_start + layout[name]["offset"])
+            for part in parts:
+                stream.write(np.asarray(part, dtype=dtype).tobytes())
+        stream.truncate(data_start + position)
+    os.replace(temporary_path, path)
+
+
+def merge_history(path: str, segments: list):
+    """
+    Concatenates binary history segments into one file without decoding any value.
+
+    Code columns are remapped to the merged operation and backend names, and overflow
+    row numbers and text offsets are shifted. Blocks are copied MERGE_CHUNK_ROWS at a
+    time, so memory use does not grow with the segment sizes.
+
+    Args:
+        path (str): Destination `.calchist` path.
+        segments (list): HistorySegment objects, in row order, sharing one scale.
+
+    Raises:
+        ValueError: If the segments use different scales.
+    """
+    if len({segment.scale for segment in segments}) > 1:
+        raise ValueError("Cannot merge binary histories with different scales.")
+    operations = list(dict.fromkeys(name for segment in segments for name in segment.operations))
+    backends = list(dict.fromkeys(name for segment in segments for name in segment.backends))
+    if len(operations) > 65535:
+        raise ValueError("Too many distinct operations for the binary history format.")
+    rows = sum(len(segment) for segment in segments)
+
+    def chunks(block):
+        for start in range(0, len(block), MERGE_CHUNK_ROWS):
+            yield block[start:start + MERGE_CHUNK_ROWS]
+
+    def blocks_of(name):
+        for segment in segments:
+            yield from chunks(segment.block(name))
+
+    def codes(name, names):
+        merged = {value: code for code, value in enumerate(names)}
+        for segment in segments:
+            remap = np.asarray([merged[value] for value in getattr(segment, f"{name}s")], dtype=np.int64)
+            block = segment.block(name) if name == "operation" else segment.backend_codes()
+            for chunk in chunks(block):
+                yield remap[chunk]
+
+    def overflow_rows(name):
+        offset = 0
+        for segment in segments:
+            yield segment.block(f"{name}.overflow_rows") + offset
+            offset += len(segment)
+
+    def overflow_offsets(name):
+        yield np.zeros(1, dtype="<i8")
+        offset = 0
+        for segment in segments:
+            offsets = segment.block(f"{name}.overflow_offsets")
+            yield offsets[1:] + offset
+            offset += int(offsets[-1])
+
+    blocks = {"operation": ("<u2", rows, codes("operation", operations)),
+              "backend": ("|u1", rows, codes("backend", backends))}
+    for name in NUMERIC_COLUMNS:
+        overflow = sum(len(segment.block(f"{name}.overflow_rows")) for segment in segments)
+        text = sum(len(segment.block(f"{name}.overflow_text")) for segment in segments)
+        blocks[name] = ("<i8", rows, blocks_of(name))
+        blocks[f"{name}.overflow_rows"] = ("<i8", overflow, overflow_rows(name))
+        blocks[f"{name}.overflow_offsets"] = ("<i8", overflow + 1, overflow_offsets(name))
+        blocks[f"{name}.overflow_text"] = ("|u1", text, blocks_of(f"{name}.overflow_text"))
+    _write_file(path, rows, segments[0].scale if segments else DEFAULT_SCALE, operations, backends, blocks)
+
+
+def _from_scaled(value: int, scale: int) -> Decimal:
+    """
+    Converts a fixed-point integer back to a Decimal without redundant trailing zeros.
+    """
+    number = Decimal(value).scaleb(-scale, _CONTEXT)
+    if number == number.to_integral_value(context=_CONTEXT):
+        return number.quantize(_ONE, context=_CONTEXT)
+    return number.normalize(_CONTEXT)
+
+
+class HistorySegment:
+    """
+    Read-only, memory-mapped view of a binary history file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Reads the header and prepares lazy column mappings.
+
+        Args:
+            path (str): Source `.calchist` path.
+
+        Raises:
+            ValueError: If the file is not a supported binary history file.
+        """
+        with open(path, "rb") as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a binary history file.")
+            header_length = int.from_bytes(stream.read(4), "little")
+            header = json.loads(stream.read(header_length))
+        if header.get("version") not in READABLE_VERSIONS:
+            raise ValueError(f"Unsupported binary history version: {header.get('version')}")
+        self.path = path
+        self.rows = header["rows"]
+        self.scale = header["scale"]
+        self.operations = header["operations"]
+        self.backends = header.get("backends", [DEFAULT_BACKEND])
+        self._layout = header["columns"]
+        self._data_start = (len(MAGIC) + 4 + header_length + 7) // 8 * 8
+        self._blocks = {}
+        self._positions = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def block(self, name: str):
+        """
+        Returns a memory-mapped column block without copying or parsing it.
+        """
+        if name not in self._blocks:
+            spec = self._layout[name]
+            if spec["length"] == 0:
+                self._blocks[name] = np.empty(0, dtype=spec["dtype"])
+            else:
+                self._blocks[name] = np.memmap(self.path, dtype=spec["dtype"], mode="r",
+                                               offset=self._data_start + spec["offset"],
+                                               shape=(spec["length"],))
+        return self._blocks[name]
+
+    def operation_positions(self, operation: str):
+        """
+        Returns the row numbers holding `operation`, using only the code column.
+
+        The segment is read-only, so each operation's rows are found once and reused.
+        """
+        if operation not in self.operations:
+            return np.empty(0, dtype=np.int64)
+        if operation not in self._positions:
+            code = self.operations.index(operation)
+            self._positions[operation] = np.flatnonzero(self.block("operation") == code)
+        return self._positions[operation]
+
+    def operation_column(self, rows=None) -> list:
+        """
+        Decodes the operation names of all rows, or of the given row numbers.
+        """
+        codes = self.block("operation") if rows is None else self.block("operation")[rows]
+        return np.asarray(self.operations, dtype=object)[codes].tolist()
+
+    def backend_codes(self):
+        """
+        Returns the backend code column (all zeros for version 1 files), indexing `backends`.
+        """
+        if "backend" not in self._layout:
+            return np.zeros(self.rows, dtype="u1")
+        return self.block("backend")
+
+    def backend_column(self, rows=None) -> list:
+        """
+        Decodes the backend names of all rows, or of the given row numbers.
+        """
+        if "backend" not in self._layout:
+            return [DEFAULT_BACKEND] * (self.rows if rows is None else len(rows))
+        codes = self.block("backend") if rows is None else self.block("backend")[rows]
+        return np.asarray(self.backends, dtype=object)[codes].tolist()
+
+    def numeric_column(self, name: str, rows=None) -> list:
+        """
+        Decodes a fixed-point column into exact Decimals.
+
+        Args:
+            name (str): operand1, operand2 or result.
+            rows: Optional array of row numbers to decode instead of the whole column.
+
+        Returns:
+            list: Exact Decimal (or, for fraction overflow text, Fraction) values.
+        """
+        scaled = self.block(name)
+        rows = np.arange(len(scaled)) if rows is None else np.asarray(rows, dtype=np.int64)
+        selected = scaled[rows]
+        # Histories repeat values heavily, so each distinct integer is converted once.
+        distinct, inverse = np.unique(selected, return_inverse=True)
+        decoded = np.fromiter((_from_scaled(value, self.scale) for value in distinct.tolist()),
+                              dtype=object, count=len(distinct))
+        values = decoded[inverse]
+
+        overflow_rows = self.block(f"{name}.overflow_rows")
+        if len(overflow_rows):
+            offsets = self.block(f"{name}.overflow_offsets")
+            text = self.block(f"{name}.overflow_text")
+            slots = np.searchsorted(overflow_rows, rows)
+            hits = np.flatnonzero((slots < len(overflow_rows))
+                                  & (overflow_rows[np.minimum(slots, len(overflow_rows) - 1)] == rows))
+            for hit in hits.tolist():
+                slot = slots[hit]
+                values[hit] = parse_number(bytes(text[offsets[slot]:offsets[slot + 1]]).decode("utf-8"))
+        return values.tolist()
+
+    def to_columns(self, rows=None) -> dict:
+        """
+        Decodes every column (optionally only some rows) into history column lists.
+        """
+        columns = {"operation": self.operation_column(rows)}
+        for name in NUMERIC_COLUMNS:
+            columns[name] = self.numeric_column(name, rows)
+        columns["backend"] = self.backend_column(rows)
+        return restore_backend_types(columns)
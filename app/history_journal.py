@@ -0,0 +1,210 @@
+"""
+This module provides HistoryJournal, an append-only write-ahead journal of history changes.
+
+Each change is one tab-separated line:
+
+    A<TAB>operation<TAB>operand1<TAB>operand2<TAB>result<TAB>backend   (add_calculation)
+    D<TAB>index                                                    (delete_history)
+    C                                                              (clear_history)
+
+Add records written before numeric backends existed have no backend field and
+replay as Decimal rows.
+
+Appends go to a buffered file and are made durable by group commit: the buffer is
+flushed and fsynced once `commit_size` records are pending or `commit_interval`
+seconds have passed, whichever comes first. A crash therefore loses at most one
+commit window, while individual calculations never wait on the disk.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from app.history_loader import parse_decimals
+from app.numeric_backend import DEFAULT_BACKEND, restore_backend_types
+
+DEFAULT_COMMIT_INTERVAL = 1.0
+DEFAULT_COMMIT_SIZE = 256
+_CONTROL_RECORD = re.compile(r"^(C|D\t\d+)\n", re.MULTILINE)
+
+
+class HistoryJournal:
+    """
+    Append-only journal of calculation history changes with group commit.
+    """
+
+    def __init__(self, path: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 commit_size: int = DEFAULT_COMMIT_SIZE):
+        """
+        Opens (or creates) the journal for appending and starts the background committer.
+
+        Args:
+            path (str): Journal file path.
+            commit_interval (float): Maximum seconds a record may wait before being fsynced.
+            commit_size (int): Number of pending records that triggers an immediate commit.
+
+        Raises:
+            ValueError: If `commit_interval` or `commit_size` is not positive.
+        """
+        if not commit_interval > 0:
+            raise ValueError(f"Journal commit interval must be positive, got {commit_interval}.")
+        if commit_size < 1:
+            raise ValueError(f"Journal commit size must be positive, got {commit_size}.")
+        self.path = path
+        self.commit_interval = commit_interval
+        self.commit_size = commit_size
+        self._lock = threading.Lock()
+        self._stream = open(path, "a", encoding="utf-8")
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._closed = threading.Event()
+        self._committer = threading.Thread(target=self._commit_periodically, daemon=True)
+        self._committer.start()
+
+    def append_add(self, record: dict):
+        """
+        Journals an added calculation record.
+        """
+        self._append(f"A\t{record['operation']}\t{record['operand1']}\t"
+                     f"{record['operand2']}\t{record['result']}\t"
+                     f"{record.get('backend', DEFAULT_BACKEND)}\n")
+
+    def append_delete(self, index: int):
+        """
+        Journals the deletion of the record at `index`.
+        """
+        self._append(f"D\t{index}\n")
+
+    def append_clear(self):
+        """
+        Journals a history clear.
+        """
+        self._append("C\n")
+
+    def _append(self, line: str):
+        with self._lock:
+            self._stream.write(line)
+            self._pending += 1
+            if (self._pending >= self.commit_size
+                    or time.monotonic() - self._last_commit >= self.commit_interval):
+                self._commit_locked()
+
+    def commit(self):
+        """
+        Flushes and fsyncs all pending records.
+        """
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self):
+        if self._pending:
+            self._stream.flush()
+            os.fsync(self._stream.fileno())
+            self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def _commit_periodically(self):
+        while not self._closed.wait(self.commit_interval):
+            self.commit()
+
+    def rewrite(self, columns: dict):
+        """
+        Replaces the journal with a compact snapshot of the given history columns.
+
+        Used when the whole history is replaced, e.g. by `load_history`.
+
+        Args:
+            columns (dict): History columns (operation, operand1, operand2, result, backend).
+        """
+        temporary_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(temporary_path, "w", encoding="utf-8") as snapshot:
+                snapshot.writelines(
+                    f"A\t{operation}\t{operand1}\t{operand2}\t{result}\t{backend}\n"
+                    for operation, operand1, operand2, result, backend in zip(
+                        columns["operation"], columns["operand1"], columns["operand2"],
+                        columns["result"], columns["backend"])
+                )
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            self._stream.close()
+            os.replace(temporary_path, self.path)
+            self._stream = open(self.path, "a", encoding="utf-8")
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        """
+        Commits pending records and closes the journal.
+        """
+        self._closed.set()
+        self._committer.join()
+        with self._lock:
+            self._commit_locked()
+            self._stream.close()
+
+    @staticmethod
+    def replay(path: str) -> dict:
+        """
+        Rebuilds history columns by applying every journaled change in order.
+
+        Runs of consecutive add records are split in bulk and each distinct
+        operand/result string is converted once, then float and fraction rows get their
+        backend's number type back. A torn final line (from a crash mid-write) is ignored.
+
+        Args:
+            path (str): Journal file path.
+
+        Returns:
+            dict: History columns (operation, operand1, operand2, result, backend).
+        """
+        with open(path, encoding="utf-8") as stream:
+            text = stream.read()
+        complete = text.rfind("\n") + 1
+        if complete < len(text):
+            logging.warning(f"Ignoring incomplete final journal line in {path}")
+
+        # Splitting on delete/clear records leaves runs of add records that are
+        # parsed with two bulk string operations instead of a per-line loop.
+        parts = _CONTROL_RECORD.split(text[:complete])
+        columns = [[], [], [], [], []]
+        for position, part in enumerate(parts):
+            if position % 2 == 0:
+                _extend_with_adds(columns, part)
+            elif part == "C":
+                columns = [[], [], [], [], []]
+            else:
+                index = int(part[2:])
+                for column in columns:
+                    del column[index]
+
+        operations, operands1, operands2, results, backends = columns
+        return restore_backend_types({
+            "operation": operations, "operand1": parse_decimals(operands1),
+            "operand2": parse_decimals(operands2), "result": parse_decimals(results),
+            "backend": backends})
+
+
+def _extend_with_adds(columns: list, text: str):
+    """
+    Appends the fields of a run of newline-terminated add records to the history columns.
+    """
+    if not text:
+        return
+    records = text.count("\n")
+    fields = text.replace("\n", "\t").split("\t")
+    fields.pop()
+    if len(fields) == 6 * records and fields[::6].count("A") == records:
+        for column, offset in zip(columns, range(1, 6)):
+            column.extend(fields[offset::6])
+        return
+    # Runs that include legacy records without a backend field are split line by line.
+    for line in text.splitlines():
+        record = line.split("\t")
+        if record[0] != "A" or len(record) not in (5, 6):
+            raise ValueError("Malformed add record in history journal.")
+        if len(record) == 5:
+            record.append(DEFAULT_BACKEND)
+        for column, value in zip(columns, record[1:]):
+            column.append(value)
@@ -0,0 +1,169 @@
+"""
+This module provides the streaming CSV history loader used by `load_history`.
+
+The file is read in bounded-size chunks that end on a line boundary. Worker processes
+from WorkerPool tokenize each chunk and deduplicate its values, returning compact
+(distinct strings, index array) pairs. The parent process converts each distinct
+string to Decimal once and appends the rows in file order, so operands and results
+come back exactly as they were saved and peak memory is bounded by the chunks in
+flight plus the final history columns. Rows of the float and fraction backends get
+their backend's number type back; files without a backend column load as Decimal rows.
+
+Fields must not contain embedded newlines (history files never do).
+"""
+
+import csv
+import logging
+import os
+from collections import deque
+from app.lazy_import import lazy_import
+from app.numeric_backend import DEFAULT_BACKEND, parse_number, restore_backend_types
+from app.worker_pool import WorkerPool
+
+np = lazy_import("numpy")
+
+COLUMNS = ["operation", "operand1", "operand2", "result", "backend"]
+REQUIRED_COLUMNS = COLUMNS[:4]
+DEFAULT_CHUNK_BYTES = 4 * 2 ** 20
+
+
+def parse_decimals(texts: list) -> list:
+    """
+    Converts strings to exact numbers (Fractions for "n/d" text), parsing each distinct string only once.
+    """
+    parsed = {text: parse_number(text) for text in set(texts)}
+    return list(map(parsed.__getitem__, texts))
+
+
+def _encode_distinct(values: list):
+    """
+    Splits a column into its distinct values and an index array into them.
+    """
+    distinct = list(dict.fromkeys(values))
+    positions = {value: position for position, value in enumerate(distinct)}
+    indices = np.fromiter(map(positions.__getitem__, values), dtype=np.int64, count=len(values))
+    return distinct, indices
+
+
+def parse_chunk(data: bytes, header: list) -> dict:
+    """
+    Tokenizes a chunk of complete CSV lines into deduplicated history columns.
+
+    Args:
+        data (bytes): UTF-8 CSV lines without the header.
+        header (list): Column names in file order.
+
+    Returns:
+        dict: Column name -> (distinct strings, int64 index array).
+    """
+    text = data.decode("utf-8")
+    width = len(header)
+    if '"' in text:
+        rows = [row for row in csv.reader(text.splitlines()) if row]
+        if set(map(len, rows)) - {width}:
+            raise ValueError("History CSV row does not match the header.")
+        fields = [[row[position] for row in rows] for position in range(width)]
+    else:
+        # Unquoted chunks are split in bulk: building a list per row would cost far
+        # more (in allocation and garbage collection) than the parsing itself.
+        lines = [line for line in text.splitlines() if line]
+        cells = ",".join(lines).split(",") if lines else []
+        if len(cells) != width * len(lines):
+            raise ValueError("History CSV row does not match the header.")
+        fields = [cells[position::width] for position in range(width)]
+    return {name: _encode_distinct(fields[header.index(name)]) for name in COLUMNS if name in header}
+
+
+def read_line_chunks(stream, chunk_bytes: int, consumed: int = 0):
+    """
+    Yields (chunk, bytes consumed so far) with every chunk ending on a newline.
+
+    `consumed` is the number of bytes already read from the stream, e.g. a header line.
+    """
+    remainder = b""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        consumed += len(block)
+        data = remainder + block
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            remainder = data
+            continue
+        remainder = data[cut:]
+        yield data[:cut], consumed
+    if remainder:
+        yield remainder, consumed
+
+
+def _collect(columns: dict, parsed: dict):
+    """
+    Appends a parsed chunk to the history columns, converting each distinct number once.
+    """
+    for name, (distinct, indices) in parsed.items():
+        if name in ("operand1", "operand2", "result"):
+            distinct = [parse_number(text) for text in distinct]
+        # np.fromiter avoids numpy probing every Decimal as a possible sequence.
+        lookup = np.fromiter(distinct, dtype=object, count=len(distinct))
+        columns[name].extend(lookup[indices].tolist())
+
+
+def _report(progress, consumed: int, total: int):
+    """
+    Forwards loader progress to the optional callback.
+    """
+    if progress is not None:
+        progress(consumed, total)
+
+
+def load_csv(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES, parallel: bool = True,
+             progress=None) -> dict:
+    """
+    Loads a history CSV file in bounded chunks, keeping exact Decimal values.
+
+    Args:
+        path (str): Source CSV file path.
+        chunk_bytes (int): Approximate size of each chunk read from disk.
+        parallel (bool): Parse chunks in WorkerPool processes when the file spans several chunks.
+        progress: Optional callable receiving (bytes read, total bytes) after every chunk.
+
+    Returns:
+        dict: History columns (operation, operand1, operand2, result, backend).
+
+    Raises:
+        ValueError: If the header lacks a history column or a row has the wrong width.
+    """
+    total = os.path.getsize(path)
+    columns = {name: [] for name in COLUMNS}
+
+    with open(path, "rb") as stream:
+        header = next(csv.reader([stream.readline().decode("utf-8-sig")]), [])
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"History CSV is missing columns: {', '.join(missing)}")
+
+        use_pool = parallel and total - stream.tell() > chunk_bytes
+        window = 2 * WorkerPool.worker_count()
+        in_flight = deque()
+
+        for chunk, consumed in read_line_chunks(stream, chunk_bytes, stream.tell()):
+            if not use_pool:
+                _collect(columns, parse_chunk(chunk, header))
+                _report(progress, consumed, total)
+                continue
+            in_flight.append((WorkerPool.submit(parse_chunk, chunk, header), consumed))
+            if len(in_flight) >= window:
+                future, done = in_flight.popleft()
+                _collect(columns, future.result())
+                _report(progress, done, total)
+        while in_flight:
+            future, done = in_flight.popleft()
+            _collect(columns, future.result())
+            _report(progress, done, total)
+
+    if "backend" not in header:
+        columns["backend"] = [DEFAULT_BACKEND] * len(columns["operation"])
+    restore_backend_types(columns)
+    logging.info(f"Loaded {len(columns['operation'])} history rows from {path}")
+    return columns
@@ -0,0 +1,573 @@
+"""
+This module provides the history query language behind the `query` and `explain` commands.
+
+A query filters, orders and limits the history:
+
+    operation=divide and result > 100 and operand1 between 1 and 10 order by result desc limit 50
+
+Each predicate compares one column with a constant, and predicates are joined with
+`and`. operation and backend support `=` and `!=`. operand1, operand2 and result also
+support `<`, `<=`, `>`, `>=` and `between a and b`. Every clause is optional.
+
+Queries run on the typed history storage, never on a DataFrame. Each source (every
+memory-mapped segment, then the in-memory rows) is planned and evaluated on its own:
+
+- an `operation = name` predicate reads its rows from the operation index instead of
+  scanning the table;
+- the other predicates are numpy comparisons over the remaining candidate rows:
+  categorical ones first, then numeric ones, starting with the column that has the fewest
+  overflow numbers. A numeric bound is converted once to the source's fixed-point
+  scale, so stored numbers are compared as int64. Only overflow rows (numbers without an
+  exact fixed-point form) are decoded and compared exactly;
+- `order by ... limit k` selects the k best rows with np.partition and sorts only those.
+  A limit without an order stops at the first k matches in row order.
+
+Only the rows of the result are decoded. `explain_query` describes this plan.
+"""
+
+import heapq
+import math
+import operator
+import re
+from decimal import Decimal
+from fractions import Fraction
+from typing import NamedTuple
+from app.history_columns import SCALE
+from app.history_format import NUMERIC_COLUMNS, OVERFLOW
+from app.lazy_import import lazy_import
+from app.numeric_backend import parse_number
+
+np = lazy_import("numpy")
+
+CATEGORICAL_COLUMNS = ("operation", "backend")
+COLUMNS = ("operation",) + NUMERIC_COLUMNS + ("backend",)
+COMPARISONS = {"=": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+               ">": operator.gt, ">=": operator.ge}
+_INT64_MAX = 2 ** 63 - 1
+_TOKEN = re.compile(r"\s*(<=|>=|!=|=|<|>|[^\s<>=!]+)")
+
+
+class QueryError(ValueError):
+    """
+    Raised for queries that cannot be parsed.
+    """
+
+
+class Predicate(NamedTuple):
+    """
+    One comparison of a column: `values` holds one operand, or two for `between`.
+    """
+    column: str
+    operator: str
+    values: tuple
+
+    def describe(self) -> str:
+        """
+        Returns the predicate in query syntax.
+        """
+        if self.operator == "between":
+            return f"{self.column} between {self.values[0]} and {self.values[1]}"
+        return f"{self.column} {self.operator} {self.values[0]}"
+
+
+class Query(NamedTuple):
+    """
+    A parsed query: predicates joined by `and`, an optional sort column and a row limit.
+    """
+    predicates: tuple
+    order_by: str = None
+    descending: bool = False
+    limit: int = None
+
+    def describe(self) -> str:
+        """
+        Returns the query in normalized query syntax.
+        """
+        clauses = [" and ".join(predicate.describe() for predicate in self.predicates)]
+        if self.order_by is not None:
+            clauses.append(f"order by {self.order_by} {'desc' if self.descending else 'asc'}")
+        if self.limit is not None:
+            clauses.append(f"limit {self.limit}")
+        return " ".join(clause for clause in clauses if clause) or "(all rows)"
+
+
+def tokenize(text: str) -> list:
+    """
+    Splits query text into words and comparison operators.
+    """
+    tokens = []
+    text = text.strip()
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise QueryError(f"Unexpected character '{text[position:].lstrip()[:1]}' in query")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser over the token list of one query.
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> str:
+        """
+        Returns the next token in lower case, or "" at the end of the query.
+        """
+        return self.tokens[self.position].lower() if self.position < len(self.tokens) else ""
+
+    def take(self, expected: str = None, what: str = None) -> str:
+        """
+        Consumes the next token, which must equal `expected` (in any case) when one is given.
+
+        Raises:
+            QueryError: At the end of the query, naming `what` was expected, or on a
+                different token.
+        """
+        if self.position >= len(self.tokens):
+            raise QueryError(f"Expected {what or repr(expected)} at the end of the query")
+        token = self.tokens[self.position]
+        if expected is not None and token.lower() != expected:
+            raise QueryError(f"Expected '{expected}' but found '{token}'")
+        self.position += 1
+        return token
+
+    def column(self, allowed: tuple) -> str:
+        """
+        Consumes a column name, which must be one of `allowed`.
+        """
+        name = self.take(what="a column").lower()
+        if name not in allowed:
+            raise QueryError(f"Expected one of {', '.join(allowed)} but found '{name}'")
+        return name
+
+    def value(self, column: str):
+        """
+        Consumes a comparison operand: a name for categorical columns, a finite number otherwise.
+        """
+        token = self.take(what="a value")
+        if column in CATEGORICAL_COLUMNS:
+            return token
+        try:
+            value = parse_number(token)
+        except (ArithmeticError, ValueError):
+            value = None
+        if value is None or (isinstance(value, Decimal) and not value.is_finite()):
+            raise QueryError(f"'{token}' is not a number")
+        return value
+
+    def predicate(self) -> Predicate:
+        """
+        Parses `<column> <comparison> <value>` or `<column> between <low> and <high>`.
+        """
+        column = self.column(COLUMNS)
+        symbol = self.take(what="a comparison").lower()
+        if symbol == "between" and column in NUMERIC_COLUMNS:
+            low = self.value(column)
+            self.take("and")
+            return Predicate(column, symbol, (low, self.value(column)))
+        if symbol not in COMPARISONS or (column in CATEGORICAL_COLUMNS and symbol not in ("=", "!=")):
+            raise QueryError(f"Unsupported comparison '{symbol}' for {column}")
+        return Predicate(column, symbol, (self.value(column),))
+
+    def query(self) -> Query:
+        """
+        Parses the whole query: predicates, then `order by` and `limit` clauses.
+        """
+        predicates = []
+        if self.peek() not in ("", "order", "limit"):
+            predicates.append(self.predicate())
+            while self.peek() == "and":
+                self.take()
+                predicates.append(self.predicate())
+        order_by, descending, limit = None, False, None
+        if self.peek() == "order":
+            self.take()
+            self.take("by")
+            order_by = self.column(NUMERIC_COLUMNS)
+            if self.peek() in ("asc", "desc"):
+                descending = self.take().lower() == "desc"
+        if self.peek() == "limit":
+            self.take()
+            token = self.take(what="a row count")
+            if not token.isdigit():
+                raise QueryError(f"Invalid limit '{token}'")
+            limit = int(token)
+        if self.position < len(self.tokens):
+            raise QueryError(f"Unexpected '{self.tokens[self.position]}' in query")
+        return Query(tuple(predicates), order_by, descending, limit)
+
+
+def parse_query(text: str) -> Query:
+    """
+    Parses query text.
+
+    Raises:
+        QueryError: If the text is not a valid query.
+    """
+    return _Parser(tokenize(text)).query()
+
+
+class SegmentSource:
+    """
+    Query access to the rows of a memory-mapped history segment.
+    """
+
+    def __init__(self, segment, offset: int):
+        """
+        Args:
+            segment (HistorySegment): The segment.
+            offset (int): History row number of the segment's first row.
+        """
+        self.segment = segment
+        self.offset = offset
+        self.scale = segment.scale
+        self.label = f"segment {segment.path}"
+
+    def __len__(self) -> int:
+        return len(self.segment)
+
+    def positions(self, operation: str):
+        return self.segment.operation_positions(operation)
+
+    def names(self, column: str) -> list:
+        return self.segment.operations if column == "operation" else self.segment.backends
+
+    def codes(self, column: str, rows):
+        block = self.segment.block("operation") if column == "operation" else self.segment.backend_codes()
+        return np.asarray(block[rows])
+
+    def fixed(self, column: str, rows):
+        return np.asarray(self.segment.block(column)[rows])
+
+    def overflow_count(self, column: str) -> int:
+        return len(self.segment.block(f"{column}.overflow_rows"))
+
+    def values(self, column: str, rows) -> list:
+        return self.segment.numeric_column(column, rows)
+
+    def decode(self, rows) -> dict:
+        return self.segment.to_columns(rows)
+
+
+class StoreSource:
+    """
+    Query access to the in-memory rows of a HistoryColumns store.
+    """
+
+    def __init__(self, store, index: dict, offset: int):
+        """
+        Args:
+            store (HistoryColumns): The store.
+            index (dict): Operation name -> sorted row numbers in the store.
+            offset (int): History row number of the store's first row.
+        """
+        self.store = store
+        self.index = index
+        self.offset = offset
+        self.scale = SCALE
+        self.label = "memory"
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def positions(self, operation: str):
+        return np.asarray(self.index.get(operation, []), dtype=np.int64)
+
+    def names(self, column: str) -> list:
+        return self.store.operations if column == "operation" else self.store.backends
+
+    def codes(self, column: str, rows):
+        return self.store.select(column, rows)
+
+    def fixed(self, column: str, rows):
+        return self.store.select(column, rows)
+
+    def overflow_count(self, column: str) -> int:
+        return self.store.overflow_count(column)
+
+    def values(self, column: str, rows) -> list:
+        return self.store.values(column, rows)
+
+    def decode(self, rows) -> dict:
+        return self.store.take(rows)
+
+
+class SourcePlan(NamedTuple):
+    """
+    How one source is scanned: the index predicate (None for a full scan), the number
+    of candidate rows it leaves, and the remaining predicates in evaluation order.
+    """
+    source: object
+    index: Predicate
+    candidates: int
+    filters: tuple
+
+
+def plan_query(query: Query, sources: list) -> list:
+    """
+    Chooses the access path and the predicate order for every source.
+
+    Returns:
+        list: One SourcePlan per source, in row order.
+    """
+    indexed = next((predicate for predicate in query.predicates
+                    if predicate.column == "operation" and predicate.operator == "="), None)
+    plans = []
+    for source in sources:
+        filters = sorted((predicate for predicate in query.predicates if predicate is not indexed),
+                         key=lambda predicate, source=source: (0, 0) if predicate.column in CATEGORICAL_COLUMNS
+                         else (1, source.overflow_count(predicate.column)))
+        candidates = len(source.positions(indexed.values[0])) if indexed is not None else len(source)
+        plans.append(SourcePlan(source, indexed, candidates, tuple(filters)))
+    return plans
+
+
+def _bounds(predicate: Predicate) -> list:
+    if predicate.operator == "between":
+        return [(">=", predicate.values[0]), ("<=", predicate.values[1])]
+    return [(predicate.operator, predicate.values[0])]
+
+
+def _compare_fixed(scaled, symbol: str, bound, scale: int):
+    """
+    Compares fixed-point integers with an exact bound, converted once to the same scale.
+    """
+    target = Fraction(bound) * 10 ** scale
+    if symbol in ("=", "!="):
+        if target.denominator == 1 and OVERFLOW < target <= _INT64_MAX:
+            equal = scaled == target.numerator
+        else:
+            equal = np.zeros(len(scaled), dtype=bool)
+        return equal if symbol == "=" else ~equal
+    # x > t and x <= t hold for integers exactly when they hold for floor(t); x >= t and
+    # x < t are x > ceil(t) - 1 and x <= ceil(t) - 1.
+    threshold = math.floor(target) if symbol in (">", "<=") else math.ceil(target) - 1
+    threshold = min(max(threshold, OVERFLOW), _INT64_MAX)
+    return scaled > threshold if symbol in (">", ">=") else scaled <= threshold
+
+
+def _holds(predicate: Predicate, value) -> bool:
+    """
+    Evaluates a numeric predicate exactly on one decoded value.
+    """
+    try:
+        if predicate.operator == "between":
+            return predicate.values[0] <= value <= predicate.values[1]
+        return COMPARISONS[predicate.operator](value, predicate.values[0])
+    except ArithmeticError:  # ordering a NaN
+        return False
+
+
+def _mask(source, predicate: Predicate, rows):
+    """
+    Returns which of the candidate rows satisfy one predicate.
+    """
+    column = predicate.column
+    if column in CATEGORICAL_COLUMNS:
+        names = source.names(column)
+        code = names.index(predicate.values[0]) if predicate.values[0] in names else -1
+        codes = source.codes(column, rows)
+        return codes == code if predicate.operator == "=" else codes != code
+    scaled = source.fixed(column, rows)
+    overflowed = scaled == OVERFLOW
+    mask = ~overflowed
+    for symbol, bound in _bounds(predicate):
+        mask &= _compare_fixed(scaled, symbol, bound, source.scale)
+    positions = np.flatnonzero(overflowed)
+    if len(positions):
+        exact = [_holds(predicate, value) for value in source.values(column, rows[positions])]
+        mask[positions[np.asarray(exact, dtype=bool)]] = True
+    return mask
+
+
+def _matches(plan: SourcePlan):
+    """
+    Returns the sorted row numbers of a source that satisfy every predicate.
+    """
+    source = plan.source
+    if plan.index is not None:
+        rows = np.asarray(source.positions(plan.index.values[0]), dtype=np.int64)
+    else:
+        rows = np.arange(len(source), dtype=np.int64)
+    for predicate in plan.filters:
+        if rows.size == 0:
+            break
+        rows = rows[_mask(source, predicate, rows)]
+    return rows
+
+
+def _smallest(keys, count: int):
+    """
+    Returns the positions of the `count` smallest keys in key order, ties in position
+    order, without sorting all of them.
+    """
+    if count >= len(keys):
+        return np.argsort(keys, kind="stable")
+    if count == 0:
+        return np.empty(0, dtype=np.int64)
+    kth = np.partition(keys, count - 1)[count - 1]
+    below = np.flatnonzero(keys < kth)
+    chosen = np.concatenate([below, np.flatnonzero(keys == kth)[:count - len(below)]])
+    return chosen[np.argsort(keys[chosen], kind="stable")]
+
+
+def _is_nan(value) -> bool:
+    """
+    Returns True for a Decimal or float NaN, which has no place in an ordering.
+    """
+    if isinstance(value, Decimal):
+        return value.is_nan()
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _descending_rank(item: tuple) -> tuple:
+    """
+    Ranks (value, source number, row) items by value, keeping ties in row order when the
+    ranking is reversed.
+    """
+    return item[0], -item[1], -item[2]
+
+
+def _top(query: Query, sources: list, matched: list) -> tuple:
+    """
+    Orders the matched rows by the query's column and keeps the first `limit`.
+
+    Fixed-point numbers at the most common scale are ranked together in numpy. Overflow
+    numbers, and numbers of segments at another scale, are ranked exactly in Python
+    and merged with the numpy winners. Ties keep their row order. NaN values cannot be
+    compared, so they follow every number, in row order, in both directions.
+
+    Returns:
+        tuple: (source numbers, row numbers) arrays in result order.
+    """
+    column, descending = query.order_by, query.descending
+    count = sum(len(rows) for rows in matched)
+    count = count if query.limit is None else min(query.limit, count)
+    sizes = {}
+    for source, rows in zip(sources, matched):
+        sizes[source.scale] = sizes.get(source.scale, 0) + len(rows)
+    scale = max(sizes, key=sizes.get)
+
+    numbers, fixed_rows, keys, exact = [], [], [], []
+    for number, (source, rows) in enumerate(zip(sources, matched)):
+        if rows.size == 0:
+            continue
+        scaled = source.fixed(column, rows)
+        overflowed = scaled == OVERFLOW
+        if source.scale == scale:
+            kept = ~overflowed
+            numbers.append(np.full(int(kept.sum()), number, dtype=np.int64))
+            fixed_rows.append(rows[kept])
+            keys.append(scaled[kept])
+        else:
+            exact.extend((Fraction(int(value), 10 ** source.scale), number, row)
+                         for value, row in zip(scaled[~overflowed].tolist(), rows[~overflowed].tolist()))
+        positions = np.flatnonzero(overflowed)
+        if len(positions):
+            exact.extend(zip(source.values(column, rows[positions]), [number] * len(positions),
+                             rows[positions].tolist()))
+
+    numbers = np.concatenate(numbers) if numbers else np.empty(0, dtype=np.int64)
+    fixed_rows = np.concatenate(fixed_rows) if fixed_rows else np.empty(0, dtype=np.int64)
+    keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+    winners = _smallest(-keys if descending else keys, count)
+    nans = sorted((number, row) for value, number, row in exact if _is_nan(value))
+    if nans:
+        exact = [item for item in exact if not _is_nan(item[0])]
+    elif not exact:
+        return numbers[winners], fixed_rows[winners]
+
+    rank = _descending_rank if descending else None
+    best = heapq.nlargest(count, exact, key=rank) if descending else heapq.nsmallest(count, exact)
+    ranked = ((Fraction(value, 10 ** scale), number, row) for value, number, row in
+              zip(keys[winners].tolist(), numbers[winners].tolist(), fixed_rows[winners].tolist()))
+    merged = list(heapq.merge(ranked, best, key=rank, reverse=descending))[:count]
+    merged.extend((None, number, row) for number, row in nans[:count - len(merged)])
+    return (np.asarray([item[1] for item in merged], dtype=np.int64),
+            np.asarray([item[2] for item in merged], dtype=np.int64))
+
+
+def _decode(sources: list, numbers, rows) -> dict:
+    """
+    Decodes the result rows from their sources into history column lists, in result order.
+    """
+    columns = {name: np.empty(len(rows), dtype=object) for name in COLUMNS}
+    for number, source in enumerate(sources):
+        positions = np.flatnonzero(numbers == number)
+        if len(positions):
+            for name, values in source.decode(rows[positions]).items():
+                columns[name][positions] = np.fromiter(values, dtype=object, count=len(values))
+    return {name: values.tolist() for name, values in columns.items()}
+
+
+def execute_query(query: Query, sources: list) -> tuple:
+    """
+    Runs a query over history sources.
+
+    Args:
+        query (Query): The parsed query.
+        sources (list): SegmentSource and StoreSource objects, in row order.
+
+    Returns:
+        tuple: (history row numbers in result order, history column lists of the result).
+    """
+    matched = []
+    found = 0
+    for plan in plan_query(query, sources):
+        if query.order_by is None and query.limit is not None and found >= query.limit:
+            matched.append(np.empty(0, dtype=np.int64))
+            continue
+        rows = _matches(plan)
+        if query.order_by is None and query.limit is not None:
+            rows = rows[:query.limit - found]
+        matched.append(rows)
+        found += len(rows)
+    if query.order_by is None:
+        numbers = np.concatenate([np.full(len(rows), number, dtype=np.int64)
+                                  for number, rows in enumerate(matched)] or [np.empty(0, dtype=np.int64)])
+        rows = np.concatenate(matched or [np.empty(0, dtype=np.int64)])
+    else:
+        numbers, rows = _top(query, sources, matched)
+    offsets = np.asarray([source.offset for source in sources], dtype=np.int64)
+    return rows + offsets[numbers], _decode(sources, numbers, rows)
+
+
+def explain_query(query: Query, sources: list) -> str:
+    """
+    Describes the plan of a query: the access path and filter order per source, then the
+    ordering and limit strategy.
+    """
+    lines = [f"Query: {query.describe()}"]
+    for plan in plan_query(query, sources):
+        source = plan.source
+        if plan.index is not None:
+            lines.append(f"{source.label}: operation index lookup '{plan.index.values[0]}' "
+                         f"({plan.candidates:,} of {len(source):,} rows)")
+        else:
+            lines.append(f"{source.label}: full scan ({len(source):,} rows)")
+        for predicate in plan.filters:
+            if predicate.column in CATEGORICAL_COLUMNS:
+                method = "code comparison"
+            else:
+                method = f"int64 comparison at scale {source.scale}"
+                overflow = source.overflow_count(predicate.column)
+                if overflow:
+                    method += f", {overflow:,} overflow numbers compared exactly"
+            lines.append(f"  filter {predicate.describe()}: {method}")
+    if query.order_by is not None and query.limit is not None:
+        lines.append(f"Order: top {query.limit} by {query.order_by} with partial selection (np.partition), "
+                     f"only the selected rows are sorted")
+    elif query.order_by is not None:
+        lines.append(f"Order: full sort by {query.order_by}")
+    elif query.limit is not None:
+        lines.append(f"Limit: first {query.limit} matches in row order, remaining sources skipped")
+    else:
+        lines.append("Order: row order")
+    return "\n".join(lines)
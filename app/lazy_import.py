@@ -0,0 +1,34 @@
+"""
+This module provides lazy_import, which defers loading heavy third-party modules
+(pandas, numpy) until one of their attributes is first used.
+
+One-shot CLI calculations never touch history or batch features, so they should not
+pay the import cost of those libraries.
+"""
+
+import importlib.util
+import sys
+
+def lazy_import(name: str):
+    """
+    Returns a module object that is only executed on first attribute access.
+
+    Args:
+        name (str): Absolute module name, e.g. "pandas".
+
+    Returns:
+        module: The already imported module, or a lazily loading stand-in.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        # A regular import binds submodules on their package; `import pkg.mod` relies on it.
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -0,0 +1,261 @@
+"""
+This module provides Metrics, the application's hot-path timing instrumentation.
+
+Code wraps each stage of a calculation in `Metrics.stage(name, command)`. The stages
+are parse, dispatch, execute, history_append and output. Each (stage, command) pair
+gets a LatencyHistogram with fixed power-of-two buckets from 1 microsecond to about
+16 seconds, so recording a sample costs one bisect and no allocation.
+
+Instrumentation is off by default. While it is off, `Metrics.stage` returns a shared
+no-op context manager and does nothing else. `Metrics.render()` formats every
+histogram in the Prometheus text exposition format, and `Metrics.start_exporter`
+writes that text to a file at a fixed interval.
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+BUCKET_BOUNDS = [1e-6 * 2 ** exponent for exponent in range(25)]
+DEFAULT_EXPORT_INTERVAL = 10.0
+METRIC_NAME = "calculator_stage_seconds"
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with count, sum, min and max.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """
+        Adds one latency sample.
+        """
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket holding it, capped at the max.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.99.
+
+        Returns:
+            float: Latency in seconds (0.0 when empty).
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for position, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                bound = BUCKET_BOUNDS[position] if position < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean latency in seconds (0.0 when empty).
+        """
+        return self.total / self.count if self.count else 0.0
+
+
+class _StageTimer:
+    """
+    Context manager that records the time spent in its block.
+    """
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """
+    Shared no-op context manager used while instrumentation is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Application-wide registry of per-stage, per-command latency histograms.
+    """
+
+    _enabled = False
+    _histograms = {}
+    _lock = threading.Lock()
+    _exporter = None
+    _exporter_stop = None
+
+    @classmethod
+    def enable(cls, enabled: bool = True):
+        """
+        Turns instrumentation on or off. Recorded histograms are kept.
+        """
+        cls._enabled = enabled
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        """
+        Returns True while instrumentation is recording.
+        """
+        return cls._enabled
+
+    @classmethod
+    def histogram(cls, stage: str, command: str = "") -> LatencyHistogram:
+        """
+        Returns the histogram for a stage and command, creating it on first use.
+        """
+        key = (stage, command)
+        histogram = cls._histograms.get(key)
+        if histogram is None:
+            with cls._lock:
+                histogram = cls._histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    @classmethod
+    def stage(cls, stage: str, command: str = ""):
+        """
+        Returns a context manager timing one stage; a no-op while disabled.
+
+        Args:
+            stage (str): Stage name, e.g. "execute".
+            command (str): Operation name the stage belongs to, if any.
+        """
+        if not cls._enabled:
+            return _NULL_TIMER
+        return _StageTimer(cls.histogram(stage, command))
+
+    @classmethod
+    def observe(cls, stage: str, seconds: float, command: str = ""):
+        """
+        Records a latency measured elsewhere (e.g. inside a worker process).
+        """
+        if cls._enabled:
+            cls.histogram(stage, command).record(seconds)
+
+    @classmethod
+    def _sorted_histograms(cls) -> list:
+        """
+        Returns the ((stage, command), histogram) pairs, copied under the lock so that a
+        stage recorded concurrently cannot change the dict while it is iterated.
+        """
+        with cls._lock:
+            histograms = dict(cls._histograms)
+        return sorted(histograms.items())
+
+    @classmethod
+    def summary(cls) -> list:
+        """
+        Returns one dict per histogram with its count, mean, p50, p99 and max in seconds.
+        """
+        rows = []
+        for (stage, command), histogram in cls._sorted_histograms():
+            rows.append({"stage": stage, "command": command, "count": histogram.count,
+                         "mean": histogram.mean, "p50": histogram.percentile(0.5),
+                         "p99": histogram.percentile(0.99), "max": histogram.max})
+        return rows
+
+    @classmethod
+    def render(cls) -> str:
+        """
+        Formats every histogram in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {METRIC_NAME} Latency of calculator hot-path stages.",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        for (stage, command), histogram in cls._sorted_histograms():
+            labels = f'stage="{stage}",command="{command}"'
+            cumulative = 0
+            for bound, bucket in zip(BUCKET_BOUNDS + ["+Inf"], list(histogram.buckets)):
+                cumulative += bucket
+                le = bound if isinstance(bound, str) else f"{bound:.6g}"
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.total:.9f}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def export(cls, path: str):
+        """
+        Writes the rendered metrics to `path`, replacing it atomically.
+        """
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as stream:
+            stream.write(cls.render())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def start_exporter(cls, path: str, interval: float = DEFAULT_EXPORT_INTERVAL):
+        """
+        Starts a background thread that exports the metrics every `interval` seconds.
+
+        Args:
+            path (str): Metrics file path.
+            interval (float): Seconds between exports.
+        """
+        cls.stop_exporter()
+        stop = threading.Event()
+
+        def export_periodically():
+            while not stop.wait(interval):
+                cls.export(path)
+            cls.export(path)
+
+        cls._exporter_stop = stop
+        cls._exporter = threading.Thread(target=export_periodically, daemon=True)
+        cls._exporter.start()
+        logging.info(f"Exporting metrics to {path} every {interval}s")
+
+    @classmethod
+    def stop_exporter(cls):
+        """
+        Stops the exporter thread after a final export. Safe to call when none is running.
+        """
+        if cls._exporter is not None:
+            cls._exporter_stop.set()
+            cls._exporter.join()
+            cls._exporter = None
+            cls._exporter_stop = None
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops every recorded histogram.
+        """
+        with cls._lock:
+            cls._histograms = {}
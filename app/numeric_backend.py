@@ -0,0 +1,130 @@
+"""
+This module provides the numeric backends that plugins can compute with.
+
+- "decimal": exact `decimal.Decimal` arithmetic using the current context precision.
+- "float": native float64 arithmetic, much faster but with binary rounding.
+- "fraction": exact rational arithmetic with `fractions.Fraction`.
+
+Built-in plugins only use operators, so they run unchanged on any backend. The
+session backend is set with NumericBackend.configure (or the NUMERIC_BACKEND
+environment variable), and individual calculations can override it. History
+rows record the backend that produced them. Values are persisted as text, and
+`restore_backend_types` turns the parsed text back into each row's type.
+"""
+
+import os
+from decimal import Decimal, InvalidOperation, getcontext
+from fractions import Fraction
+
+BACKENDS = ("decimal", "float", "fraction")
+DEFAULT_BACKEND = "decimal"
+NUMERIC_COLUMNS = ("operand1", "operand2", "result")
+
+
+def validate_backend(name: str) -> str:
+    """
+    Returns the backend name, lowercased.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = name.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown numeric backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return backend
+
+
+def parse_operand(text: str, backend: str):
+    """
+    Parses user input into the backend's number type.
+
+    Raises:
+        decimal.InvalidOperation: If the text is not a number, whatever the backend.
+    """
+    if backend == "decimal":
+        return Decimal(text)
+    try:
+        return float(text) if backend == "float" else Fraction(text)
+    except (ValueError, ZeroDivisionError) as error:
+        raise InvalidOperation(f"Invalid {backend} number: {text}") from error
+
+
+def parse_number(text: str):
+    """
+    Parses persisted number text: "n/d" as a Fraction, anything else as an exact Decimal.
+
+    An empty field is read as NaN, which is how older history files saved it.
+    """
+    if not text:
+        return Decimal("NaN")
+    return Fraction(text) if "/" in text else Decimal(text)
+
+
+def to_backend(value, backend: str):
+    """
+    Converts a parsed Decimal or Fraction to the number type of `backend`.
+    """
+    if backend == "float":
+        return float(value)
+    if backend == "fraction":
+        return value if isinstance(value, Fraction) else Fraction(value)
+    return value
+
+
+def restore_backend_types(columns: dict) -> dict:
+    """
+    Converts the numeric values of non-decimal rows to their backend's type, in place.
+
+    Args:
+        columns (dict): History columns whose numbers were parsed with `parse_number`.
+
+    Returns:
+        dict: The same columns.
+    """
+    if not set(columns["backend"]) - {DEFAULT_BACKEND}:
+        return columns
+    for row, backend in enumerate(columns["backend"]):
+        if backend != DEFAULT_BACKEND:
+            for name in NUMERIC_COLUMNS:
+                columns[name][row] = to_backend(columns[name][row], backend)
+    return columns
+
+
+class NumericBackend:
+    """
+    Holds the session's numeric backend.
+    """
+
+    _backend = None
+
+    @classmethod
+    def configure(cls, backend: str = None, precision: int = None):
+        """
+        Sets the session backend and, optionally, the Decimal context precision.
+
+        Args:
+            backend (str): "decimal", "float" or "fraction". None keeps the current backend.
+            precision (int): Significant digits for Decimal arithmetic.
+        """
+        if backend is not None:
+            cls._backend = validate_backend(backend)
+        if precision is not None:
+            if precision < 1:
+                raise ValueError("Decimal precision must be at least 1.")
+            getcontext().prec = precision
+
+    @classmethod
+    def current(cls) -> str:
+        """
+        Returns the session backend, falling back to NUMERIC_BACKEND and then "decimal".
+        """
+        if cls._backend is not None:
+            return cls._backend
+        return validate_backend(os.getenv("NUMERIC_BACKEND", DEFAULT_BACKEND))
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets the configured session backend.
+        """
+        cls._backend = None
@@ -3,36 +3,362 @@ This module provides PandasFacade, a utility class for handling
 calculation history stored in a pandas DataFrame.
 """
 
-import pandas as pd
+import os
+import shutil
+import sys
+import tempfile
+import weakref
+from bisect import bisect_left, bisect_right
+from app.lazy_import import lazy_import
+from app.history_columns import ROW_BYTES, SCALE, HistoryColumns
+from app.history_format import HistorySegment, is_binary_history, merge_history, write_history
+from app.history_loader import load_csv
+from app.history_query import Query, SegmentSource, StoreSource, execute_query, explain_query
+from app.numeric_backend import DEFAULT_BACKEND
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+COLUMNS = ["operation", "operand1", "operand2", "result", "backend"]
+# Share of the in-memory row limit kept in memory after a spill.
+RETAINED_SHARE = 0.75
+# Largest number of spilled rows decoded at once while streaming them out.
+PIECE_ROWS = 100_000
+
+
+def _frame_from(columns: dict, index=None) -> "pd.DataFrame":
+    """
+    Build a history DataFrame from column lists without copying them twice.
+    """
+    # np.fromiter avoids numpy probing every Decimal as a possible sequence.
+    return pd.DataFrame({
+        name: np.fromiter(values, dtype=object, count=len(values))
+        for name, values in columns.items()
+    }, columns=COLUMNS, index=index, copy=False)
+
+
+def _row_bytes(store: HistoryColumns) -> int:
+    """
+    Estimate the memory held by one in-memory row, overflow values included.
+    """
+    return store.nbytes() // len(store) if len(store) else ROW_BYTES
 
 class PandasFacade:
     """
     A wrapper for managing calculation records in a pandas DataFrame.
+
+    Records are appended to a typed column store (HistoryColumns): operation codes and
+    fixed-point numbers in arrays, so adding a record costs amortized O(1).
+    The DataFrame is only built when `dataframe` is read and is cached until the
+    history changes again. History loaded from a binary file stays memory-mapped as a
+    leading segment and is only decoded when its rows are actually needed.
+
+    A per-operation index of in-memory row numbers is kept up to date on add, delete
+    and clear, so filtering by operation costs O(matching rows) instead of a full scan.
+
+    An optional retention policy (`configure_retention`) bounds the in-memory rows by
+    count or by estimated bytes. When the limit is exceeded, the oldest quarter of the
+    in-memory rows is spilled to a binary segment in a temporary directory. Reads,
+    filters and saves combine the spilled segments with the in-memory rows. Spilled
+    segments are merged as they accumulate, so only a logarithmic number of files
+    stays open. Their rows are memory-mapped, not held in memory.
     """
 
     def __init__(self):
         """
-        Initialize the DataFrame with predefined columns.
+        Initialize the empty column store.
+        """
+        self._store = HistoryColumns()
+        # Loaded `.calchist` file, then spilled segments, then `_store`, in row order.
+        self._segment = None
+        self._spilled = []
+        self._spilled_rows = 0
+        self._frame = None
+        # Operation name -> sorted row numbers in `_store`; None until first needed.
+        self._index = {}
+        # Deletes, clears and loads made so far, and (removal number, row) for each one
+        # whose row is below every later one; incremental saves only need those.
+        self._removal_count = 0
+        self._removals = []
+        self._max_rows = None
+        self._max_bytes = None
+        self._spill_threshold = sys.maxsize
+        self._spill_parent = None
+        self._spill_directory = None
+        self._spill_sequence = 0
+
+    def configure_retention(self, max_rows: int = None, max_bytes: int = None, spill_directory: str = None):
+        """
+        Bound the rows kept in memory; older rows are spilled to disk.
+
+        Args:
+            max_rows (int): Most rows kept in memory, or None for no row limit.
+            max_bytes (int): Most estimated bytes of rows kept in memory, or None.
+            spill_directory (str): Parent directory of the spill files; defaults to
+                the system temporary directory.
+
+        Raises:
+            ValueError: If a limit is below 1.
+        """
+        if (max_rows is not None and max_rows < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("History retention limits must be at least 1.")
+        self._max_rows, self._max_bytes = max_rows, max_bytes
+        self._spill_parent = spill_directory
+        self._update_threshold(_row_bytes(self._store))
+        self._enforce_retention()
+
+    def _update_threshold(self, row_bytes: int):
+        """
+        Convert the retention limits into a number of in-memory rows.
+        """
+        limits = [sys.maxsize]
+        if self._max_rows is not None:
+            limits.append(self._max_rows)
+        if self._max_bytes is not None:
+            limits.append(max(1, self._max_bytes // row_bytes))
+        self._spill_threshold = min(limits)
+
+    def _enforce_retention(self):
+        if len(self._store) > self._spill_threshold:
+            self._spill()
+
+    def _spill(self):
+        """
+        Move the oldest in-memory rows to a new spilled segment.
+        """
+        count = len(self._store) - int(self._spill_threshold * RETAINED_SHARE)
+        row_bytes = _row_bytes(self._store)
+        path = self._next_spill_path()
+        self._store.write(path, 0, count)
+        self._store.delete_prefix(count)
+        self._spilled.append(HistorySegment(path))
+        self._spilled_rows += count
+        self._index = None
+        self._frame = None
+        if self._max_bytes is not None:
+            self._update_threshold(row_bytes)
+        # Keep segment sizes at least doubling from newest to oldest.
+        while len(self._spilled) > 1 and len(self._spilled[-2]) < 2 * len(self._spilled[-1]):
+            newer, older = self._spilled.pop(), self._spilled.pop()
+            path = self._next_spill_path()
+            merge_history(path, [older, newer])
+            self._spilled.append(HistorySegment(path))
+            os.remove(older.path)
+            os.remove(newer.path)
+
+    def _next_spill_path(self) -> str:
+        if self._spill_directory is None:
+            self._spill_directory = tempfile.mkdtemp(prefix="history-spill-", dir=self._spill_parent)
+            weakref.finalize(self, shutil.rmtree, self._spill_directory, True)
+        self._spill_sequence += 1
+        return os.path.join(self._spill_directory, f"segment-{self._spill_sequence:06d}.calchist")
+
+    def _drop_spilled(self):
+        """
+        Forget the spilled segments and delete their files.
+        """
+        for segment in self._spilled:
+            os.remove(segment.path)
+        self._spilled = []
+        self._spilled_rows = 0
+
+    def _segments(self) -> list:
+        """
+        The memory-mapped segments that precede the in-memory rows, in row order.
+        """
+        return ([self._segment] if self._segment is not None else []) + self._spilled
+
+    def _segment_rows(self) -> int:
+        return (len(self._segment) if self._segment is not None else 0) + self._spilled_rows
+
+    def _pieces(self, start: int = 0):
+        """
+        Yield the history from row `start` onward as column dicts, decoding at most
+        PIECE_ROWS segment rows at a time.
+        """
+        offset = 0
+        for segment in self._segments():
+            for first in range(max(start - offset, 0), len(segment), PIECE_ROWS):
+                yield segment.to_columns(np.arange(first, min(first + PIECE_ROWS, len(segment))))
+            offset += len(segment)
+        yield self._store.to_columns(max(start - offset, 0))
+
+    def _decoded_columns(self) -> dict:
+        """
+        Return new column lists holding every row, spilled ones included.
+        """
+        columns = {name: [] for name in COLUMNS}
+        for piece in self._pieces():
+            for name in COLUMNS:
+                columns[name].extend(piece[name])
+        return columns
+
+    def storage_stats(self) -> dict:
+        """
+        Return how the rows are stored: memory_rows, memory_bytes (estimated),
+        segment_rows, spilled_segments and memory_limit (the current in-memory row
+        limit, or None).
+        """
+        return {
+            "memory_rows": len(self._store),
+            "memory_bytes": self._store.nbytes(),
+            "segment_rows": self._segment_rows(),
+            "spilled_segments": len(self._spilled),
+            "memory_limit": None if self._spill_threshold == sys.maxsize else self._spill_threshold,
+        }
+
+    def _materialize_segment(self):
+        """
+        Decode the memory-mapped segments (if any) into the in-memory column lists.
+        """
+        if self._segments():
+            store = HistoryColumns()
+            for segment in self._segments():
+                store.extend_segment(segment)
+            store.extend(self._store.to_columns())
+            self._store = store
+            self._segment = None
+            self._drop_spilled()
+            self._index = None
+
+    def _operation_index(self) -> dict:
+        """
+        Return the per-operation row index, building it with one scan if it is stale.
+        """
+        if self._index is None:
+            self._index = self._store.operation_rows()
+        return self._index
+
+    @property
+    def dataframe(self) -> "pd.DataFrame":
+        """
+        The calculation history as a DataFrame, materialized on first read.
+
+        Spilled rows are decoded into the frame, which is then not cached, so that
+        memory returns to the retention limit once the caller drops it.
         """
-        self.dataframe = pd.DataFrame(columns=["operation", "operand1", "operand2", "result"])
+        if self._spilled:
+            return _frame_from(self._decoded_columns())
+        if self._frame is None:
+            self._materialize_segment()
+            self._frame = _frame_from(self._store.to_columns())
+        return self._frame
+
+    @dataframe.setter
+    def dataframe(self, frame: "pd.DataFrame"):
+        self._store = HistoryColumns({name: frame[name].tolist() for name in COLUMNS if name in frame})
+        self._segment = None
+        self._drop_spilled()
+        self._frame = None
+        self._index = None
+        self._record_removal(0)
+        self._enforce_retention()
+
+    @property
+    def columns(self) -> dict:
+        """
+        The history columns, keyed by column name, as new lists decoded from the store
+        (and from every segment).
+        """
+        if self._spilled:
+            return self._decoded_columns()
+        self._materialize_segment()
+        return self._store.to_columns()
+
+    def load_columns(self, columns: dict):
+        """
+        Replace the history with the given columns.
+
+        Args:
+            columns (dict): Equal-length lists keyed by column name. Histories without
+                a backend column are treated as Decimal rows.
+        """
+        self._store = HistoryColumns(columns)
+        self._segment = None
+        self._drop_spilled()
+        self._frame = None
+        self._index = None
+        self._record_removal(0)
+        self._enforce_retention()
+
+    def _record_removal(self, row: int):
+        """
+        Record a destructive edit touching rows from `row` onward.
+
+        Earlier edits at or above `row` can no longer decide `is_prefix_unchanged`, so
+        they are dropped and the list stays no longer than the history.
+        """
+        self._removal_count += 1
+        while self._removals and self._removals[-1][1] >= row:
+            self._removals.pop()
+        self._removals.append((self._removal_count, row))
+
+    @property
+    def removal_count(self) -> int:
+        """
+        Number of destructive edits (deletes, clears and loads) made so far.
+        """
+        return self._removal_count
+
+    def is_prefix_unchanged(self, rows: int, removal_count: int) -> bool:
+        """
+        Check that the first `rows` records are untouched since `removal_count` edits had been made.
+
+        Args:
+            rows (int): Length of the prefix that must be unchanged.
+            removal_count (int): Value of `removal_count` when the prefix was observed.
+
+        Returns:
+            bool: True if no later edit removed or replaced a row below `rows`.
+        """
+        if removal_count > self._removal_count or rows > len(self):
+            return False
+        # Rows increase along `_removals`, so the first later edit touched the lowest row.
+        later = bisect_right(self._removals, removal_count, key=lambda removal: removal[0])
+        return later == len(self._removals) or self._removals[later][1] >= rows
+
+    def append_to_csv(self, path: str, start: int):
+        """
+        Append the records from row `start` onward to an existing CSV file, without a header.
+
+        Args:
+            path (str): CSV file that already holds the first `start` records.
+            start (int): First row to append.
+        """
+        for piece in self._pieces(start):
+            _frame_from(piece).to_csv(path, mode="a", header=False, index=False, na_rep="NaN")
+
+    def __len__(self) -> int:
+        return self._segment_rows() + len(self._store)
 
     def add_record(self, record: dict):
         """
         Append a new calculation record.
 
         Args:
-            record (dict): A dictionary containing operation details.
+            record (dict): A dictionary containing operation details. "backend"
+                defaults to "decimal".
         """
-        new_row = pd.DataFrame([record])
-        self.dataframe = pd.concat([self.dataframe, new_row], ignore_index=True)
+        self._store.append(record["operation"], record["operand1"], record["operand2"], record["result"],
+                           record.get("backend", DEFAULT_BACKEND))
+        self._frame = None
+        if self._index is not None:
+            self._index.setdefault(record["operation"], []).append(len(self._store) - 1)
+        if len(self._store) > self._spill_threshold:
+            self._spill()
 
     def clear(self):
         """
         Remove all entries from the calculation history.
         """
-        self.dataframe = pd.DataFrame(columns=self.dataframe.columns)
+        self._store = HistoryColumns()
+        self._segment = None
+        self._drop_spilled()
+        self._frame = None
+        self._index = {}
+        self._record_removal(0)
 
-    def filter_by_operation(self, operation: str) -> pd.DataFrame:
+    def filter_by_operation(self, operation: str) -> "pd.DataFrame":
         """
         Retrieve records filtered by operation type.
 
@@ -42,25 +368,107 @@ class PandasFacade:
         Returns:
             pd.DataFrame: Filtered records.
         """
-        return self.dataframe[self.dataframe["operation"] == operation]
+        tail_rows = self._operation_index().get(operation, [])
+        if not self._segments() and self._frame is not None:
+            return self._frame.iloc[tail_rows]
+        matched = {name: [] for name in COLUMNS}
+        index = []
+        offset = 0
+        for segment in self._segments():
+            # Only the matching rows of a memory-mapped segment are decoded.
+            segment_rows = segment.operation_positions(operation)
+            if len(segment_rows):
+                decoded = segment.to_columns(segment_rows)
+                for name in COLUMNS:
+                    matched[name].extend(decoded[name])
+                index.extend((segment_rows + offset).tolist())
+            offset += len(segment)
+        if tail_rows:
+            tail = self._store.take(tail_rows)
+            for name in COLUMNS:
+                matched[name].extend(tail[name])
+        index.extend(offset + row for row in tail_rows)
+        return _frame_from(matched, np.asarray(index, dtype=np.int64))
+
+    def _query_sources(self) -> list:
+        """
+        The segments and the in-memory rows as query sources, in row order.
+        """
+        sources = []
+        offset = 0
+        for segment in self._segments():
+            sources.append(SegmentSource(segment, offset))
+            offset += len(segment)
+        sources.append(StoreSource(self._store, self._operation_index(), offset))
+        return sources
+
+    def query(self, query: Query) -> "pd.DataFrame":
+        """
+        Run a history query on the stored columns; only the resulting rows are decoded.
+
+        Args:
+            query (Query): A parsed query.
+
+        Returns:
+            pd.DataFrame: Matching records in query order, indexed by history row.
+        """
+        rows, columns = execute_query(query, self._query_sources())
+        return _frame_from(columns, rows)
+
+    def explain(self, query: Query) -> str:
+        """
+        Describe how `query` would run over the current storage.
+        """
+        return explain_query(query, self._query_sources())
 
     def save_to_file(self, path: str):
         """
-        Save the DataFrame contents to a CSV file.
+        Save the history to a CSV file, or to the binary format for `.calchist` paths.
+
+        Spilled rows are streamed to the file piece by piece, or merged block by block
+        into a binary file, so saving does not load them all back into memory. In-memory
+        rows are written to a binary file straight from their typed arrays.
 
         Args:
             path (str): Destination file path.
         """
-        self.dataframe.to_csv(path, index=False)
+        segments = self._segments()
+        if not is_binary_history(path) and not self._spilled:
+            self.dataframe.to_csv(path, index=False, na_rep="NaN")
+        elif not is_binary_history(path):
+            mode = "w"
+            for piece in self._pieces():
+                _frame_from(piece).to_csv(path, mode=mode, header=mode == "w", index=False,
+                                          na_rep="NaN")
+                mode = "a"
+        elif not segments:
+            self._store.write(path)
+        elif len({segment.scale for segment in segments}) == 1:
+            tail_path = self._next_spill_path()
+            if segments[0].scale == SCALE:
+                self._store.write(tail_path)
+            else:
+                write_history(tail_path, self._store.to_columns(), segments[0].scale)
+            merge_history(path, segments + [HistorySegment(tail_path)])
+            os.remove(tail_path)
+        else:
+            write_history(path, self.columns)
 
-    def load_from_file(self, path: str):
+    def load_from_file(self, path: str, progress=None):
         """
-        Load records into the DataFrame from a CSV file.
+        Load records from a CSV file, or memory-map a `.calchist` binary history file.
+
+        CSV files are streamed in chunks and keep their exact Decimal values.
 
         Args:
-            path (str): Source CSV file path.
+            path (str): Source file path.
+            progress: Optional callable receiving (bytes read, total bytes) while a CSV loads.
         """
-        self.dataframe = pd.read_csv(path)
+        if is_binary_history(path):
+            self.clear()
+            self._segment = HistorySegment(path)
+        else:
+            self.load_columns(load_csv(path, progress=progress))
 
     def delete_record(self, index: int):
         """
@@ -68,10 +476,39 @@ class PandasFacade:
 
         Args:
             index (int): Row index to delete.
+
+        Returns:
+            bool: True if a record was deleted.
         """
-        if 0 <= index < len(self.dataframe):
-            self.dataframe.drop(index, inplace=True)
-            self.dataframe.reset_index(drop=True, inplace=True)
+        if 0 <= index < len(self):
+            # Rows held in segments are only deleted after decoding every row back into
+            # memory; the retention policy then spills them again.
+            spilled = index < self._segment_rows()
+            if spilled:
+                self._materialize_segment()
+            row = index - self._segment_rows()
+            self._unindex(row)
+            self._store.delete(row)
+            self._frame = None
+            self._record_removal(index)
+            if spilled:
+                self._enforce_retention()
             print(f"Deleted calculation at index {index}.")
-        else:
-            print(f"Invalid index: {index}. No record deleted.")
+            return True
+        print(f"Invalid index: {index}. No record deleted.")
+        return False
+
+    def _unindex(self, index: int):
+        """
+        Remove row `index` from the operation index and shift the rows after it down by one.
+        """
+        if self._index is None:
+            return
+        operation = self._store.operation(index)
+        rows = self._index[operation]
+        rows.pop(bisect_left(rows, index))
+        if not rows:
+            del self._index[operation]
+        for rows in self._index.values():
+            start = bisect_left(rows, index)
+            rows[start:] = [row - 1 for row in rows[start:]]
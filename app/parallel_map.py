@@ -0,0 +1,164 @@
+"""
+This module provides ParallelMap, an order-preserving parallel map of one plugin over
+many operand pairs.
+
+Sending one pair per pool task (the `mp` model) spends almost all of its time on the
+process hand-off. ParallelMap sends chunks instead and picks the chunk size at run
+time from two measurements kept per plugin:
+
+- item cost: worker-side execution seconds per pair, a moving average updated from
+  every returned chunk;
+- latency: the round-trip overhead of one pool task, measured with a small probe chunk
+  the first time a plugin is mapped.
+
+A chunk is sized so that the latency is about TARGET_OVERHEAD of its execution time.
+It is capped so that every worker still gets a couple of chunks, which keeps the cores
+evenly loaded towards the end of the run. Up to two chunks per worker are in flight.
+The results are written back by position. Chunks run each pair through the plugin's
+scalar `execute`, so results are exactly what the two-operand path returns, in any
+numeric backend. A pair that raises an arithmetic error holds the exception instead,
+as `mp` calculations do. With a single worker the pool can only add overhead, so the
+map runs in-process.
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from app.worker_pool import WorkerPool
+
+TARGET_OVERHEAD = 0.05
+PROBE_ITEMS = 32
+MAX_CHUNK_ITEMS = 100_000
+COST_SMOOTHING = 0.3
+
+
+def _map_chunk(command, operands1, operands2) -> tuple:
+    """
+    Worker-side entry point: runs `execute` over a chunk of pairs.
+
+    Returns:
+        tuple: (results, execution seconds). Failed pairs hold their ArithmeticError.
+    """
+    execute = command.execute
+    results = []
+    start = time.perf_counter()
+    for operand1, operand2 in zip(operands1, operands2):
+        try:
+            results.append(execute(operand1, operand2))
+        except ArithmeticError as error:
+            results.append(error)
+    return results, time.perf_counter() - start
+
+
+class ParallelMap:
+    """
+    Application-wide adaptive chunked map over the WorkerPool, with per-plugin tuning state.
+    """
+
+    _tuning = {}
+
+    @classmethod
+    def chunk_size(cls, operation: str, remaining: int, workers: int) -> int:
+        """
+        Returns the next chunk size for a plugin from its measured item cost and latency.
+
+        Args:
+            operation (str): Plugin name.
+            remaining (int): Pairs not yet submitted.
+            workers (int): Number of pool workers.
+        """
+        tuning = cls._tuning[operation]
+        item_seconds = max(tuning["item_seconds"], 1e-9)
+        ideal = tuning["latency"] / (TARGET_OVERHEAD * item_seconds)
+        balanced = math.ceil(remaining / (2 * workers))
+        return int(max(1, min(ideal, balanced, MAX_CHUNK_ITEMS, remaining)))
+
+    @classmethod
+    def _observe(cls, operation: str, items: int, seconds: float):
+        tuning = cls._tuning[operation]
+        cost = seconds / items
+        tuning["item_seconds"] += COST_SMOOTHING * (cost - tuning["item_seconds"])
+
+    @classmethod
+    def _probe(cls, command, operands1, operands2) -> list:
+        """
+        Runs a first small chunk alone to measure the pool round trip and the item cost.
+        """
+        start = time.perf_counter()
+        results, seconds = WorkerPool.submit(_map_chunk, command, operands1, operands2).result()
+        round_trip = time.perf_counter() - start
+        cls._tuning[command.operation_name] = {
+            "item_seconds": seconds / len(operands1),
+            "latency": max(round_trip - seconds, 0.0),
+            "chunk": len(operands1),
+            "chunks": 1,
+        }
+        return results
+
+    @classmethod
+    def map(cls, command, operands1, operands2) -> list:
+        """
+        Applies a plugin to every operand pair, in parallel when the pool has several workers.
+
+        Args:
+            command (Command): The plugin to run.
+            operands1: Sequence of first operands.
+            operands2: Sequence of second operands.
+
+        Returns:
+            list: Results in operand order; failed pairs hold their ArithmeticError.
+
+        Raises:
+            ValueError: If the operand sequences differ in length.
+        """
+        if len(operands1) != len(operands2):
+            raise ValueError("Operand sequences must have the same length.")
+        pairs = len(operands1)
+        workers = WorkerPool.worker_count()
+        if workers == 1 or pairs == 0:
+            return _map_chunk(command, operands1, operands2)[0]
+
+        operation = command.operation_name
+        results = [None] * pairs
+        position = 0
+        if operation not in cls._tuning:
+            position = min(PROBE_ITEMS, pairs)
+            results[:position] = cls._probe(command, operands1[:position], operands2[:position])
+        tuning = cls._tuning[operation]
+        tuning["chunk"] = tuning["chunks"] = 0
+
+        in_flight = deque()
+        while position < pairs or in_flight:
+            while position < pairs and len(in_flight) < 2 * workers:
+                size = cls.chunk_size(operation, pairs - position, workers)
+                future = WorkerPool.submit(_map_chunk, command, operands1[position:position + size],
+                                           operands2[position:position + size])
+                in_flight.append((future, position, size))
+                tuning["chunk"] = max(tuning["chunk"], size)
+                tuning["chunks"] += 1
+                position += size
+            future, start, size = in_flight.popleft()
+            chunk_results, seconds = future.result()
+            results[start:start + size] = chunk_results
+            cls._observe(operation, size, seconds)
+
+        logging.info(f"Parallel map {operation}: {pairs} pairs in {tuning['chunks']} chunks "
+                     f"(up to {tuning['chunk']}), {tuning['item_seconds'] * 1e6:.2f}us/item, "
+                     f"latency {tuning['latency'] * 1000:.3f}ms")
+        return results
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns a copy of the tuning state per plugin: item_seconds, latency, and the
+        largest chunk and chunk count of the last map.
+        """
+        return {operation: dict(tuning) for operation, tuning in cls._tuning.items()}
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets every plugin's measurements, so the next map probes again.
+        """
+        cls._tuning = {}
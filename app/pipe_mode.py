@@ -0,0 +1,159 @@
+"""
+This module provides the non-interactive pipe mode of the REPL.
+
+Piping a large input into the REPL costs far more per line than the calculations do.
+Every line pays for `input()`, a prompt, an unbuffered result line, and a chain of string
+tests before it reaches a calculation. `run_pipe` avoids all of this:
+
+- standard input is read in blocks of `block_size` bytes and split into lines per block;
+- each line's first word is looked up in a command table built once per session;
+- output goes through one BufferedOutput, flushed every `flush_lines` input lines
+  (0: once per input block) and at EOF. No prompts are written.
+
+Calculation lines `<operation> <num1> <num2>` take a direct path: parse, the result
+cache, the history, and one formatted line, with no per-line logging. Every other line
+runs its REPL handler with stdout redirected into the same buffer, so output keeps the
+input order. Blank lines are skipped and `exit` ends the input early.
+"""
+
+import contextlib
+import logging
+import sys
+import time
+from decimal import InvalidOperation
+from app.calculation import Calculation
+from app.calculations import Calculations
+from app.numeric_backend import NumericBackend, parse_operand
+from app.result_cache import ResultCache
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+DEFAULT_FLUSH_LINES = 4096
+
+
+class BufferedOutput:
+    """
+    Collects output text and writes it to a stream in one call per flush.
+
+    It implements `write` and `flush`, so `print` and `contextlib.redirect_stdout` accept it.
+    """
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: Text stream written on flush, e.g. sys.stdout.
+        """
+        self.stream = stream
+        self._parts = []
+        self.write = self._parts.append
+
+    def flush(self):
+        """
+        Writes the pending text to the stream and flushes it.
+        """
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts.clear()
+        self.stream.flush()
+
+
+def read_blocks(stream, block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    Yields the complete lines of a binary stream, one list per block read.
+
+    A line split across two blocks is carried over to the next one. The last line is
+    yielded even without a trailing newline. Invalid UTF-8 is replaced, so such a line
+    reaches the handlers as an unknown command instead of stopping the run.
+    """
+    pending = b""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        complete, newline, pending = (pending + block).rpartition(b"\n")
+        if newline:
+            yield complete.decode("utf-8", errors="replace").split("\n")
+    if pending:
+        yield [pending.decode("utf-8", errors="replace")]
+
+
+def calculation_handler(commands, name: str, write, fallback):
+    """
+    Returns the pipe-mode handler of one plugin's `<name> <num1> <num2>` lines.
+
+    The plugin is only loaded by the first line that uses it. Lines with other arguments
+    (backend or `mp` options, N-ary statistics) go to `fallback`, the REPL handler.
+
+    Args:
+        commands (Mapping): Command names mapped to command instances.
+        name (str): The plugin name.
+        write (callable): Output function, e.g. BufferedOutput.write.
+        fallback (callable): Handler of the plugin's other line forms.
+    """
+    command = None
+
+    def calculate(words):
+        nonlocal command
+        if len(words) != 3:
+            return fallback(words)
+        if command is None:
+            command = commands[name]
+        operand1, operand2 = words[1], words[2]
+        backend = NumericBackend.current()
+        try:
+            num1, num2 = parse_operand(operand1, backend), parse_operand(operand2, backend)
+            result = ResultCache.execute(command, num1, num2)
+        except InvalidOperation:
+            write("Error: One or both inputs are not valid numbers.\n")
+            return None
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            write(f"Unexpected error occurred: {error}\n")
+            return None
+        calculation = Calculation(num1, num2, command, backend)
+        calculation.result = result
+        Calculations.add_calculation(calculation)
+        write(f"{operand1} {name} {operand2} = {result}\n")
+        return None
+
+    return calculate
+
+
+def run_pipe(table: dict, fallback, stream=None, output: BufferedOutput = None,
+             block_size: int = DEFAULT_BLOCK_SIZE, flush_lines: int = DEFAULT_FLUSH_LINES) -> dict:
+    """
+    Runs every line of a binary stream through the command table until EOF or `exit`.
+
+    Args:
+        table (dict): First word of a line mapped to a handler of the split line. A
+            handler that returns a true value ends the input.
+        fallback (callable): Handler of lines whose first word is not in the table.
+        stream: Binary input stream; defaults to sys.stdin.buffer.
+        output (BufferedOutput): Output buffer; defaults to one over sys.stdout.
+        block_size (int): Bytes read from the stream at a time.
+        flush_lines (int): Input lines between output flushes; 0 flushes once per block.
+
+    Returns:
+        dict: lines (lines read, blank ones included), seconds and lines_per_sec.
+    """
+    stream = sys.stdin.buffer if stream is None else stream
+    output = BufferedOutput(sys.stdout) if output is None else output
+    lookup = table.get
+    count = 0
+    finished = False
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        for lines in read_blocks(stream, block_size):
+            for line in lines:
+                count += 1
+                words = line.split()
+                if words and lookup(words[0], fallback)(words):
+                    finished = True
+                    break
+                if flush_lines and count % flush_lines == 0:
+                    output.flush()
+            output.flush()
+            if finished:
+                break
+    seconds = time.perf_counter() - start
+    summary = {"lines": count, "seconds": seconds, "lines_per_sec": count / seconds if seconds else 0.0}
+    logging.info(f"Pipe mode: {count} lines in {seconds:.3f}s ({summary['lines_per_sec']:.0f} lines/sec)")
+    return summary
@@ -0,0 +1,116 @@
+"""
+This module provides PluginRegistry, the lazily importing command registry returned by
+`discover_plugins()`, and the on-disk manifest cache that backs it.
+
+The manifest maps command names to their plugin module and class and is keyed by the
+plugin file names and modification times. While it is valid, startup only stats the
+plugin files; each plugin module is imported the first time its command is looked up.
+"""
+
+import importlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+
+DEFAULT_MANIFEST_PATH = os.path.join(".cache", "plugin_manifest.json")
+PLUGIN_SUFFIX = "_command.py"
+
+
+class PluginRegistry(Mapping):
+    """
+    Read-only mapping of command names to command instances, imported on first access.
+    """
+
+    def __init__(self, entries: OrderedDict, package: str = "app.plugins"):
+        """
+        Args:
+            entries (OrderedDict): Command name -> (module name, class name).
+            package (str): Package the plugin modules live in.
+        """
+        self._entries = entries
+        self._package = package
+        self._instances = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._instances:
+            module_name, class_name = self._entries[name]
+            module = importlib.import_module(f"{self._package}.{module_name}")
+            self._instances[name] = getattr(module, class_name)()
+            logging.info(f"Plugin loaded: {module_name}")
+        return self._instances[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _fingerprint(plugin_path: str) -> dict:
+    """
+    Maps each plugin file name to its modification time in nanoseconds.
+    """
+    return {
+        entry.name: entry.stat().st_mtime_ns
+        for entry in sorted(os.scandir(plugin_path), key=lambda entry: entry.name)
+        if entry.name.endswith(PLUGIN_SUFFIX)
+    }
+
+
+def _build_entries(fingerprint: dict, package: str) -> OrderedDict:
+    """
+    Imports every plugin once to validate it and returns the manifest entries.
+    """
+    entries = OrderedDict()
+    for file in fingerprint:
+        module_name = file[:-3]
+        class_name = module_name[:-8].capitalize() + "Command"
+        try:
+            module = importlib.import_module(f"{package}.{module_name}")
+            getattr(module, class_name)
+            entries[module_name[:-8]] = (module_name, class_name)
+        except (ImportError, AttributeError) as e:
+            logging.error(f"Error loading plugin {module_name}: {e}")
+    return entries
+
+
+def load_registry(plugin_path: str, package: str = "app.plugins", manifest_path: str = None) -> PluginRegistry:
+    """
+    Returns a registry for the plugins in `plugin_path`, using the manifest when it is current.
+
+    Args:
+        plugin_path (str): Directory containing the `*_command.py` plugin files.
+        package (str): Import package of the plugin modules.
+        manifest_path (str): Manifest cache location. Defaults to the PLUGIN_MANIFEST
+            environment variable, then `.cache/plugin_manifest.json`.
+
+    Returns:
+        PluginRegistry: The lazily importing registry.
+    """
+    manifest_path = manifest_path or os.getenv("PLUGIN_MANIFEST", DEFAULT_MANIFEST_PATH)
+    fingerprint = _fingerprint(plugin_path)
+
+    try:
+        with open(manifest_path, encoding="utf-8") as stream:
+            manifest = json.load(stream)
+        if manifest.get("package") == package and manifest.get("files") == fingerprint:
+            entries = OrderedDict((name, tuple(entry)) for name, entry in manifest["plugins"].items())
+            return PluginRegistry(entries, package)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    entries = _build_entries(fingerprint, package)
+    try:
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as stream:
+            json.dump({"package": package, "files": fingerprint, "plugins": entries}, stream)
+        logging.info(f"Plugin manifest rebuilt: {manifest_path}")
+    except OSError as e:
+        logging.warning(f"Could not write plugin manifest {manifest_path}: {e}")
+
+    return PluginRegistry(entries, package)
@@ -4,7 +4,10 @@ This module defines the `DivideCommand` class for performing division operations
 """
 
 from decimal import Decimal, DivisionByZero
-from app.command import Command
+from app.lazy_import import lazy_import
+from app.command import Command, as_batch_arrays
+
+np = lazy_import("numpy")
 
 class DivideCommand(Command):
     """
@@ -12,6 +15,7 @@ class DivideCommand(Command):
     Implements the `execute` and `execute_multiprocessing` methods.
     """
     operation_name = "divide"
+    pure = True
 
     def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
         """
@@ -45,4 +49,26 @@ class DivideCommand(Command):
             result = self.execute(num1, num2)
             result_queue.put(result)
         except DivisionByZero as e:
-            result_queue.put(e)
\ No newline at end of file
+            result_queue.put(e)
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Divides many pairs of numbers at once.
+
+        Args:
+            operands1: Sequence of numerators.
+            operands2: Sequence of denominators.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise quotients, masked where the denominator is zero
+            or the quotient is undefined (such as Infinity / Infinity).
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        zero_divisors = numbers2 == 0
+        one = Decimal(1) if backend == "decimal" else 1.0
+        try:
+            quotients = numbers1 / np.where(zero_divisors, one, numbers2)
+        except ArithmeticError:
+            return super().execute_batch(operands1, operands2, backend)
+        return np.ma.masked_array(quotients, mask=zero_divisors)
@@ -0,0 +1,61 @@
+"""
+This module defines the MaxCommand class to find the largest of two or more numbers.
+"""
+
+from decimal import Decimal
+from app.lazy_import import lazy_import
+from app.command import StatisticCommand, as_batch_arrays
+from app.running_stats import RunningStats
+
+np = lazy_import("numpy")
+
+class MaxCommand(StatisticCommand):
+    """
+    Command to find the largest of decimal numbers.
+    """
+    operation_name = "max"
+
+    def statistic(self, stats: RunningStats) -> Decimal:
+        """
+        Returns the largest accumulated value.
+        """
+        return stats.maximum()
+
+    def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
+        """
+        Returns the largest of two numbers.
+
+        Args:
+            num1 (Decimal): First number.
+            num2 (Decimal): Second number.
+
+        Returns:
+            Decimal: The largest number.
+        """
+        return max(num1, num2)
+
+    def execute_multiprocessing(self, num1: Decimal, num2: Decimal, result_queue):
+        """
+        Finds the largest number using multiprocessing.
+
+        Args:
+            num1 (Decimal): First number.
+            num2 (Decimal): Second number.
+            result_queue (multiprocessing.Queue): Queue to store the result.
+        """
+        result_queue.put(self.execute(num1, num2))
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Finds the largest of many pairs of numbers at once.
+
+        Args:
+            operands1: Sequence of first numbers.
+            operands2: Sequence of second numbers.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise maximums.
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        return np.ma.masked_array(np.maximum(numbers1, numbers2), mask=False)
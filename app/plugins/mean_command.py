@@ -1,16 +1,26 @@
 """
-This module defines the MeanCommand class to compute the mean of two numbers.
+This module defines the MeanCommand class to compute the mean of two or more numbers.
 """
 
 from decimal import Decimal
-from app.command import Command
+from app.lazy_import import lazy_import
+from app.command import StatisticCommand, as_batch_arrays
+from app.running_stats import RunningStats
 
-class MeanCommand(Command):
+np = lazy_import("numpy")
+
+class MeanCommand(StatisticCommand):
     """
-    Command to calculate the arithmetic mean (average) of two decimal numbers.
+    Command to calculate the arithmetic mean (average) of decimal numbers.
     """
     operation_name = "mean"
 
+    def statistic(self, stats: RunningStats) -> Decimal:
+        """
+        Returns the mean of the accumulated values.
+        """
+        return stats.mean()
+
     def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
         """
         Calculates the mean of two numbers.
@@ -22,7 +32,7 @@ class MeanCommand(Command):
         Returns:
             Decimal: The calculated mean value.
         """
-        return (num1 + num2) / Decimal(2)
+        return (num1 + num2) / 2
 
     def execute_multiprocessing(self, num1: Decimal, num2: Decimal, result_queue):
         """
@@ -35,3 +45,18 @@ class MeanCommand(Command):
         """
         result = self.execute(num1, num2)
         result_queue.put(result)
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Calculates the mean of many pairs of numbers at once.
+
+        Args:
+            operands1: Sequence of first numbers.
+            operands2: Sequence of second numbers.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise means.
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        return np.ma.masked_array((numbers1 + numbers2) / 2, mask=False)
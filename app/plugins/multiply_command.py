@@ -4,7 +4,10 @@ This module defines the `MultiplyCommand` class for performing multiplication op
 """
 
 from decimal import Decimal
-from app.command import Command
+from app.lazy_import import lazy_import
+from app.command import Command, as_batch_arrays
+
+np = lazy_import("numpy")
 
 class MultiplyCommand(Command):
     """
@@ -12,6 +15,7 @@ class MultiplyCommand(Command):
     Implements the `execute` and `execute_multiprocessing` methods.
     """
     operation_name = "multiply"
+    pure = True
 
     def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
         """
@@ -37,4 +41,24 @@ class MultiplyCommand(Command):
             result_queue (multiprocessing.Queue): Queue to store the result.
         """
         result = self.execute(num1, num2)
-        result_queue.put(result)
\ No newline at end of file
+        result_queue.put(result)
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Multiplies many pairs of numbers at once.
+
+        Args:
+            operands1: Sequence of first numbers.
+            operands2: Sequence of second numbers.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise products, masked where the product overflows
+            or is undefined.
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        try:
+            products = numbers1 * numbers2
+        except ArithmeticError:
+            return super().execute_batch(operands1, operands2, backend)
+        return np.ma.masked_array(products, mask=False)
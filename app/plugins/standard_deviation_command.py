@@ -1,20 +1,31 @@
 """
-This module defines the StandardDeviationCommand class to compute the standard deviation of two numbers.
+This module defines the `Standard_deviationCommand` class to compute the standard deviation of two or more numbers.
 """
 
 from decimal import Decimal
-from app.command import Command
-import math
+from app.lazy_import import lazy_import
+from app.command import StatisticCommand, as_batch_arrays
+from app.running_stats import RunningStats
 
-class Standard_deviationCommand(Command):
+np = lazy_import("numpy")
+
+class Standard_deviationCommand(StatisticCommand):
     """
-    Command to calculate the standard deviation of two decimal numbers.
+    Command to calculate the population standard deviation of decimal numbers.
     """
     operation_name = "standard_deviation"
 
+    def statistic(self, stats: RunningStats) -> Decimal:
+        """
+        Returns the population standard deviation of the accumulated values.
+        """
+        return stats.standard_deviation()
+
     def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
         """
-        Computes the sample standard deviation of two numbers.
+        Computes the population standard deviation of two numbers.
+
+        For two values the deviation reduces to |num1 - num2| / 2, which stays exact in Decimal.
 
         Args:
             num1 (Decimal): First number.
@@ -23,11 +34,7 @@ class Standard_deviationCommand(Command):
         Returns:
             Decimal: The computed standard deviation.
         """
-        # Convert Decimal to float for math.sqrt
-        mean_value = (num1 + num2) / Decimal(2)
-        variance = ((num1 - mean_value) ** 2 + (num2 - mean_value) ** 2) / Decimal(2)
-        std_dev = Decimal(math.sqrt(float(variance)))
-        return std_dev
+        return abs(num1 - num2) / 2
 
     def execute_multiprocessing(self, num1: Decimal, num2: Decimal, result_queue):
         """
@@ -40,3 +47,20 @@ class Standard_deviationCommand(Command):
         """
         result = self.execute(num1, num2)
         result_queue.put(result)
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Computes the standard deviation of many pairs of numbers at once.
+
+        For two values the deviation reduces to |num1 - num2| / 2, so no square root is needed.
+
+        Args:
+            operands1: Sequence of first numbers.
+            operands2: Sequence of second numbers.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise standard deviations.
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        return np.ma.masked_array(abs(numbers1 - numbers2) / 2, mask=False)
@@ -5,7 +5,10 @@ This module defines the `SubtractCommand` class for performing subtraction opera
 """
 
 from decimal import Decimal
-from app.command import Command
+from app.lazy_import import lazy_import
+from app.command import Command, as_batch_arrays
+
+np = lazy_import("numpy")
 
 class SubtractCommand(Command):
     """
@@ -13,6 +16,7 @@ class SubtractCommand(Command):
     Implements the `execute` and `execute_multiprocessing` methods.
     """
     operation_name = "subtract"
+    pure = True
 
     def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
         """
@@ -39,3 +43,18 @@ class SubtractCommand(Command):
         """
         result = self.execute(num1, num2)
         result_queue.put(result)
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Subtracts many pairs of numbers at once.
+
+        Args:
+            operands1: Sequence of first numbers.
+            operands2: Sequence of second numbers.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise differences (operands1 - operands2).
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        return np.ma.masked_array(numbers1 - numbers2, mask=False)
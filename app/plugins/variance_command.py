@@ -0,0 +1,63 @@
+"""
+This module defines the VarianceCommand class to compute the variance of two or more numbers.
+"""
+
+from decimal import Decimal
+from app.lazy_import import lazy_import
+from app.command import StatisticCommand, as_batch_arrays
+from app.running_stats import RunningStats
+
+np = lazy_import("numpy")
+
+class VarianceCommand(StatisticCommand):
+    """
+    Command to calculate the population variance of decimal numbers.
+    """
+    operation_name = "variance"
+
+    def statistic(self, stats: RunningStats) -> Decimal:
+        """
+        Returns the population variance of the accumulated values.
+        """
+        return stats.variance()
+
+    def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
+        """
+        Computes the population variance of two numbers, ((num1 - num2) / 2) ** 2.
+
+        Args:
+            num1 (Decimal): First number.
+            num2 (Decimal): Second number.
+
+        Returns:
+            Decimal: The computed variance.
+        """
+        half_difference = (num1 - num2) / 2
+        return half_difference * half_difference
+
+    def execute_multiprocessing(self, num1: Decimal, num2: Decimal, result_queue):
+        """
+        Executes the variance calculation using multiprocessing.
+
+        Args:
+            num1 (Decimal): First number.
+            num2 (Decimal): Second number.
+            result_queue (multiprocessing.Queue): Queue to store the result.
+        """
+        result_queue.put(self.execute(num1, num2))
+
+    def execute_batch(self, operands1, operands2, backend: str = "decimal") -> "np.ma.MaskedArray":
+        """
+        Computes the variance of many pairs of numbers at once.
+
+        Args:
+            operands1: Sequence of first numbers.
+            operands2: Sequence of second numbers.
+            backend (str): "decimal" for exact results, "float" for float64 results.
+
+        Returns:
+            np.ma.MaskedArray: The element-wise variances.
+        """
+        numbers1, numbers2 = as_batch_arrays(operands1, operands2, backend)
+        half_differences = (numbers1 - numbers2) / 2
+        return np.ma.masked_array(half_differences * half_differences, mask=False)
@@ -0,0 +1,113 @@
+"""
+This module provides ResultCache, a bounded LRU cache of results for pure plugin operations.
+
+A command opts in by setting `pure = True`, meaning its result depends only on the
+operation, the two operands and the active Decimal context. Cache keys use the exact
+text and type of both operands, so Decimal("1.0") and Decimal("1") (which format
+results differently) never share an entry, and neither do the Decimal and float
+backends. The key also holds the context's enabled traps, since a trapped signal
+raises where an untrapped one returns a result; the sticky status flags are left
+out, as they record past operations rather than change the result.
+"""
+
+import os
+from collections import OrderedDict
+from decimal import Decimal, getcontext
+from app.metrics import Metrics
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class ResultCache:
+    """
+    Application-wide memo of (operation, operand1, operand2) -> result with LRU eviction.
+    """
+
+    _entries = OrderedDict()
+    _max_size = None
+    _stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def configure(cls, max_size: int = None):
+        """
+        Sets the cache capacity and empties the cache.
+
+        Args:
+            max_size (int): Maximum number of entries; 0 disables caching. Defaults to the
+                RESULT_CACHE_SIZE environment variable, then 1024.
+        """
+        cls._max_size = max_size
+        cls.clear()
+
+    @classmethod
+    def max_size(cls) -> int:
+        """
+        Returns the configured capacity.
+        """
+        if cls._max_size is not None:
+            return cls._max_size
+        return int(os.getenv("RESULT_CACHE_SIZE", str(DEFAULT_CACHE_SIZE)))
+
+    @staticmethod
+    def _key(command, num1: Decimal, num2: Decimal) -> tuple:
+        context = getcontext()
+        traps = tuple(signal.__name__ for signal, enabled in context.traps.items() if enabled)
+        return (command.operation_name, type(num1).__name__, type(num2).__name__, str(num1), str(num2),
+                context.prec, context.rounding, context.Emin, context.Emax, context.clamp, traps)
+
+    @classmethod
+    def execute(cls, command, num1: Decimal, num2: Decimal) -> Decimal:
+        """
+        Returns the command's result, serving pure commands from the cache when possible.
+
+        Exceptions raised by the command propagate and are never cached.
+
+        Args:
+            command (Command): The plugin to run.
+            num1 (Decimal): The first number.
+            num2 (Decimal): The second number.
+
+        Returns:
+            Decimal: Result of the operation.
+        """
+        max_size = cls.max_size()
+        if not getattr(command, "pure", False) or max_size <= 0:
+            with Metrics.stage("execute", command.operation_name):
+                return command.execute(num1, num2)
+
+        key = cls._key(command, num1, num2)
+        entries = cls._entries
+        if key in entries:
+            entries.move_to_end(key)
+            cls._stats["hits"] += 1
+            return entries[key]
+
+        cls._stats["misses"] += 1
+        with Metrics.stage("execute", command.operation_name):
+            result = command.execute(num1, num2)
+        entries[key] = result
+        while len(entries) > max_size:
+            entries.popitem(last=False)
+            cls._stats["evictions"] += 1
+        return result
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns hit/miss/eviction counters, the hit rate and the current size.
+        """
+        lookups = cls._stats["hits"] + cls._stats["misses"]
+        return {
+            **cls._stats,
+            "size": len(cls._entries),
+            "max_size": cls.max_size(),
+            "hit_rate": cls._stats["hits"] / lookups if lookups else 0.0,
+        }
+
+    @classmethod
+    def clear(cls):
+        """
+        Drops every cached result and resets the counters.
+        """
+        cls._entries = OrderedDict()
+        cls._stats = {"hits": 0, "misses": 0, "evictions": 0}
@@ -0,0 +1,224 @@
+"""
+This module provides RunningStats, single-pass Decimal statistics that can be merged.
+
+Values are accumulated with Welford's online update, so memory stays constant and the
+variance does not suffer the cancellation of the naive sum-of-squares formula. Two
+partial results (e.g. from chunks parsed in different processes) are combined with
+the pairwise update of Chan et al. Arithmetic runs in a private context with
+GUARD_DIGITS more digits than the caller's context, and results are rounded back to the
+caller's precision, so the output matches the caller's Decimal precision.
+Variance and standard deviation are population statistics, matching the two-operand
+`standard_deviation` command.
+"""
+
+import os
+import sys
+from decimal import Decimal, getcontext
+from app.history_loader import read_line_chunks
+from app.worker_pool import WorkerPool
+
+GUARD_DIGITS = 10
+DEFAULT_CHUNK_BYTES = 4 * 2 ** 20
+_ONE = Decimal(1)
+
+
+def _rounded(value: Decimal) -> Decimal:
+    """
+    Rounds a result to the current context and drops trailing zeros left by the guard digits.
+    """
+    value = +value
+    if value == value.to_integral_value() and value.adjusted() < getcontext().prec:
+        return value.quantize(_ONE)
+    return value.normalize()
+
+
+class RunningStats:
+    """
+    Count, mean, sum of squared deviations, min and max of a stream of Decimals.
+    """
+
+    __slots__ = ("count", "_mean", "_m2", "_min", "_max", "_context")
+
+    def __init__(self, context=None):
+        """
+        Args:
+            context (decimal.Context): Context whose precision (plus guard digits) is used
+                for the running arithmetic. Defaults to the current context.
+        """
+        self._context = (context or getcontext()).copy()
+        self._context.prec += GUARD_DIGITS
+        self.count = 0
+        self._mean = Decimal(0)
+        self._m2 = Decimal(0)
+        self._min = None
+        self._max = None
+
+    @classmethod
+    def of(cls, values, context=None) -> "RunningStats":
+        """
+        Returns the statistics of an iterable of numbers.
+        """
+        stats = cls(context)
+        stats.extend(values)
+        return stats
+
+    def push(self, value):
+        """
+        Adds one value (Decimal, int or numeric string).
+        """
+        value = value if isinstance(value, Decimal) else Decimal(value)
+        context = self._context
+        self.count += 1
+        delta = context.subtract(value, self._mean)
+        self._mean = context.add(self._mean, context.divide(delta, self.count))
+        self._m2 = context.add(self._m2, context.multiply(delta, context.subtract(value, self._mean)))
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def extend(self, values):
+        """
+        Adds every value of an iterable.
+        """
+        # Same update as `push`, with the state held in locals for the hot loop.
+        subtract, add, divide, multiply = (self._context.subtract, self._context.add,
+                                           self._context.divide, self._context.multiply)
+        count, mean, m2, low, high = self.count, self._mean, self._m2, self._min, self._max
+        for value in values:
+            if not isinstance(value, Decimal):
+                value = Decimal(value)
+            count += 1
+            delta = subtract(value, mean)
+            mean = add(mean, divide(delta, count))
+            m2 = add(m2, multiply(delta, subtract(value, mean)))
+            if low is None or value < low:
+                low = value
+            if high is None or value > high:
+                high = value
+        self.count, self._mean, self._m2, self._min, self._max = count, mean, m2, low, high
+
+    def state(self) -> tuple:
+        """
+        Returns the unrounded (count, mean, m2, min, max) accumulators, as `merge` folds them.
+        """
+        return self.count, self._mean, self._m2, self._min, self._max
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Folds another partial result into this one and returns self.
+        """
+        other_count, other_mean, other_m2, other_min, other_max = other.state()
+        if not other_count:
+            return self
+        if not self.count:
+            self.count, self._mean, self._m2 = other_count, other_mean, other_m2
+            self._min, self._max = other_min, other_max
+            return self
+        context = self._context
+        count = self.count + other_count
+        delta = context.subtract(other_mean, self._mean)
+        self._mean = context.add(self._mean, context.divide(context.multiply(delta, other_count), count))
+        self._m2 = context.add(context.add(self._m2, other_m2), context.divide(
+            context.multiply(context.multiply(delta, delta), self.count * other_count), count))
+        self.count = count
+        self._min = min(self._min, other_min)
+        self._max = max(self._max, other_max)
+        return self
+
+    def _require_values(self):
+        if not self.count:
+            raise ValueError("Statistics need at least one value.")
+
+    def mean(self) -> Decimal:
+        """
+        Returns the mean, rounded to the current context.
+        """
+        self._require_values()
+        return _rounded(self._mean)
+
+    def variance(self) -> Decimal:
+        """
+        Returns the population variance, rounded to the current context.
+        """
+        self._require_values()
+        return _rounded(self._context.divide(self._m2, self.count))
+
+    def standard_deviation(self) -> Decimal:
+        """
+        Returns the population standard deviation, computed with Decimal sqrt.
+        """
+        self._require_values()
+        return _rounded(self._context.sqrt(self._context.divide(self._m2, self.count)))
+
+    def minimum(self) -> Decimal:
+        """
+        Returns the smallest value seen.
+        """
+        self._require_values()
+        return self._min
+
+    def maximum(self) -> Decimal:
+        """
+        Returns the largest value seen.
+        """
+        self._require_values()
+        return self._max
+
+
+def parse_numbers(text: str):
+    """
+    Yields the Decimals in a text, separated by whitespace or commas.
+    """
+    for token in text.replace(",", " ").split():
+        yield Decimal(token)
+
+
+def _chunk_stats(data: bytes, context) -> RunningStats:
+    """
+    Worker-side entry point: statistics of one chunk of number text.
+    """
+    return RunningStats.of(parse_numbers(data.decode("utf-8")), context)
+
+
+def stats_from_stream(stream, parallel: bool = False, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> RunningStats:
+    """
+    Computes statistics over a binary stream of numbers in bounded-size chunks.
+
+    Args:
+        stream: Binary file object holding whitespace- or comma-separated numbers.
+        parallel (bool): Compute chunks in WorkerPool processes and merge the partial results.
+        chunk_bytes (int): Approximate size of each chunk.
+
+    Returns:
+        RunningStats: The merged statistics.
+    """
+    context = getcontext()
+    total = RunningStats(context)
+    if not parallel:
+        for chunk, _ in read_line_chunks(stream, chunk_bytes):
+            total.merge(_chunk_stats(chunk, context))
+        return total
+
+    window = 2 * WorkerPool.worker_count()
+    pending = []
+    for chunk, _ in read_line_chunks(stream, chunk_bytes):
+        pending.append(WorkerPool.submit(_chunk_stats, chunk, context))
+        if len(pending) >= window:
+            total.merge(pending.pop(0).result())
+    for future in pending:
+        total.merge(future.result())
+    return total
+
+
+def stats_from_path(path: str, parallel: bool = True, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> RunningStats:
+    """
+    Computes statistics over a file of numbers, or standard input when `path` is "-".
+
+    Files larger than one chunk are split across the worker pool when `parallel` is True.
+    """
+    if path == "-":
+        return stats_from_stream(sys.stdin.buffer, parallel=False, chunk_bytes=chunk_bytes)
+    parallel = parallel and os.path.getsize(path) > chunk_bytes
+    with open(path, "rb") as stream:
+        return stats_from_stream(stream, parallel, chunk_bytes)
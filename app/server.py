@@ -0,0 +1,170 @@
+"""
+This module provides CalculationServer, a local asyncio server for the calculator plugins.
+
+The protocol is line based. Each request is one line in the REPL's syntax:
+
+    <operation> <number1> <number2> [decimal|float|fraction]
+
+and each response is one line, either `OK <result>` or `ERR <message>`. Clients may
+pipeline: they can send many requests without waiting, and responses always come back
+in request order. Requests on a connection run concurrently. Commands marked
+`cpu_heavy` run on the WorkerPool, so they never block the event loop. Every successful
+calculation is recorded in the Calculations history.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+from decimal import InvalidOperation
+from app.calculation import Calculation
+from app.calculations import Calculations
+from app.metrics import Metrics
+from app.numeric_backend import BACKENDS, NumericBackend, parse_operand
+from app.result_cache import ResultCache
+from app.worker_pool import WorkerPool
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PIPELINE_DEPTH = 256
+
+
+class CalculationServer:
+    """
+    Serves newline-delimited calculation requests over TCP or a Unix socket.
+    """
+
+    def __init__(self, commands, pipeline_depth: int = DEFAULT_PIPELINE_DEPTH):
+        """
+        Args:
+            commands (Mapping): Command names mapped to command instances, loaded once.
+            pipeline_depth (int): Maximum responses pending per connection. Reading stops
+                while a connection has this many requests in flight.
+        """
+        self.commands = commands
+        self.pipeline_depth = pipeline_depth
+        self.stats = {"connections": 0, "requests": 0, "errors": 0}
+
+    async def handle_request(self, line: str) -> str:
+        """
+        Runs one request line and returns its response line (without the newline).
+        """
+        self.stats["requests"] += 1
+        parts = line.split()
+        if len(parts) not in (3, 4) or (len(parts) == 4 and parts[3].lower() not in BACKENDS):
+            self.stats["errors"] += 1
+            return "ERR Usage: <command> <num1> <num2> [decimal|float|fraction]"
+        operation_name, operand1, operand2 = parts[:3]
+        backend = parts[3].lower() if len(parts) == 4 else NumericBackend.current()
+        command = self.commands.get(operation_name)
+        if command is None:
+            self.stats["errors"] += 1
+            return f"ERR Unknown operation '{operation_name}'"
+        try:
+            with Metrics.stage("parse", operation_name):
+                num1, num2 = parse_operand(operand1, backend), parse_operand(operand2, backend)
+            if command.cpu_heavy:
+                with Metrics.stage("dispatch", operation_name):
+                    result = await WorkerPool.run_command_async(command, num1, num2)
+                if isinstance(result, Exception):
+                    raise result
+            else:
+                with Metrics.stage("dispatch", operation_name):
+                    result = ResultCache.execute(command, num1, num2)
+        except InvalidOperation:
+            self.stats["errors"] += 1
+            return "ERR One or both inputs are not valid numbers."
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.stats["errors"] += 1
+            return f"ERR {error or type(error).__name__}"
+
+        with Metrics.stage("history_append", operation_name):
+            calculation = Calculation(num1, num2, command, backend)
+            calculation.result = result
+            Calculations.add_calculation(calculation)
+        return f"OK {result}"
+
+    async def _write_responses(self, pending: asyncio.Queue, writer: asyncio.StreamWriter):
+        """
+        Writes responses in request order as their tasks complete.
+        """
+        while True:
+            task = await pending.get()
+            if task is None:
+                break
+            response = await task
+            with Metrics.stage("output"):
+                writer.write(f"{response}\n".encode("utf-8"))
+            if pending.empty():
+                await writer.drain()
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Reads pipelined requests from one client and answers them in order.
+        """
+        self.stats["connections"] += 1
+        pending = asyncio.Queue(maxsize=self.pipeline_depth)
+        responder = asyncio.create_task(self._write_responses(pending, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode("utf-8", errors="replace").strip()
+                if text:
+                    await pending.put(asyncio.create_task(self.handle_request(text)))
+            await pending.put(None)
+            await responder
+        except (ConnectionError, asyncio.IncompleteReadError) as error:
+            logging.info(f"Client disconnected: {error}")
+            responder.cancel()
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, path: str = None):
+        """
+        Starts listening on a TCP port, or on a Unix socket when `path` is given.
+
+        Returns:
+            asyncio.Server: The listening server.
+        """
+        if path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=path)
+            logging.info(f"Calculation server listening on {path}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            logging.info(f"Calculation server listening on {host}:{port}")
+        return server
+
+
+def run_server(commands, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, path: str = None):
+    """
+    Runs a CalculationServer until interrupted.
+
+    Args:
+        commands (Mapping): Command names mapped to command instances.
+        host (str): TCP host to bind.
+        port (int): TCP port to bind.
+        path (str): Unix socket path; used instead of host/port when given.
+    """
+    server = CalculationServer(commands)
+
+    async def serve():
+        listener = await server.start(host, port, path)
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, listener.close)
+        print(f"Serving on {path or f'{host}:{port}'} (Ctrl+C to stop)")
+        async with listener:
+            with contextlib.suppress(asyncio.CancelledError):
+                await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
+        logging.info(f"Calculation server stopped: {server.stats}")
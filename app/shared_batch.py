@@ -0,0 +1,114 @@
+"""
+This module provides the shared-memory transport for multiprocessing float64 batches.
+
+The `execute_multiprocessing` contract, and any chunked submission of operand lists,
+pickles every operand and every result through the pool's queues. For large batches
+that serialization costs more than the arithmetic. `execute_batch_shared` copies the
+operands into one `multiprocessing.shared_memory` block with a fixed layout:
+
+    operand1   n x float64
+    operand2   n x float64
+    result     n x float64
+    mask       n x uint8      (1 where the pair failed, e.g. a division by zero)
+
+Each WorkerPool task only receives a small descriptor: the block name, the row count,
+its slice bounds and the command. The worker maps the block, runs the plugin's
+`execute_batch` on views of its slice and writes results and mask in place. Only the
+float backend has a fixed-width layout, so exact Decimal batches keep using the
+in-process object-array path.
+"""
+
+import logging
+import concurrent.futures
+from multiprocessing import shared_memory
+from app.lazy_import import lazy_import
+from app.worker_pool import WorkerPool
+
+np = lazy_import("numpy")
+
+MIN_SHARED_PAIRS = 50_000
+SLICES_PER_WORKER = 2
+_ITEM_BYTES = 8 + 8 + 8 + 1
+
+
+def _views(buffer, pairs: int) -> tuple:
+    """
+    Returns the operand1, operand2, result and mask arrays laid out in a shared block.
+    """
+    operands1 = np.ndarray(pairs, dtype=np.float64, buffer=buffer, offset=0)
+    operands2 = np.ndarray(pairs, dtype=np.float64, buffer=buffer, offset=8 * pairs)
+    results = np.ndarray(pairs, dtype=np.float64, buffer=buffer, offset=16 * pairs)
+    mask = np.ndarray(pairs, dtype=np.uint8, buffer=buffer, offset=24 * pairs)
+    return operands1, operands2, results, mask
+
+
+def _execute_slice(name: str, pairs: int, start: int, stop: int, command) -> int:
+    """
+    Worker-side entry point: computes rows [start, stop) of a shared block in place.
+
+    Returns:
+        int: Number of failed (masked) pairs in the slice.
+    """
+    # Pool workers share the parent's resource tracker, so attaching does not change
+    # ownership: the parent alone unlinks the block.
+    block = shared_memory.SharedMemory(name=name)
+    operands1 = operands2 = results = mask = None
+    try:
+        operands1, operands2, results, mask = _views(block.buf, pairs)
+        computed = command.execute_batch(operands1[start:stop], operands2[start:stop], "float")
+        results[start:stop] = np.ma.getdata(computed)
+        mask[start:stop] = np.ma.getmaskarray(computed)
+        return int(mask[start:stop].sum())
+    finally:
+        # Views into the block must be released before it can be closed.
+        del operands1, operands2, results, mask
+        block.close()
+
+
+def execute_batch_shared(command, operands1, operands2, slices: int = None,
+                         min_pairs: int = None) -> "np.ma.MaskedArray":
+    """
+    Runs a float64 batch across the WorkerPool through one shared-memory block.
+
+    Batches smaller than `min_pairs` run in-process, where the pool hand-off would
+    cost more than it saves.
+
+    Args:
+        command (Command): The plugin to run.
+        operands1: Sequence (ideally a float64 array) of first operands.
+        operands2: Sequence of second operands.
+        slices (int): Number of worker tasks; defaults to SLICES_PER_WORKER per worker.
+        min_pairs (int): Smallest batch sent to the pool; defaults to MIN_SHARED_PAIRS.
+
+    Returns:
+        np.ma.MaskedArray: float64 results in operand order, masked where a pair failed.
+
+    Raises:
+        ValueError: If the operand sequences differ in length.
+    """
+    if len(operands1) != len(operands2):
+        raise ValueError("Operand sequences must have the same length.")
+    pairs = len(operands1)
+    if pairs < max(MIN_SHARED_PAIRS if min_pairs is None else min_pairs, 1):
+        return command.execute_batch(operands1, operands2, "float")
+
+    block = shared_memory.SharedMemory(create=True, size=_ITEM_BYTES * pairs)
+    shared1 = shared2 = results = mask = None
+    try:
+        shared1, shared2, results, mask = _views(block.buf, pairs)
+        shared1[:] = operands1
+        shared2[:] = operands2
+        slices = max(1, min(slices or SLICES_PER_WORKER * WorkerPool.worker_count(), pairs))
+        bounds = [pairs * index // slices for index in range(slices + 1)]
+        futures = [WorkerPool.submit(_execute_slice, block.name, pairs, start, stop, command)
+                   for start, stop in zip(bounds, bounds[1:]) if stop > start]
+        # Every slice must be done with the block before it is unlinked, even on failure.
+        concurrent.futures.wait(futures)
+        failures = sum(future.result() for future in futures)
+        logging.info(f"Shared-memory batch {command.operation_name}: {pairs} pairs in "
+                     f"{len(futures)} slices, {failures} failed")
+        return np.ma.masked_array(results.copy(), mask=mask.astype(bool))
+    finally:
+        del shared1, shared2, results, mask
+        block.close()
+        block.unlink()
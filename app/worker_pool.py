@@ -0,0 +1,175 @@
+"""
+This module provides WorkerPool, the long-lived process pool used for multiprocessing
+calculations.
+
+The pool is created lazily on the first submission and reused for the lifetime of the
+application, so each `mp` calculation only pays for a task hand-off instead of spawning
+a new process and queue.
+"""
+
+import logging
+import os
+import queue
+import time
+import concurrent.futures
+from app.metrics import Metrics
+
+
+def _run_command(command, num1, num2, submitted_at: float):
+    """
+    Worker-side entry point: runs a plugin through its `execute_multiprocessing` contract.
+
+    Returns:
+        tuple: (result, queueing seconds, execution seconds).
+    """
+    queueing = time.time() - submitted_at
+    result_queue = queue.SimpleQueue()
+    start = time.perf_counter()
+    command.execute_multiprocessing(num1, num2, result_queue)
+    execution = time.perf_counter() - start
+    return result_queue.get_nowait(), queueing, execution
+
+
+class WorkerPool:
+    """
+    Owns the application's shared process pool and its latency statistics.
+    """
+
+    _executor = None
+    _max_workers = None
+    _stats = {"tasks": 0, "queueing_total": 0.0, "queueing_max": 0.0,
+              "execution_total": 0.0, "execution_max": 0.0}
+
+    @classmethod
+    def configure(cls, max_workers: int = None):
+        """
+        Sets the worker count. A running pool is shut down so the next task uses the new size.
+
+        Args:
+            max_workers (int): Number of worker processes. Defaults to the WORKER_POOL_SIZE
+                environment variable, then to the CPU count.
+        """
+        cls.shutdown()
+        cls._max_workers = max_workers
+
+    @classmethod
+    def worker_count(cls) -> int:
+        """
+        Returns the number of workers the pool runs (or will run once started).
+        """
+        if cls._max_workers:
+            return cls._max_workers
+        return int(os.getenv("WORKER_POOL_SIZE", "0")) or os.cpu_count() or 1
+
+    @classmethod
+    def executor(cls) -> "concurrent.futures.ProcessPoolExecutor":
+        """
+        Returns the shared executor, creating it on first use.
+        """
+        if cls._executor is None:
+            from multiprocessing import resource_tracker  # pylint: disable=import-outside-toplevel
+            # Forked workers must share the parent's resource tracker; otherwise each worker
+            # starts its own, which unlinks shared-memory blocks it merely attached to.
+            resource_tracker.ensure_running()
+            # Attribute access keeps multiprocessing unimported until the pool is needed.
+            cls._executor = concurrent.futures.ProcessPoolExecutor(max_workers=cls.worker_count())
+            logging.info(f"Worker pool started with {cls.worker_count()} workers.")
+        return cls._executor
+
+    @classmethod
+    def submit(cls, func, *args):
+        """
+        Submits an arbitrary picklable callable to the pool.
+
+        Returns:
+            concurrent.futures.Future: The pending result.
+        """
+        return cls.executor().submit(func, *args)
+
+    @classmethod
+    def run_command(cls, command, num1, num2):
+        """
+        Runs a command's `execute_multiprocessing` in the pool and waits for its result.
+
+        Args:
+            command (Command): The plugin to run.
+            num1 (Decimal): The first number.
+            num2 (Decimal): The second number.
+
+        Returns:
+            The value the plugin put on its result queue.
+        """
+        future = cls.submit(_run_command, command, num1, num2, time.time())
+        result, queueing, execution = future.result()
+        cls._record(command, queueing, execution)
+        logging.info(f"Pool task {command.operation_name}: queued {queueing * 1000:.3f}ms, "
+                     f"executed {execution * 1000:.3f}ms")
+        return result
+
+    @classmethod
+    async def run_command_async(cls, command, num1, num2):
+        """
+        Awaitable variant of `run_command` that does not block the running event loop.
+
+        Args:
+            command (Command): The plugin to run.
+            num1 (Decimal): The first number.
+            num2 (Decimal): The second number.
+
+        Returns:
+            The value the plugin put on its result queue.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel  # only loaded by the server
+
+        future = cls.submit(_run_command, command, num1, num2, time.time())
+        result, queueing, execution = await asyncio.wrap_future(future)
+        cls._record(command, queueing, execution)
+        return result
+
+    @classmethod
+    def _record(cls, command, queueing: float, execution: float):
+        Metrics.observe("pool_queue", queueing, command.operation_name)
+        Metrics.observe("execute", execution, command.operation_name)
+        stats = cls._stats
+        stats["tasks"] += 1
+        stats["queueing_total"] += queueing
+        stats["queueing_max"] = max(stats["queueing_max"], queueing)
+        stats["execution_total"] += execution
+        stats["execution_max"] = max(stats["execution_max"], execution)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Summarizes per-task latencies recorded so far.
+
+        Returns:
+            dict: Task count plus mean and max queueing/execution latency in seconds.
+        """
+        stats = cls._stats
+        tasks = stats["tasks"]
+        return {
+            "workers": cls.worker_count(),
+            "running": cls._executor is not None,
+            "tasks": tasks,
+            "queueing_mean": stats["queueing_total"] / tasks if tasks else 0.0,
+            "queueing_max": stats["queueing_max"],
+            "execution_mean": stats["execution_total"] / tasks if tasks else 0.0,
+            "execution_max": stats["execution_max"],
+        }
+
+    @classmethod
+    def reset_stats(cls):
+        """
+        Clears the recorded latency statistics.
+        """
+        cls._stats = {key: 0 if key == "tasks" else 0.0 for key in cls._stats}
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Stops the worker processes, waiting for in-flight tasks. Safe to call when idle.
+        """
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+            logging.info("Worker pool shut down.")
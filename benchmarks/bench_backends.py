@@ -0,0 +1,81 @@
+"""
+Benchmark of the numeric backends for every built-in two-operand plugin.
+
+For each plugin it reports the cost of one scalar `execute` call on Decimal (at the
+default and at a raised precision), float and Fraction operands, plus the per-row
+cost of the float64 `execute_batch` kernel. Operands are non-trivial (1/7-like
+decimals) so Decimal and Fraction do real work instead of hitting small-integer
+fast paths.
+
+Usage:
+    python benchmarks/bench_backends.py [calls] [precision]
+"""
+
+import os
+import sys
+import time
+from decimal import localcontext
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.numeric_backend import parse_operand
+from app.plugin_registry import load_registry
+
+OPERANDS = ("1234.5678901", "0.142857142857")
+BATCH_ROWS = 100_000
+
+
+def time_scalar(command, num1, num2, calls: int) -> float:
+    """
+    Returns the best-of-three nanoseconds per `execute` call.
+    """
+    execute = command.execute
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            execute(num1, num2)
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e9
+
+
+def time_batch(command) -> float:
+    """
+    Returns nanoseconds per row of the float64 batch kernel.
+    """
+    operands1 = [float(OPERANDS[0])] * BATCH_ROWS
+    operands2 = [float(OPERANDS[1])] * BATCH_ROWS
+    command.execute_batch(operands1[:10], operands2[:10], backend="float")
+    start = time.perf_counter()
+    command.execute_batch(operands1, operands2, backend="float")
+    return (time.perf_counter() - start) / BATCH_ROWS * 1e9
+
+
+def main():
+    """
+    Prints one row per plugin with the ns/call of each backend.
+    """
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    precision = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    commands = load_registry(os.path.join(ROOT, "app", "plugins"))
+    print(f"{'plugin':<20}{'decimal':>10}{f'decimal/{precision}':>14}{'float':>10}"
+          f"{'fraction':>11}{'float batch':>13}   (ns per call / row)")
+    for name in sorted(commands):
+        command = commands[name]
+        timings = []
+        for backend in ("decimal", "decimal/high", "float", "fraction"):
+            kind = backend.split("/")[0]
+            num1, num2 = (parse_operand(text, kind) for text in OPERANDS)
+            with localcontext() as context:
+                if backend == "decimal/high":
+                    context.prec = precision
+                timings.append(time_scalar(command, num1, num2, calls))
+        timings.append(time_batch(command))
+        print(f"{name:<20}{timings[0]:>10.0f}{timings[1]:>14.0f}{timings[2]:>10.0f}"
+              f"{timings[3]:>11.0f}{timings[4]:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for DagScheduler: serial versus wave-parallel execution of a wide workload.
+
+The generated workload has `width` independent chains of `depth` dependent calls each.
+Every chain divides at high Decimal precision, so the tasks do real work. Half of the
+chains duplicate another chain, which exercises deduplication. The report lists waves,
+critical path, total work, wall time and the speedup of each mode.
+
+Usage:
+    python benchmarks/bench_dag.py [width] [depth] [precision]
+"""
+
+import os
+import sys
+from decimal import getcontext
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.dag_scheduler import DagScheduler, parse_workload
+from app.plugin_registry import load_registry
+from app.worker_pool import WorkerPool
+
+
+def workload(width: int, depth: int) -> list:
+    """
+    Returns the lines of a workload with `width` chains of `depth` calls.
+    """
+    lines = []
+    for chain in range(width):
+        lines.append(f"c{chain}_0 = {chain % (width // 2 or 1) + 1} / 7")
+        for step in range(1, depth):
+            lines.append(f"c{chain}_{step} = c{chain}_{step - 1} / 1.0001 + {step}")
+    return lines
+
+
+def main():
+    """
+    Runs the workload serially and on the worker pool, printing both reports.
+    """
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    getcontext().prec = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    commands = load_registry(os.path.join(ROOT, "app", "plugins"))
+    definitions = parse_workload(workload(width, depth))
+    WorkerPool.run_command(commands["add"], 1, 1)  # start the pool outside the timings
+
+    print(f"{WorkerPool.worker_count()} workers, {width} chains x {depth} steps, "
+          f"precision {getcontext().prec}")
+    print(f"{'mode':<10}{'calls':>8}{'tasks':>8}{'waves':>7}{'crit ms':>10}{'work ms':>10}"
+          f"{'wall ms':>10}{'speedup':>9}{'ideal':>8}")
+    for mode, parallel in (("serial", False), ("parallel", True)):
+        report = DagScheduler(definitions, commands, "decimal").run(parallel=parallel)
+        print(f"{mode:<10}{report['calls']:>8}{report['tasks']:>8}{report['waves']:>7}"
+              f"{report['critical_path_seconds'] * 1000:>10.1f}{report['work_seconds'] * 1000:>10.1f}"
+              f"{report['wall_seconds'] * 1000:>10.1f}{report['speedup']:>8.2f}x"
+              f"{report['ideal_speedup']:>7.0f}x")
+    WorkerPool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
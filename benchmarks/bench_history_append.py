@@ -0,0 +1,48 @@
+"""
+Benchmark for PandasFacade.add_record.
+
+Measures the average cost of one append inside windows ending at 1k, 10k, 100k and 1M
+records. With the column store the per-append cost should stay flat as history grows.
+
+Usage:
+    python benchmarks/bench_history_append.py [max_records]
+"""
+
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pandas_facade import PandasFacade  # pylint: disable=wrong-import-position
+
+WINDOW = 1000
+
+
+def main():
+    """
+    Runs the benchmark and prints per-append cost at each checkpoint.
+    """
+    max_records = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    checkpoints = [n for n in (1_000, 10_000, 100_000, 1_000_000, 10_000_000) if n <= max_records]
+    record = {"operation": "add", "operand1": Decimal(1), "operand2": Decimal(2), "result": Decimal(3)}
+    facade = PandasFacade()
+
+    print(f"{'records':>10} {'ns/append':>12}")
+    for checkpoint in checkpoints:
+        while len(facade) < checkpoint - WINDOW:
+            facade.add_record(record)
+        start = time.perf_counter_ns()
+        for _ in range(WINDOW):
+            facade.add_record(record)
+        per_append = (time.perf_counter_ns() - start) / WINDOW
+        print(f"{checkpoint:>10} {per_append:>12.0f}")
+
+    start = time.perf_counter()
+    frame = facade.dataframe
+    print(f"materialized {len(frame)} rows in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for PandasFacade.filter_by_operation.
+
+Compares the indexed filter with the previous boolean-mask scan over the full
+`operation` column, for a rare and a common operation, at growing history sizes.
+Each filter is timed on a quiet history (DataFrame already cached) and right after
+an add (as when a dashboard polls a live session). The indexed filter should track
+the number of matching rows, not the history size.
+
+Usage:
+    python benchmarks/bench_history_filter.py [max_records]
+"""
+
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pandas_facade import PandasFacade  # pylint: disable=wrong-import-position
+
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+RARE_EVERY = 1000
+REPEATS = 20
+
+
+def build_history(records: int) -> PandasFacade:
+    """
+    Builds a history where `mean` is rare and the other operations share the remaining rows.
+    """
+    facade = PandasFacade()
+    one, two, three = Decimal(1), Decimal(2), Decimal(3)
+    for row in range(records):
+        operation = "mean" if row % RARE_EVERY == 0 else OPERATIONS[row % len(OPERATIONS)]
+        facade.add_record({"operation": operation, "operand1": one, "operand2": two, "result": three})
+    return facade
+
+
+def mask_scan(facade: PandasFacade, operation: str):
+    """
+    The baseline: a boolean mask over the whole operation column.
+    """
+    frame = facade.dataframe
+    return frame[frame["operation"] == operation]
+
+
+def time_filter(filter_function, facade: PandasFacade, operation: str, after_add: bool) -> float:
+    """
+    Returns the best of REPEATS timings, in milliseconds, optionally adding a record first.
+    """
+    record = {"operation": "add", "operand1": Decimal(1), "operand2": Decimal(2), "result": Decimal(3)}
+    filter_function(facade, operation)
+    best = float("inf")
+    for _ in range(REPEATS):
+        if after_add:
+            facade.add_record(record)
+        start = time.perf_counter()
+        filter_function(facade, operation)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    """
+    Runs the benchmark and prints both filters' timings at each history size.
+    """
+    max_records = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= max_records]
+
+    print(f"{'records':>10} {'operation':>10} {'matches':>9} {'history':>10} "
+          f"{'mask ms':>9} {'index ms':>9}")
+    for size in sizes:
+        facade = build_history(size)
+        for operation in ("mean", "add"):
+            matches = len(facade.filter_by_operation(operation))
+            for after_add in (False, True):
+                scan = time_filter(mask_scan, facade, operation, after_add)
+                indexed = time_filter(PandasFacade.filter_by_operation, facade, operation, after_add)
+                state = "after add" if after_add else "cached"
+                print(f"{size:>10} {operation:>10} {matches:>9} {state:>10} "
+                      f"{scan:>9.3f} {indexed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Load-time and memory benchmark for the binary (`.calchist`) history format against CSV.
+
+For each size the same history is written as CSV and as a binary file, then loaded in a
+fresh interpreter so peak RSS is measured per scenario:
+
+    csv            load_history on the CSV file (pandas parser)
+    binary         load_history on the binary file (memory map only)
+    binary+filter  binary load followed by filter_by_operation("add")
+    binary+full    binary load followed by reading the whole history DataFrame
+
+Usage:
+    python benchmarks/bench_history_format.py [rows ...]      (default: 1000000 10000000)
+"""
+
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.calculations import Calculations
+from app.history_format import write_history
+
+SCENARIOS = ["csv", "binary", "binary+filter", "binary+full"]
+
+
+def make_columns(rows: int) -> dict:
+    """
+    Builds a synthetic history with small integer operands and a mix of operations.
+    """
+    operations = ["add", "subtract", "multiply", "divide", "mean"]
+    columns = {"operation": [], "operand1": [], "operand2": [], "result": []}
+    small = [Decimal(value) for value in range(1, 1000)]
+    for _ in range(rows):
+        operation = random.choice(operations)
+        num1, num2 = random.choice(small), random.choice(small)
+        result = {"add": num1 + num2, "subtract": num1 - num2, "multiply": num1 * num2,
+                  "divide": num1 / num2, "mean": (num1 + num2) / 2}[operation]
+        columns["operation"].append(operation)
+        columns["operand1"].append(num1)
+        columns["operand2"].append(num2)
+        columns["result"].append(result)
+    return columns
+
+
+def child(scenario: str, path: str):
+    """
+    Runs one scenario in this process and prints its timing and peak RSS as JSON.
+    """
+    start = time.perf_counter()
+    Calculations.load_history(path)
+    if scenario == "binary+filter":
+        Calculations.filter_by_operation("add")
+    elif scenario == "binary+full":
+        Calculations.get_all_calculations()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_kb() / 1024}))
+
+
+def peak_rss_kb() -> int:
+    """
+    Returns this process's peak RSS in KiB.
+
+    ru_maxrss survives fork+exec on Linux, so /proc's VmHWM is preferred when available.
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    """
+    Writes the test files and runs each scenario in a subprocess.
+    """
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000_000, 10_000_000]
+    print(f"{'rows':>10} {'scenario':>14} {'seconds':>9} {'peak MB':>9} {'file MB':>9}")
+    for rows in sizes:
+        columns = make_columns(rows)
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "history.csv")
+            binary_path = os.path.join(directory, "history.calchist")
+            Calculations._history_facade.load_columns(columns)
+            Calculations.save_history(csv_path)
+            write_history(binary_path, columns)
+            Calculations.clear_history()
+
+            for scenario in SCENARIOS:
+                path = csv_path if scenario == "csv" else binary_path
+                completed = subprocess.run([sys.executable, __file__, "--child", scenario, path],
+                                           cwd=ROOT, check=True, capture_output=True, text=True)
+                result = json.loads(completed.stdout)
+                print(f"{rows:>10} {scenario:>14} {result['seconds']:>9.3f} "
+                      f"{result['peak_mb']:>9.1f} {os.path.getsize(path) / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,127 @@
+"""
+Memory benchmark for history rows and Calculation objects.
+
+Builds the same history of calculations (a rotation of add, subtract, multiply and
+divide over fresh Decimal operands, as parsed input produces) in two stores and
+reports the traced bytes per row:
+
+    object lists   one Python list per column holding the Decimal objects
+                   (the layout PandasFacade used before HistoryColumns)
+    typed columns  HistoryColumns: operation/backend codes and fixed-point arrays,
+                   with repeating quotients in the overflow path
+
+It also reports the size of one Calculation with and without __slots__.
+
+Usage:
+    python benchmarks/bench_history_memory.py [rows]     (default: 1000000)
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.calculation import Calculation
+from app.history_columns import HistoryColumns
+
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+
+
+class DictCalculation:  # pylint: disable=too-few-public-methods
+    """
+    Calculation as it was before __slots__: same attributes, stored in a __dict__.
+    """
+
+    def __init__(self, operand1, operand2, operation, backend="decimal"):
+        self.operand1 = operand1
+        self.operand2 = operand2
+        self.operation = operation
+        self.backend = backend
+        self.result = None
+
+
+def rows(count: int):
+    """
+    Yields (operation, operand1, operand2, result) with new Decimal objects per row.
+    """
+    for row in range(count):
+        operand1, operand2 = Decimal(f"{row % 100_000}.{row % 4 * 25}".rstrip("0").rstrip(".")), Decimal(row % 97 + 1)
+        operation = OPERATIONS[row % 4]
+        result = {"add": operand1 + operand2, "subtract": operand1 - operand2,
+                  "multiply": operand1 * operand2, "divide": operand1 / operand2}[operation]
+        yield operation, operand1, operand2, result
+
+
+def object_lists(count: int) -> dict:
+    """
+    Builds the history as per-column lists of objects.
+    """
+    columns = {name: [] for name in ("operation", "operand1", "operand2", "result", "backend")}
+    for operation, operand1, operand2, result in rows(count):
+        columns["operation"].append(operation)
+        columns["operand1"].append(operand1)
+        columns["operand2"].append(operand2)
+        columns["result"].append(result)
+        columns["backend"].append("decimal")
+    return columns
+
+
+def typed_columns(count: int) -> HistoryColumns:
+    """
+    Builds the history in HistoryColumns.
+    """
+    store = HistoryColumns()
+    for operation, operand1, operand2, result in rows(count):
+        store.append(operation, operand1, operand2, result)
+    return store
+
+
+def traced(build, count: int) -> tuple:
+    """
+    Returns (bytes per row still allocated after `build`, seconds).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    built = build(count)
+    seconds = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return (after - before) / count, seconds
+
+
+def instance_bytes(calculation) -> int:
+    """
+    Returns the size of an instance and of its __dict__, if it has one.
+    """
+    size = sys.getsizeof(calculation)
+    if hasattr(calculation, "__dict__"):
+        size += sys.getsizeof(calculation.__dict__)
+    return size
+
+
+def main():
+    """
+    Prints bytes per row for both stores and bytes per Calculation.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{count:,} rows")
+    for name, build in (("object lists", object_lists), ("typed columns", typed_columns)):
+        per_row, seconds = traced(build, count)
+        print(f"{name:>14}: {per_row:8.1f} bytes/row  (built in {seconds:.2f}s under tracemalloc)")
+    store = typed_columns(min(count, 100_000))
+    overflow = store.overflow_count() / (3 * len(store))
+    print(f"{overflow:.0%} of typed numbers use the overflow path")
+    before = instance_bytes(DictCalculation(Decimal(1), Decimal(2), None))
+    after = instance_bytes(Calculation(Decimal(1), Decimal(2), None))
+    print(f"Calculation instance: {before} bytes with __dict__, {after} bytes with __slots__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark of history queries: the columnar query engine versus filtering the DataFrame.
+
+It builds an in-memory history of random calculations and times three queries
+
+    filter     operation=divide and result > 2 and operand1 between 1 and 10
+    top-k      operation=divide and result > 2 and operand1 between 1 and 10 order by result desc limit 50
+    scan+top   result > 10 order by result limit 50   (no index, overflow-heavy column)
+
+through two paths:
+
+    dataframe  the cached history DataFrame, boolean masks over its object columns and
+               sort_values(...).head(limit), as a pandas user would write it
+    query      Calculations.query: index lookup, int64 predicates and partial selection
+
+The DataFrame path is timed with the frame already built; building it is reported
+separately. Both paths must return the same rows.
+
+Usage:
+    python benchmarks/bench_history_query.py [rows]     (default: 1000000)
+"""
+
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.calculations import Calculations
+from app.pandas_facade import PandasFacade
+
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+QUERIES = {
+    "filter": "operation=divide and result > 2 and operand1 between 1 and 10",
+    "top-k": "operation=divide and result > 2 and operand1 between 1 and 10 order by result desc limit 50",
+    "scan+top": "result > 10 order by result limit 50",
+}
+REPEATS = 5
+
+
+def build_history(rows: int):
+    """
+    Fills the Calculations history with random calculations over small operands.
+    """
+    rng = random.Random(7)
+    numbers = [Decimal(number) for number in range(1, 2000)]
+    divisors = [Decimal(1) / Decimal(number) for number in range(1, 20)]
+    facade = PandasFacade()
+    for _ in range(rows):
+        operation = rng.choice(OPERATIONS)
+        num1 = rng.choice(numbers[:20]) if rng.random() < 0.3 else rng.choice(numbers)
+        num2 = rng.choice(numbers[:20]) if operation == "divide" else rng.choice(numbers)
+        result = {"add": num1 + num2, "subtract": num1 - num2, "multiply": num1 * num2,
+                  "divide": num1 * divisors[int(num2) - 1] if num2 < 20 else num1 / num2}[operation]
+        facade.add_record({"operation": operation, "operand1": num1, "operand2": num2, "result": result})
+    Calculations._history_facade = facade  # pylint: disable=protected-access
+
+
+def dataframe_query(frame, name: str):
+    """
+    The same query written against the history DataFrame.
+    """
+    if name == "scan+top":
+        return frame[frame["result"] > 10].sort_values("result", kind="stable").head(50)
+    matched = frame[(frame["operation"] == "divide") & (frame["result"] > 2)
+                    & (frame["operand1"] >= 1) & (frame["operand1"] <= 10)]
+    if name == "filter":
+        return matched
+    return matched.sort_values("result", ascending=False, kind="stable").head(50)
+
+
+def best_of(function) -> tuple:
+    """
+    Returns the best wall time of REPEATS runs and the last result.
+    """
+    best, result = float("inf"), None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """
+    Prints the time of each query through both paths.
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    build_history(rows)
+    start = time.perf_counter()
+    frame = Calculations.get_all_calculations()
+    print(f"{rows:,} rows, DataFrame built in {time.perf_counter() - start:.3f}s")
+    print(f"{'query':>10}{'matches':>10}{'dataframe ms':>15}{'query ms':>11}{'speedup':>9}")
+    for name, text in QUERIES.items():
+        frame_seconds, expected = best_of(lambda name=name: dataframe_query(frame, name))
+        query_seconds, result = best_of(lambda text=text: Calculations.query(text))
+        assert result.index.tolist() == expected.index.tolist(), name
+        print(f"{name:>10}{len(result):>10,}{frame_seconds * 1000:>15.1f}{query_seconds * 1000:>11.1f}"
+              f"{frame_seconds / query_seconds:>8.1f}x")
+    print()
+    print(Calculations.explain(QUERIES["top-k"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Memory benchmark for history retention: resident memory while the history grows.
+
+Each scenario appends the same stream of Decimal records in a fresh interpreter and
+reports the current RSS at regular checkpoints, the append throughput and the time
+to filter and save the whole history at the end:
+
+    unbounded     no retention policy (every row stays in memory)
+    rows=N        HISTORY_MAX_ROWS-style limit of N in-memory rows
+
+Usage:
+    python benchmarks/bench_history_retention.py [rows] [max_rows]   (default: 2000000 100000)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.pandas_facade import PandasFacade
+
+CHECKPOINTS = 5
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+
+
+def current_rss_mb() -> float:
+    """
+    Returns this process's current resident set size in MiB.
+    """
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(rows: int, max_rows: int):
+    """
+    Appends `rows` records under the given limit (0 for none) and prints a JSON report.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-retention-") as directory:
+        _run(rows, max_rows, directory)
+
+
+def _run(rows: int, max_rows: int, directory: str):
+    facade = PandasFacade()
+    if max_rows:
+        facade.configure_retention(max_rows=max_rows, spill_directory=directory)
+    rss, step = [], rows // CHECKPOINTS
+    start = time.perf_counter()
+    for row in range(rows):
+        # Distinct Decimal objects per row, as real calculations produce.
+        operand1, operand2 = Decimal(row % 9973) / 8, Decimal(row % 97 + 1)
+        facade.add_record({"operation": OPERATIONS[row % 4], "operand1": operand1,
+                           "operand2": operand2, "result": operand1 + operand2})
+        if (row + 1) % step == 0:
+            rss.append(current_rss_mb())
+    append_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    facade.filter_by_operation("divide")
+    filter_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    facade.save_to_file(os.path.join(directory, "history.csv"))
+    save_seconds = time.perf_counter() - start
+    print(json.dumps({"rss": rss, "rows_per_second": rows / append_seconds, "filter": filter_seconds,
+                      "save": save_seconds, "segments": facade.storage_stats()["spilled_segments"]}))
+
+
+def main():
+    """
+    Runs the unbounded and bounded scenarios in subprocesses and prints RSS per checkpoint.
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    max_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    step = rows // CHECKPOINTS
+    print("RSS in MiB after each checkpoint")
+    print(f"{'scenario':>14}" + "".join(f"{step * (index + 1):>10,}" for index in range(CHECKPOINTS))
+          + f"{'rows/s':>10}{'filter s':>10}{'save s':>8}{'files':>7}")
+    for limit in (0, max_rows):
+        completed = subprocess.run([sys.executable, __file__, "--child", str(rows), str(limit)],
+                                   cwd=ROOT, check=True, capture_output=True, text=True)
+        result = json.loads(completed.stdout)
+        name = f"rows={limit:,}" if limit else "unbounded"
+        print(f"{name:>14}" + "".join(f"{value:>10.0f}" for value in result["rss"])
+              + f"{result['rows_per_second']:>10,.0f}{result['filter']:>10.2f}{result['save']:>8.2f}"
+              + f"{result['segments']:>7}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        main()
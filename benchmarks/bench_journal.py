@@ -0,0 +1,91 @@
+"""
+Benchmark for the write-ahead history journal.
+
+Compares rebuilding N history rows by replaying a journal against `load_history` on an
+equivalent CSV file, and measures per-calculation append cost with and without the
+journal enabled. `load_history` parses numbers as floats; the "CSV as Decimal" line
+shows the cost of reading the same CSV while keeping exact Decimals, which is what
+the journal replay restores.
+
+Usage:
+    python benchmarks/bench_journal.py [rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+import pandas as pd
+from app.calculation import Calculation
+from app.calculations import Calculations
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+
+def make_calculations(rows: int) -> list:
+    """
+    Builds `rows` completed calculations with small random operands.
+    """
+    commands = [AddCommand(), DivideCommand()]
+    calculations = []
+    for _ in range(rows):
+        calc = Calculation(Decimal(random.randint(1, 999)), Decimal(random.randint(1, 99)),
+                           random.choice(commands))
+        calc.operate()
+        calculations.append(calc)
+    return calculations
+
+
+def timed(func, *args) -> float:
+    """
+    Returns the seconds taken by func(*args).
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Runs the benchmark and prints the timings.
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    calculations = make_calculations(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal_path = os.path.join(directory, "history.journal")
+        csv_path = os.path.join(directory, "history.csv")
+
+        Calculations.clear_history()
+        plain = timed(lambda: [Calculations.add_calculation(calc) for calc in calculations])
+        Calculations.save_history(csv_path)
+
+        Calculations.clear_history()
+        Calculations.enable_journal(journal_path)
+        journaled = timed(lambda: [Calculations.add_calculation(calc) for calc in calculations])
+        Calculations.disable_journal()
+
+        Calculations.clear_history()
+        csv_load = timed(Calculations.load_history, csv_path)
+        csv_exact = timed(lambda: [list(map(Decimal, values)) for name, values
+                                   in pd.read_csv(csv_path, dtype=str).items() if name != "operation"])
+        Calculations.clear_history()
+        replay = timed(Calculations.enable_journal, journal_path)
+        Calculations.disable_journal()
+
+    print(f"rows: {rows}")
+    print(f"append without journal: {plain / rows * 1e6:.2f}us/row")
+    print(f"append with journal:    {journaled / rows * 1e6:.2f}us/row")
+    print(f"load_history (CSV):     {csv_load:.3f}s")
+    print(f"CSV as Decimal:         {csv_exact:.3f}s")
+    print(f"journal replay:         {replay:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
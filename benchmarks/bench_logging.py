@@ -0,0 +1,78 @@
+"""
+Logging throughput benchmark: synchronous handlers versus the queue-backed mode.
+
+Each configuration runs in a fresh interpreter that performs N calculations through
+`process_calculation_and_output`, which emits several INFO records per calculation.
+Console output goes to /dev/null and the log file to a temporary directory. Two
+figures are reported for each configuration. The first is calculations per second as
+seen by the calling thread. The second is the total time including the final flush of
+queued records at shutdown.
+
+Usage:
+    python benchmarks/bench_logging.py [calculations]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGURATIONS = [
+    ("sync", {}),
+    ("queue/block", {"LOG_QUEUE": "1", "LOG_QUEUE_OVERFLOW": "block"}),
+    ("queue/drop_new", {"LOG_QUEUE": "1", "LOG_QUEUE_OVERFLOW": "drop_new"}),
+    ("queue/drop_oldest", {"LOG_QUEUE": "1", "LOG_QUEUE_OVERFLOW": "drop_oldest"}),
+]
+
+
+def child(calculations: int):
+    """
+    Runs the calculations with the logging configuration taken from the environment.
+    """
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    # pylint: disable=import-outside-toplevel
+    from logger_config import configure_logging, stop_queue_logging
+    from main import discover_plugins, process_calculation_and_output
+
+    configure_logging(log_level="INFO")
+    commands = discover_plugins()
+    start = time.perf_counter()
+    for number in range(calculations):
+        process_calculation_and_output(str(number), "3", "add", commands)
+    hot_path = time.perf_counter() - start
+    stop_queue_logging()
+    total = time.perf_counter() - start
+    with open(os.environ["BENCH_RESULT"], "w", encoding="utf-8") as stream:
+        json.dump({"hot_path": hot_path, "total": total}, stream)
+
+
+def main():
+    """
+    Runs every configuration in a child process and prints the comparison.
+    """
+    calculations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{'configuration':<20}{'calc/sec (caller)':>20}{'calc/sec (incl. flush)':>25}{'log lines':>11}")
+    for name, settings in CONFIGURATIONS:
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, "bench.log")
+            result_file = os.path.join(directory, "result.json")
+            environment = {**os.environ, **settings, "LOG_FILE": log_file, "BENCH_RESULT": result_file}
+            subprocess.run([sys.executable, __file__, "--child", str(calculations)], env=environment,
+                           check=True, stdout=subprocess.DEVNULL)
+            with open(result_file, encoding="utf-8") as stream:
+                result = json.load(stream)
+            with open(log_file, encoding="utf-8") as stream:
+                lines = sum(1 for _ in stream)
+        print(f"{name:<20}{calculations / result['hot_path']:>20,.0f}"
+              f"{calculations / result['total']:>25,.0f}{lines:>11}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of ParallelMap chunk sizing against fixed chunk sizes.
+
+For each plugin it maps Decimal operand pairs through:
+
+    in-process   one loop over `execute` in the parent
+    fixed N      the same chunked pool submission with a fixed chunk of N pairs
+    adaptive     `ParallelMap.map`, which sizes chunks from the measured item cost and
+                 pool latency (the probe run is excluded from the timing)
+
+Usage:
+    python benchmarks/bench_parallel_map.py [pairs] [workers]
+"""
+
+import os
+import sys
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from app.parallel_map import ParallelMap, _map_chunk
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.plugins.multiply_command import MultiplyCommand
+from app.worker_pool import WorkerPool
+
+FIXED_CHUNKS = [1, 100, 10_000]
+
+
+def fixed_path(command, operands1, operands2, size: int) -> list:
+    """
+    Submits fixed-size chunks and gathers the results in order.
+    """
+    futures = [WorkerPool.submit(_map_chunk, command, operands1[start:start + size], operands2[start:start + size])
+               for start in range(0, len(operands1), size)]
+    return [result for future in futures for result in future.result()[0]]
+
+
+def best_of(function, repeats: int = 3) -> float:
+    """
+    Returns the best wall time of a few runs, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """
+    Prints the wall time of every path for each plugin, and the adaptive chunk size.
+    """
+    pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    WorkerPool.configure(int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1))
+    WorkerPool.run_command(AddCommand(), 1, 2)  # start the pool outside the timings
+    operands1 = [Decimal(value % 997 + 1) / 7 for value in range(pairs)]
+    operands2 = [Decimal(value % 13 + 1) for value in range(pairs)]
+
+    print(f"{pairs:,} pairs, {WorkerPool.worker_count()} workers, {os.cpu_count()} CPUs")
+    header = "".join(f"{'fixed ' + str(size):>14}" for size in FIXED_CHUNKS)
+    print(f"{'plugin':<10}{'in-process':>14}{header}{'adaptive':>14}{'chunk':>10}")
+    for command in (AddCommand(), DivideCommand(), MultiplyCommand()):
+        expected = _map_chunk(command, operands1, operands2)[0]
+        ParallelMap.map(command, operands1[:1000], operands2[:1000])  # probe
+        assert ParallelMap.map(command, operands1, operands2) == expected
+        in_process = best_of(lambda: _map_chunk(command, operands1, operands2))
+        fixed = []
+        for size in FIXED_CHUNKS:
+            # One pair per task is far too slow to run in full; time a sample and extrapolate.
+            sample = pairs if size > 1 else min(pairs, 5000)
+            fixed.append(best_of(lambda: fixed_path(command, operands1[:sample], operands2[:sample], size), 1)
+                         * pairs / sample)
+        adaptive = best_of(lambda: ParallelMap.map(command, operands1, operands2))
+        columns = "".join(f"{seconds * 1000:>12.0f}ms" for seconds in fixed)
+        print(f"{command.operation_name:<10}{in_process * 1000:>12.0f}ms{columns}"
+              f"{adaptive * 1000:>12.0f}ms{ParallelMap.stats()[command.operation_name]['chunk']:>10,}")
+    print("fixed 1 is extrapolated from the first 5,000 pairs")
+    WorkerPool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
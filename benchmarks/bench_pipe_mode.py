@@ -0,0 +1,66 @@
+"""
+Throughput benchmark of piping calculation lines into the REPL versus the pipe mode.
+
+It writes a file of `<operation> <num1> <num2>` lines and feeds it as standard input to
+
+    repl   python main.py repl    (input(), prompts, per-line print and logging)
+    pipe   python main.py pipe    (block reads, command table, buffered output)
+
+with output discarded, and prints the wall time and lines/sec of each. The wall time
+includes interpreter startup, so small inputs understate the difference.
+
+Usage:
+    python benchmarks/bench_pipe_mode.py [lines] [flush_lines]   (default: 200000 4096)
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+
+
+def write_input(path: str, lines: int):
+    """
+    Writes `lines` calculation lines with small random operands, then `exit`.
+    """
+    rng = random.Random(7)
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.writelines(f"{rng.choice(OPERATIONS)} {rng.randint(1, 9999)} {rng.randint(1, 999)}\n"
+                          for _ in range(lines))
+        stream.write("exit\n")
+
+
+def run(mode: list, path: str) -> float:
+    """
+    Runs main.py in `mode` with the file as standard input and returns the wall time.
+    """
+    with open(path, "rb") as stream:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", *mode], cwd=ROOT, stdin=stream,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return time.perf_counter() - start
+
+
+def main():
+    """
+    Prints the wall time and throughput of both modes.
+    """
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    flush = sys.argv[2] if len(sys.argv) > 2 else "4096"
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "commands.txt")
+        write_input(path, lines)
+        print(f"{lines:,} lines")
+        print(f"{'mode':>6}{'seconds':>10}{'lines/sec':>12}")
+        for name, mode in (("repl", ["repl"]), ("pipe", ["pipe", "--flush", flush])):
+            seconds = run(mode, path)
+            print(f"{name:>6}{seconds:>10.3f}{lines / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Load client for the calculation server.
+
+Opens several connections and pipelines requests on each one, keeping a fixed number
+in flight. Reports throughput and the p50/p99 latency of individual requests. Each
+latency runs from the moment a request is written to the moment its response line
+arrives. Unless `--port` or `--unix` points at a running server, the client starts
+`python main.py serve` on a free port and stops it afterwards.
+
+Usage:
+    python benchmarks/bench_server.py [--requests N] [--connections N] [--pipeline N]
+                                      [--port N | --unix PATH]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUESTS = ["add 5 3", "subtract 10 4", "multiply 2.5 4", "divide 1 3"]
+
+
+def free_port() -> int:
+    """
+    Returns a TCP port that is currently free on localhost.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_server(port: int):
+    """
+    Waits until the server started by this client accepts connections.
+    """
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise ConnectionError("Calculation server did not start.")
+
+
+async def open_connection(options):
+    """
+    Connects to the server over TCP or the Unix socket.
+    """
+    if options.unix:
+        return await asyncio.open_unix_connection(options.unix)
+    return await asyncio.open_connection("127.0.0.1", options.port)
+
+
+async def run_connection(options, count: int, latencies: list) -> int:
+    """
+    Sends `count` requests on one connection with up to `options.pipeline` in flight.
+
+    Returns:
+        int: Number of ERR responses.
+    """
+    reader, writer = await open_connection(options)
+    sent_at = deque()
+    window = asyncio.Semaphore(options.pipeline)
+    errors = 0
+
+    async def send():
+        for number in range(count):
+            await window.acquire()
+            sent_at.append(time.perf_counter())
+            writer.write(f"{REQUESTS[number % len(REQUESTS)]}\n".encode("utf-8"))
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for _ in range(count):
+        line = await reader.readline()
+        latencies.append(time.perf_counter() - sent_at.popleft())
+        window.release()
+        errors += line.startswith(b"ERR")
+    await sender
+    writer.close()
+    await writer.wait_closed()
+    return errors
+
+
+async def run_load(options) -> tuple:
+    """
+    Runs every connection concurrently.
+
+    Returns:
+        tuple: (latencies in seconds, error count, elapsed seconds).
+    """
+    latencies = []
+    share = options.requests // options.connections
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(run_connection(options, share, latencies)
+                                    for _ in range(options.connections)))
+    return latencies, sum(errors), time.perf_counter() - start
+
+
+def main():
+    """
+    Parses options, runs the load and prints throughput and latency percentiles.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--pipeline", type=int, default=64, help="requests in flight per connection")
+    parser.add_argument("--port", type=int, help="use a server already listening on this port")
+    parser.add_argument("--unix", help="use a server already listening on this Unix socket")
+    options = parser.parse_args()
+
+    server = None
+    if options.port is None and options.unix is None:
+        options.port = free_port()
+        server = subprocess.Popen([sys.executable, "main.py", "serve", "--port", str(options.port)],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        if server is not None:
+            wait_for_server(options.port)
+        latencies, errors, elapsed = asyncio.run(run_load(options))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"requests: {len(latencies)} ({errors} errors) over {options.connections} connections, "
+          f"pipeline {options.pipeline}")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} requests/sec")
+    print(f"latency: p50 {percentiles[49] * 1000:.3f}ms, p99 {percentiles[98] * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark of multiprocessing batch transports: pickled queues versus shared memory.
+
+For each batch size it times `divide` over float64 operand pairs through four paths:
+
+    in-process   one `execute_batch` call in the parent (no transport at all)
+    per-pair     `WorkerPool.run_command` per pair, the `execute_multiprocessing` contract
+                 (only timed up to PER_PAIR_LIMIT pairs and extrapolated beyond)
+    queue        the batch split into the same slices, each pickled through the pool's
+                 queues as operand arrays and returned as result arrays
+    shared       `execute_batch_shared`: operands and results in one shared-memory block,
+                 only descriptors on the queues
+
+Usage:
+    python benchmarks/bench_shared_batch.py [max_pairs] [workers]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+import numpy as np
+from app.plugins.divide_command import DivideCommand
+from app.shared_batch import SLICES_PER_WORKER, execute_batch_shared
+from app.worker_pool import WorkerPool
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+PER_PAIR_LIMIT = 10_000
+
+
+def _execute_pickled(command, operands1, operands2):
+    """
+    Worker-side entry point of the queue path: operands and results travel pickled.
+    """
+    return command.execute_batch(operands1, operands2, "float")
+
+
+def queue_path(command, operands1, operands2) -> "np.ma.MaskedArray":
+    """
+    Splits the batch like the shared path, but ships every slice through the queues.
+    """
+    slices = SLICES_PER_WORKER * WorkerPool.worker_count()
+    bounds = [len(operands1) * index // slices for index in range(slices + 1)]
+    futures = [WorkerPool.submit(_execute_pickled, command, operands1[start:stop], operands2[start:stop])
+               for start, stop in zip(bounds, bounds[1:])]
+    return np.ma.concatenate([future.result() for future in futures])
+
+
+def per_pair_path(command, operands1, operands2) -> list:
+    """
+    One pool task per pair, as `mp` calculations do.
+    """
+    return [WorkerPool.run_command(command, num1, num2) for num1, num2 in zip(operands1, operands2)]
+
+
+def best_of(function, repeats: int = 3) -> float:
+    """
+    Returns the best wall time of a few runs, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """
+    Prints the time per batch and the throughput of each path at every size.
+    """
+    max_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    if len(sys.argv) > 2:
+        WorkerPool.configure(int(sys.argv[2]))
+    command = DivideCommand()
+    rng = np.random.default_rng(7)
+    WorkerPool.run_command(command, 1.0, 2.0)  # start the pool outside the timings
+
+    print(f"{WorkerPool.worker_count()} workers")
+    print(f"{'pairs':>12}{'in-process':>14}{'per-pair':>14}{'queue':>14}{'shared':>14}{'shared Mpairs/s':>17}")
+    for pairs in (size for size in SIZES if size <= max_pairs):
+        operands1 = rng.uniform(-1e6, 1e6, pairs)
+        operands2 = rng.integers(0, 100, pairs).astype(np.float64)
+        expected = command.execute_batch(operands1, operands2, "float")
+        shared = execute_batch_shared(command, operands1, operands2, min_pairs=0)
+        assert np.array_equal(np.ma.getmaskarray(shared), np.ma.getmaskarray(expected))
+        assert np.array_equal(shared.filled(0), expected.filled(0))
+
+        in_process = best_of(lambda: command.execute_batch(operands1, operands2, "float"))
+        sample = min(pairs, PER_PAIR_LIMIT)
+        per_pair = best_of(lambda: per_pair_path(command, operands1[:sample], operands2[:sample]), 1)
+        per_pair *= pairs / sample
+        queued = best_of(lambda: queue_path(command, operands1, operands2))
+        shared_time = best_of(lambda: execute_batch_shared(command, operands1, operands2, min_pairs=0))
+        marker = "*" if sample < pairs else " "
+        print(f"{pairs:>12,}{in_process * 1000:>12.1f}ms{per_pair * 1000:>12.0f}ms{marker}"
+              f"{queued * 1000:>12.1f}ms{shared_time * 1000:>12.1f}ms{pairs / shared_time / 1e6:>17.1f}")
+    print("* extrapolated from the first 10,000 pairs")
+    WorkerPool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Startup-time benchmark for one-shot CLI calculations.
+
+Runs `python main.py 5 3 add` repeatedly in fresh interpreters and reports the median
+wall time. With `--imports`, also prints the slowest imports of a single run, taken
+from Python's `-X importtime` output.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--imports] [--top N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMAND = [sys.executable, "main.py", "5", "3", "add"]
+
+
+def time_runs(runs: int) -> list:
+    """
+    Returns the wall time in seconds of each one-shot run.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(COMMAND, cwd=ROOT, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def import_breakdown(top: int) -> list:
+    """
+    Returns (cumulative microseconds, module) pairs for the slowest imports of one run.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", *COMMAND[1:]],
+                               cwd=ROOT, check=True, capture_output=True, text=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    """
+    Parses options, runs the benchmark and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--imports", action="store_true", help="print an import-time breakdown")
+    parser.add_argument("--top", type=int, default=15)
+    options = parser.parse_args()
+
+    time_runs(1)  # warm the plugin manifest and the OS file cache
+    timings = time_runs(options.runs)
+    print(f"one-shot add: median {statistics.median(timings) * 1000:.1f}ms, "
+          f"min {min(timings) * 1000:.1f}ms over {options.runs} runs")
+
+    if options.imports:
+        print(f"{'cumulative ms':>14}  module")
+        for cumulative, module in import_breakdown(options.top):
+            print(f"{cumulative / 1000:>14.1f}  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Micro-benchmark suite for the plugin, history and dispatch hot paths.
+
+Every case is timed with `timeit`-style auto-ranging: the loop count grows until one
+repeat takes at least MIN_REPEAT_SECONDS. The best of several repeats is reported as
+seconds per operation. Cases are parameterized over history sizes and operand magnitudes.
+
+Results can be saved as JSON and compared against a stored baseline. The run exits with
+status 1 when any case is slower than its baseline by more than the threshold.
+
+Usage:
+    python benchmarks/run_suite.py [--quick] [--filter TEXT] [--save results.json]
+                                   [--compare baseline.json] [--threshold 0.25]
+
+Typical workflow:
+    python benchmarks/run_suite.py --save benchmarks/baseline.json      # on the base commit
+    python benchmarks/run_suite.py --compare benchmarks/baseline.json   # on the change
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# pylint: disable=wrong-import-position
+from app.expression import Expressions
+from app.pandas_facade import PandasFacade
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.result_cache import ResultCache
+from app.worker_pool import WorkerPool
+from main import discover_plugins
+
+MIN_REPEAT_SECONDS = 0.05
+REPEATS = 5
+HISTORY_SIZES = [1_000, 100_000]
+QUICK_HISTORY_SIZES = [1_000, 10_000]
+MAGNITUDES = {"small": 1, "medium": 12, "large": 28}
+OPERATIONS = ["add", "subtract", "multiply", "divide"]
+EXPRESSION = "(a + b) * mean(c, d) / 3"
+EXPRESSION_BINDINGS = 10_000
+
+CASES = []
+
+
+def case(name: str, **parameters):
+    """
+    Registers a benchmark case for every combination of the given parameter lists.
+
+    The decorated function receives one value per parameter and returns the
+    zero-argument callable to time.
+    """
+    def register(setup):
+        combinations = [{}]
+        for key, values in parameters.items():
+            combinations = [{**combo, key: value} for combo in combinations for value in values]
+        for combo in combinations:
+            label = ",".join(f"{key}={value}" for key, value in combo.items())
+            CASES.append((f"{name}[{label}]" if label else name, setup, combo))
+        return setup
+    return register
+
+
+def operand(digits: int) -> Decimal:
+    """
+    Returns a random Decimal with the given number of significant digits.
+    """
+    return Decimal(random.randrange(10 ** (digits - 1), 10 ** digits)).scaleb(-(digits // 2))
+
+
+def history(size: int) -> PandasFacade:
+    """
+    Returns a facade holding `size` records spread over the built-in operations.
+    """
+    facade = PandasFacade()
+    for row in range(size):
+        facade.add_record({"operation": OPERATIONS[row % len(OPERATIONS)], "operand1": Decimal(row),
+                           "operand2": Decimal(2), "result": Decimal(row + 2)})
+    return facade
+
+
+def sizes():
+    """
+    Returns the history sizes for the current run.
+    """
+    return QUICK_HISTORY_SIZES if "--quick" in sys.argv else HISTORY_SIZES
+
+
+@case("command.add_execute", magnitude=list(MAGNITUDES))
+def bench_add_execute(magnitude):
+    command, num1, num2 = AddCommand(), operand(MAGNITUDES[magnitude]), operand(MAGNITUDES[magnitude])
+    return lambda: command.execute(num1, num2)
+
+
+@case("command.divide_execute", magnitude=list(MAGNITUDES))
+def bench_divide_execute(magnitude):
+    command, num1, num2 = DivideCommand(), operand(MAGNITUDES[magnitude]), operand(MAGNITUDES[magnitude])
+    return lambda: command.execute(num1, num2)
+
+
+@case("history.add_record", size=sizes())
+def bench_add_record(size):
+    facade = history(size)
+    record = {"operation": "add", "operand1": Decimal(1), "operand2": Decimal(2), "result": Decimal(3)}
+    return lambda: facade.add_record(record)
+
+
+@case("history.filter_by_operation", size=sizes())
+def bench_filter(size):
+    facade = history(size)
+    return lambda: facade.filter_by_operation("divide")
+
+
+@case("history.save_to_file", size=sizes(), file_type=["csv", "calchist"])
+def bench_save(size, file_type):
+    facade = history(size)
+    path = os.path.join(tempfile.mkdtemp(), f"history.{file_type}")
+    return lambda: facade.save_to_file(path)
+
+
+@case("history.load_from_file", size=sizes(), file_type=["csv", "calchist"])
+def bench_load(size, file_type):
+    path = os.path.join(tempfile.mkdtemp(), f"history.{file_type}")
+    history(size).save_to_file(path)
+
+    def load():
+        facade = PandasFacade()
+        facade.load_from_file(path)
+        return len(facade.columns["operation"])
+    return load
+
+
+@case("plugins.discover")
+def bench_discover():
+    discover_plugins()
+    return discover_plugins
+
+
+@case("dispatch.result_cache_hit")
+def bench_cache_hit():
+    ResultCache.configure()
+    command, num1, num2 = AddCommand(), Decimal(5), Decimal(3)
+    ResultCache.execute(command, num1, num2)
+    return lambda: ResultCache.execute(command, num1, num2)
+
+
+@case("dispatch.mp", magnitude=["small", "large"])
+def bench_mp(magnitude):
+    command, num1, num2 = AddCommand(), operand(MAGNITUDES[magnitude]), operand(MAGNITUDES[magnitude])
+    WorkerPool.run_command(command, num1, num2)
+    return lambda: WorkerPool.run_command(command, num1, num2)
+
+
+@case("expression.compile")
+def bench_expression_compile():
+    commands = discover_plugins()
+
+    def compile_uncached():
+        Expressions.clear()
+        return Expressions.compile(EXPRESSION, commands, "decimal")
+    return compile_uncached
+
+
+@case("expression.evaluate", cached=["hit", "bindings"])
+def bench_expression_evaluate(cached):
+    commands = discover_plugins()
+    values = {name: Decimal(position + 1) for position, name in enumerate("abcd")}
+    if cached == "hit":
+        return lambda: Expressions.compile(EXPRESSION, commands, "decimal").evaluate(values)
+    columns = {name: [value] * EXPRESSION_BINDINGS for name, value in values.items()}
+    expression = Expressions.compile(EXPRESSION, commands, "decimal")
+    return lambda: expression.evaluate_many(columns)
+
+
+def measure(function) -> dict:
+    """
+    Times a callable and returns the best seconds per call with the loop size used.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        if time.perf_counter() - start >= MIN_REPEAT_SECONDS:
+            break
+        number *= 2
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {"seconds_per_op": best, "number": number, "repeats": REPEATS}
+
+
+def run(selected: str) -> dict:
+    """
+    Runs every case whose name contains `selected` and prints one line per case.
+    """
+    random.seed(0)
+    results = {}
+    for name, setup, parameters in CASES:
+        if selected and selected not in name:
+            continue
+        results[name] = measure(setup(**parameters))
+        print(f"{name:<55} {format_time(results[name]['seconds_per_op']):>12}", flush=True)
+    return results
+
+
+def format_time(seconds: float) -> str:
+    """
+    Formats a duration with a readable unit.
+    """
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Prints each case's change against the baseline and returns the names that regressed.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["seconds_per_op"], result["seconds_per_op"]
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSED"
+        print(f"{name:<55} {format_time(before):>12} {format_time(after):>12} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    """
+    Parses options, runs the suite, saves and compares results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="use smaller history sizes")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains TEXT")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against a baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a case counts as a regression (0.25 = 25%%)")
+    options = parser.parse_args()
+
+    try:
+        results = run(options.filter)
+    finally:
+        WorkerPool.shutdown()
+
+    if options.save:
+        with open(options.save, "w", encoding="utf-8") as stream:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, stream, indent=2)
+        print(f"Results saved to {options.save}")
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as stream:
+            baseline = json.load(stream)["results"]
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {options.threshold:.0%}.")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
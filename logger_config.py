@@ -1,15 +1,103 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+
+OVERFLOW_POLICIES = ("block", "drop_new", "drop_oldest")
+DEFAULT_QUEUE_SIZE = 10000
+
+_listener = None
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for a background listener, applying an overflow policy when the queue is full.
+
+    Policies: "block" waits for room, "drop_new" discards the incoming record and
+    "drop_oldest" discards the oldest queued record to make room.
+    """
+
+    def __init__(self, record_queue, overflow: str = "block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown log queue overflow policy '{overflow}'")
+        super().__init__(record_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only merge the arguments into the message so later changes to them cannot
+        # leak into the log; timestamps, layout and I/O are left to the listener.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                self.dropped += 1
+                if self.overflow == "drop_new":
+                    return
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener whose stop sentinel waits for room instead of failing on a full queue.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def stop_queue_logging():
+    """
+    Drains the log queue, writes every pending record and closes the handlers.
+
+    Registered with atexit when queued logging is enabled; safe to call more than once.
+    """
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    root = logging.getLogger()
+    queue_handlers = [handler for handler in root.handlers if isinstance(handler, BoundedQueueHandler)]
+    for handler in queue_handlers:
+        root.removeHandler(handler)
+    listener.stop()
+    dropped = sum(handler.dropped for handler in queue_handlers)
+    for handler in listener.handlers:
+        if dropped:
+            handler.handle(logging.makeLogRecord({
+                "name": "root", "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"Log queue overflow dropped {dropped} records."}))
+        handler.flush()
+        handler.close()
+
 
 # Configure logging with dynamic settings
-def configure_logging(log_level=None):
+def configure_logging(log_level=None, use_queue=None):
+    global _listener
     os.makedirs("logs", exist_ok=True)  # Ensure the logs directory exists
+    stop_queue_logging()  # Flush a previous queued configuration before replacing it
 
     # Load environment variables for logging configuration if not explicitly passed
     log_level = log_level or os.getenv("LOG_LEVEL", "INFO").upper()  # Default to INFO if not set
     log_file = os.getenv("LOG_FILE", "logs/application.log")  # Default log file location
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    if use_queue is None:
+        use_queue = os.getenv("LOG_QUEUE", "").lower() in ("1", "true", "yes")
 
     # Configure logging settings
     logging_config = {
@@ -42,4 +130,18 @@ def configure_logging(log_level=None):
     }
 
     # Apply logging configuration
-    logging.config.dictConfig(logging_config)
\ No newline at end of file
+    logging.config.dictConfig(logging_config)
+
+    if use_queue:
+        # Move the configured handlers behind a bounded queue: callers only enqueue
+        # records while a background thread formats and writes them.
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        for handler in handlers:
+            root.removeHandler(handler)
+        record_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE))))
+        root.addHandler(BoundedQueueHandler(record_queue, os.getenv("LOG_QUEUE_OVERFLOW", "block")))
+        _listener = _FlushingQueueListener(record_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.unregister(stop_queue_logging)
+        atexit.register(stop_queue_logging)
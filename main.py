@@ -1,16 +1,34 @@
+import csv
+import functools
 import os
+import re
 import sys
-import importlib
-import multiprocessing
+import time
 import logging
 import logging.config
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal, InvalidOperation, getcontext
 from collections import OrderedDict
 from dotenv import load_dotenv
 from app.calculations import Calculations
 from app.calculation import Calculation
+from app.batch import run_batch
+from app.worker_pool import WorkerPool
+from app.result_cache import ResultCache
+from app.metrics import Metrics, DEFAULT_EXPORT_INTERVAL
+from app.running_stats import RunningStats, stats_from_path
+from app.numeric_backend import BACKENDS, NumericBackend, parse_operand
+from app.expression import Expressions
+from app.history_query import QueryError
+from app.dag_scheduler import DagScheduler
+from app.parallel_map import ParallelMap
+from app.pipe_mode import DEFAULT_BLOCK_SIZE, DEFAULT_FLUSH_LINES, BufferedOutput, calculation_handler, run_pipe
+from app.plugin_registry import load_registry
+from app.lazy_import import lazy_import
 from logger_config import configure_logging
 
+# asyncio is only needed by `serve`, so the server module loads on first use.
+server = lazy_import("app.server")
+
 def initialize_environment():
     """
     Loads environment variables from .env and returns them as a dictionary.
@@ -22,47 +40,40 @@ def initialize_environment():
 
 def discover_plugins():
     """
-    Scans the plugins directory and loads command plugins dynamically.
-    
+    Scans the plugins directory and registers command plugins.
+
+    Plugin modules are listed from a cached manifest and only imported when their
+    command is first used.
+
     Returns:
-        OrderedDict: A dictionary mapping command names to command instances.
+        PluginRegistry: A mapping of command names to command instances.
     """
-    commands_registry = OrderedDict()
     plugin_path = os.path.join('app', 'plugins')
 
     if not os.path.exists(plugin_path):
         logging.warning(f"Plugin directory missing: {plugin_path}")
-        return commands_registry
-
-    for file in os.listdir(plugin_path):
-        if file.endswith('_command.py'):
-            try:
-                module_name = file[:-3]
-                module = importlib.import_module(f'app.plugins.{module_name}')
-                class_name = module_name[:-8].capitalize() + 'Command'
-                command_class = getattr(module, class_name)
-                commands_registry[module_name[:-8]] = command_class()
-                logging.info(f"Plugin loaded: {module_name}")
-            except (ImportError, AttributeError) as e:
-                logging.error(f"Error loading plugin {module_name}: {e}")
-
-    return commands_registry
+        return OrderedDict()
+
+    return load_registry(plugin_path)
 
 def execution_logger(func):
     """
-    Decorator to log execution of the decorated function.
+    Decorator to log execution of the decorated function and how long it took.
     """
     def wrapper(*args, **kwargs):
         logging.info(f"Running: {func.__name__}")
+        start = time.perf_counter()
         try:
             return func(*args, **kwargs)
         except Exception as ex:
             logging.error(f"Error during {func.__name__}: {ex}")
             raise
+        finally:
+            logging.debug(f"Finished: {func.__name__} in {(time.perf_counter() - start) * 1000:.3f}ms")
     return wrapper
 
 @execution_logger
-def process_calculation_and_output(operand1, operand2, operation_key, commands, parallel=False):
+def process_calculation_and_output(operand1, operand2, operation_key, commands, parallel=False, backend=None):
     """
     Executes the selected operation and displays the result.
 
@@ -72,10 +83,13 @@ def process_calculation_and_output(operand1, operand2, operation_key, commands,
         operation_key (str): Name of the operation.
         commands (dict): Registered command objects.
         parallel (bool): Use multiprocessing if True.
+        backend (str): Numeric backend for this calculation; defaults to the session backend.
     """
     try:
-        num1, num2 = map(Decimal, [operand1, operand2])
-        operation = commands.get(operation_key)
+        with Metrics.stage("parse", operation_key):
+            backend = backend or NumericBackend.current()
+            num1, num2 = (parse_operand(operand, backend) for operand in (operand1, operand2))
+            operation = commands.get(operation_key)
 
         if not operation:
             logging.warning(f"Unknown operation: {operation_key}")
@@ -83,30 +97,25 @@ def process_calculation_and_output(operand1, operand2, operation_key, commands,
             return
 
         if parallel:
-            result_queue = multiprocessing.Queue()
-            process = multiprocessing.Process(
-                target=operation.execute_multiprocessing,
-                args=(num1, num2, result_queue)
-            )
-            process.start()
-            process.join()
-
-            if not result_queue.empty():
-                result = result_queue.get()
-                logging.info(f"Multiprocessing result for {operation_key}: {result}")
+            with Metrics.stage("dispatch", operation_key):
+                result = WorkerPool.run_command(operation, num1, num2)
+            logging.info(f"Multiprocessing result for {operation_key}: {result}")
+            with Metrics.stage("output", operation_key):
                 print(f"{operand1} {operation_key} {operand2} (multiprocessing) = {result}")
-            else:
-                logging.error("Failed to fetch result from multiprocessing queue.")
-                print("Multiprocessing calculation failed.")
+            if isinstance(result, Exception):
+                raise result
         else:
-            result = operation.execute(num1, num2)
+            with Metrics.stage("dispatch", operation_key):
+                result = ResultCache.execute(operation, num1, num2)
             logging.info(f"Result for {operation_key}: {result}")
-            print(f"{operand1} {operation_key} {operand2} = {result}")
-
-        # Save the calculation
-        calc = Calculation(num1, num2, operation)
-        calc_result = calc.operate()
-        Calculations.add_calculation(calc)
+            with Metrics.stage("output", operation_key):
+                print(f"{operand1} {operation_key} {operand2} = {result}")
+
+        # Save the calculation with the result computed above
+        with Metrics.stage("history_append", operation_key):
+            calc = Calculation(num1, num2, operation, backend)
+            calc.result = result
+            Calculations.add_calculation(calc)
         logging.debug("Calculation added to history.")
 
     except InvalidOperation:
@@ -116,6 +125,475 @@ def process_calculation_and_output(operand1, operand2, operation_key, commands,
         logging.error(f"Unexpected error: {error}")
         print(f"Unexpected error occurred: {error}")
 
+@execution_logger
+def run_statistic(command, arguments):
+    """
+    Computes an N-ary statistic over numbers, a file (`--file PATH`) or standard input (`-`).
+
+    Args:
+        command (StatisticCommand): The statistic to compute.
+        arguments (list): Numbers, or `--file PATH`, or `-`.
+    """
+    try:
+        if arguments == ['-'] or (len(arguments) == 2 and arguments[0] == '--file'):
+            stats = stats_from_path(arguments[-1])
+        else:
+            stats = RunningStats.of(Decimal(argument) for argument in arguments)
+        result = command.statistic(stats)
+        logging.info(f"Result for {command.operation_name} over {stats.count} values: {result}")
+        print(f"{command.operation_name} of {stats.count} values = {result}")
+    except InvalidOperation:
+        logging.error(f"Invalid input values for {command.operation_name}")
+        print("Error: Input contains a value that is not a valid number.")
+    except (ValueError, OSError) as error:
+        logging.error(f"Statistic {command.operation_name} failed: {error}")
+        print(f"Error: {error}")
+
+def read_bindings(arguments, backend):
+    """
+    Collects expression variable values from `name=v1,v2,...` tokens or a `--file` CSV.
+
+    Args:
+        arguments (list): Binding tokens, or `--file PATH` whose header names the variables.
+        backend (str): Numeric backend the values are parsed for.
+
+    Returns:
+        dict: Variable name -> list of numbers.
+    """
+    if arguments[:1] == ['--file']:
+        with open(arguments[1], newline='', encoding='utf-8') as stream:
+            rows = list(csv.reader(stream))
+        texts = dict(zip(rows[0], zip(*rows[1:]))) if rows else {}
+    else:
+        texts = dict(argument.split('=', 1) for argument in arguments)
+        texts = {name: values.split(',') for name, values in texts.items()}
+    parsed = {}
+    columns = {}
+    for name, values in texts.items():
+        for text in set(values) - parsed.keys():
+            parsed[text] = parse_operand(text.strip(), backend)
+        columns[name.strip()] = list(map(parsed.__getitem__, values))
+    return columns
+
+@execution_logger
+def run_expression(arguments, commands):
+    """
+    Evaluates an expression once, or over many variable bindings.
+
+    Args:
+        arguments (list): Expression tokens followed by `name=v1,v2,...` bindings or `--file PATH`.
+        commands (dict): Registered command objects.
+    """
+    split = next((position for position, argument in enumerate(arguments)
+                  if argument == '--file' or re.match(r'^[A-Za-z]\w*=', argument)), len(arguments))
+    source = " ".join(arguments[:split])
+    try:
+        backend = NumericBackend.current()
+        expression = Expressions.compile(source, commands, backend)
+        columns = read_bindings(arguments[split:], backend)
+        sizes = {len(values) for values in columns.values()}
+        if sizes and sizes != {1}:
+            start = time.perf_counter()
+            results = expression.evaluate_many(columns, record=True)
+            elapsed = time.perf_counter() - start
+            with Metrics.stage("output", "eval"):
+                sys.stdout.write("".join(f"{result}\n" for result in results))
+            print(f"Evaluated {len(results)} bindings in {elapsed:.3f}s")
+            return
+        result = expression.evaluate({name: values[0] for name, values in columns.items()}, record=True)
+        logging.info(f"Result for eval {expression.source}: {result}")
+        with Metrics.stage("output", "eval"):
+            print(f"{expression.source} = {result}")
+    except InvalidOperation:
+        logging.error(f"Invalid values for expression: {source}")
+        print("Error: A bound value is not a valid number.")
+    except (ArithmeticError, ValueError, OSError) as error:
+        logging.error(f"Expression '{source}' failed: {error}")
+        print(f"Error: {error}")
+
+@execution_logger
+def run_workload(arguments, commands):
+    """
+    Runs a workload of named, dependent calculations (`dag <file> [--serial]`).
+
+    Args:
+        arguments (list): The workload path, optionally followed by `--serial`.
+        commands (dict): Registered command objects.
+    """
+    try:
+        scheduler = DagScheduler.from_file(arguments[0], commands)
+        report = scheduler.run(parallel=arguments[1:] != ['--serial'])
+    except (ValueError, OSError) as error:
+        logging.error(f"Workload {arguments[0]} failed: {error}")
+        print(f"Error: {error}")
+        return
+    for name, value in report["results"].items():
+        print(f"{name} = {value}")
+    print(f"{report['calls']} calls -> {report['tasks']} tasks in {report['waves']} waves "
+          f"(critical path {report['critical_path_tasks']} tasks, "
+          f"{report['critical_path_seconds'] * 1000:.3f}ms)")
+    print(f"Work {report['work_seconds'] * 1000:.3f}ms, wall {report['wall_seconds'] * 1000:.3f}ms, "
+          f"speedup {report['speedup']:.2f}x (ideal {report['ideal_speedup']:.2f}x)")
+
+def read_operand_pairs(arguments):
+    """
+    Returns the operand texts of `map`: two comma-separated lists, or `--file PATH`.
+
+    The file is a CSV with operand1 and operand2 columns.
+    """
+    if arguments[0] == '--file':
+        with open(arguments[1], newline='', encoding='utf-8') as stream:
+            rows = list(csv.DictReader(stream))
+        return [row['operand1'] for row in rows], [row['operand2'] for row in rows]
+    return arguments[0].split(','), arguments[1].split(',')
+
+@execution_logger
+def run_map(arguments, commands):
+    """
+    Applies one operation to many operand pairs with ParallelMap and prints each result.
+
+    Args:
+        arguments (list): `<operation> <a1,a2,...> <b1,b2,...> [backend]` or
+            `<operation> --file PATH [backend]`.
+        commands (dict): Registered command objects.
+    """
+    operation_key, *rest = arguments
+    command = commands.get(operation_key)
+    if command is None:
+        print(f"Error: Unknown operation '{operation_key}'")
+        return
+    if len(rest) not in (2, 3):
+        print("Usage: map <operation> <a1,a2,...> <b1,b2,...> [decimal|float|fraction]")
+        print("       map <operation> --file pairs.csv [decimal|float|fraction]")
+        return
+    try:
+        backend = rest[2].lower() if len(rest) == 3 else NumericBackend.current()
+        texts1, texts2 = read_operand_pairs(rest[:2])
+        parsed = {}
+        for text in set(texts1).union(texts2):
+            parsed[text] = parse_operand(text.strip(), backend)
+        operands1, operands2 = [parsed[text] for text in texts1], [parsed[text] for text in texts2]
+        start = time.perf_counter()
+        results = ParallelMap.map(command, operands1, operands2)
+        elapsed = time.perf_counter() - start
+    except InvalidOperation:
+        print("Error: One or more inputs are not valid numbers.")
+        return
+    except (KeyError, ValueError, OSError) as error:
+        logging.error(f"Map {operation_key} failed: {error}")
+        print(f"Error: {error}")
+        return
+    with Metrics.stage("output", operation_key):
+        sys.stdout.write("".join(
+            f"{text1} {operation_key} {text2} = {result}\n" if not isinstance(result, Exception)
+            else f"{text1} {operation_key} {text2}: Error: {result}\n"
+            for text1, text2, result in zip(texts1, texts2, results)))
+    print(f"Mapped {len(results)} pairs in {elapsed:.3f}s")
+    tuning = ParallelMap.stats().get(operation_key)
+    if tuning is not None and WorkerPool.worker_count() > 1:
+        print(f"{tuning['chunks']} chunks of up to {tuning['chunk']} pairs, "
+              f"{tuning['item_seconds'] * 1e6:.2f}us per pair, latency {tuning['latency'] * 1000:.3f}ms")
+
+def print_load_progress(loaded_bytes, total_bytes):
+    """
+    Prints an in-place progress line while a history file loads.
+    """
+    percent = loaded_bytes / total_bytes * 100 if total_bytes else 100.0
+    print(f"\rLoading history: {percent:5.1f}%", end="", flush=True)
+
+def print_stats(arguments):
+    """
+    Handles the `stats [on|off|reset]` REPL command, printing the latency histograms.
+    """
+    if arguments == ['on'] or arguments == ['off']:
+        Metrics.enable(arguments[0] == 'on')
+        print(f"Metrics {'enabled' if Metrics.is_enabled() else 'disabled'}.")
+        return
+    if arguments == ['reset']:
+        Metrics.reset()
+        print("Metrics reset.")
+        return
+    rows = Metrics.summary()
+    if not rows:
+        state = "enabled" if Metrics.is_enabled() else "disabled (use 'stats on' or METRICS=1)"
+        print(f"No timings recorded. Metrics are {state}.")
+        return
+    print(f"{'stage':<16}{'command':<20}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for row in rows:
+        print(f"{row['stage']:<16}{row['command']:<20}{row['count']:>8}"
+              f"{row['mean'] * 1000:>10.3f}{row['p50'] * 1000:>10.3f}"
+              f"{row['p99'] * 1000:>10.3f}{row['max'] * 1000:>10.3f}")
+
+def parse_calculation_options(tokens):
+    """
+    Parses the optional trailing `[decimal|float|fraction] [mp]` tokens of a calculation.
+
+    Args:
+        tokens (list): Tokens after the operands (or, on the command line, after the operation).
+
+    Returns:
+        tuple: (parallel, backend) with backend None for the session default, or None when
+            the tokens are not valid options.
+    """
+    parallel, backend = False, None
+    for token in tokens:
+        token = token.lower()
+        if token == 'mp' and not parallel:
+            parallel = True
+        elif token in BACKENDS and backend is None and not parallel:
+            backend = token
+        else:
+            return None
+    return parallel, backend
+
+def parse_batch_options(tokens):
+    """
+    Parses the optional trailing `[decimal|float] [mp]` tokens of a batch job.
+
+    `mp` splits float64 groups across the worker pool, so it is only accepted after `float`;
+    exact Decimal batches always run in-process.
+
+    Returns:
+        tuple: (backend, parallel), or None when the tokens are not valid options.
+    """
+    options = [token.lower() for token in tokens]
+    if options in ([], ['decimal'], ['float']):
+        return (options or ['decimal'])[0], False
+    if options == ['float', 'mp']:
+        return 'float', True
+    return None
+
+def run_batch_job(arguments, commands):
+    """
+    Runs a batch file through the plugins and prints its throughput summary.
+
+    Args:
+        arguments (list): `<input> <output> [decimal|float] [mp]`.
+        commands (dict): Registered command objects.
+    """
+    input_path, output_path, *rest = arguments
+    options = parse_batch_options(rest)
+    if options is None:
+        print("Usage: batch <input.csv|.jsonl> <output.csv|.jsonl> [decimal|float [mp]]")
+        return
+    backend, parallel = options
+    try:
+        summary = run_batch(input_path, output_path, commands, backend=backend, parallel=parallel)
+    except (OSError, ValueError) as error:
+        logging.error(f"Batch {input_path} failed: {error}")
+        print(f"Error: {error}")
+        print("Usage: batch <input.csv|.jsonl> <output.csv|.jsonl> [decimal|float [mp]]")
+        return
+    print(f"Processed {summary['rows']} rows ({summary['errors']} errors) "
+          f"in {summary['seconds']:.2f}s ({summary['rows_per_sec']:.0f} rows/sec)")
+
+def set_backend(arguments):
+    """
+    Handles the `backend [decimal|float|fraction] [precision]` REPL command.
+    """
+    try:
+        if arguments:
+            precision = int(arguments[1]) if len(arguments) > 1 else None
+            NumericBackend.configure(arguments[0], precision)
+    except ValueError as error:
+        print(f"Error: {error}")
+        return
+    print(f"Numeric backend: {NumericBackend.current()} (Decimal precision {getcontext().prec})")
+
+def print_pool_stats(_words):
+    """
+    Handles the `pool_stats` REPL command.
+    """
+    stats = WorkerPool.stats()
+    print(f"Workers: {stats['workers']} ({'running' if stats['running'] else 'idle'}), "
+          f"tasks: {stats['tasks']}")
+    print(f"Queueing latency: mean {stats['queueing_mean'] * 1000:.3f}ms, "
+          f"max {stats['queueing_max'] * 1000:.3f}ms")
+    print(f"Execution latency: mean {stats['execution_mean'] * 1000:.3f}ms, "
+          f"max {stats['execution_max'] * 1000:.3f}ms")
+
+def print_cache_stats(_words):
+    """
+    Handles the `cache_stats` REPL command.
+    """
+    stats = ResultCache.stats()
+    print(f"Cache size: {stats['size']}/{stats['max_size']}, hits: {stats['hits']}, "
+          f"misses: {stats['misses']}, hit rate: {stats['hit_rate']:.1%}, "
+          f"evictions: {stats['evictions']}")
+
+def set_tracing(words):
+    """
+    Handles the `trace on|off` REPL command.
+    """
+    if words[1:] not in (['on'], ['off']):
+        run_calculation_line(None, words)
+        return
+    Expressions.enable_tracing(words[1] == 'on')
+    print(f"Expression tracing {'on' if Expressions.is_tracing() else 'off'}.")
+
+def print_menu(commands):
+    """
+    Handles the `menu` REPL command.
+    """
+    print("Available Commands:")
+    for cmd in commands:
+        print(f"- {cmd}")
+
+def print_history(_words):
+    """
+    Handles the `history` REPL command.
+    """
+    history = Calculations.get_all_calculations()
+    if history.empty:
+        print("No calculations recorded.")
+    else:
+        print(history)
+
+def clear_history(_words):
+    """
+    Handles the `clear_history` REPL command.
+    """
+    Calculations.clear_history()
+    print("Calculation history cleared.")
+
+def save_history(words):
+    """
+    Handles the `save_history <file>` REPL command.
+    """
+    if len(words) < 2:
+        print("Usage: save_history <file>")
+        return
+    filename = " ".join(words[1:])
+    Calculations.save_history(filename)
+    print(f"History saved to {filename}")
+
+def load_history(words):
+    """
+    Handles the `load_history <file>` REPL command.
+    """
+    if len(words) < 2:
+        print("Usage: load_history <file>")
+        return
+    filename = " ".join(words[1:])
+    if os.path.exists(filename):
+        Calculations.load_history(filename, progress=print_load_progress)
+        print(f"\nHistory loaded from {filename}")
+    else:
+        print(f"File '{filename}' not found.")
+
+def print_latest(_words):
+    """
+    Handles the `latest` REPL command.
+    """
+    latest = Calculations.get_latest()
+    print(f"Latest calculation: {latest}" if latest else "No history available.")
+
+def delete_history(words):
+    """
+    Handles the `delete_history <index>` REPL command.
+    """
+    try:
+        _, index = words
+        Calculations.delete_history(int(index))
+    except (ValueError, IndexError):
+        print("Usage: delete_history <index>")
+
+def filter_history(words):
+    """
+    Handles the `filter_with_operation <operation>` REPL command.
+    """
+    if len(words) < 2:
+        print("Usage: filter_with_operation <operation>")
+        return
+    operation = " ".join(words[1:])
+    filtered = Calculations.filter_by_operation(operation)
+    if filtered.empty:
+        print(f"No records found for operation '{operation}'.")
+    else:
+        print(filtered)
+
+def run_query(words):
+    """
+    Handles the `query <query>` and `explain <query>` REPL commands.
+    """
+    text = " ".join(words[1:])
+    try:
+        if words[0] == 'explain':
+            print(Calculations.explain(text[len('query'):] if words[1:2] == ['query'] else text))
+            return
+        result = Calculations.query(text)
+    except QueryError as error:
+        print(f"Error: {error}")
+        print("Usage: query [<column> <op> <value> [and ...]] [order by <column> [asc|desc]] [limit N]")
+        return
+    except ArithmeticError as error:
+        logging.error(f"Query '{text}' failed: {error!r}")
+        print("Error: The query could not be evaluated over the stored values.")
+        return
+    print(result if not result.empty else "No records match the query.")
+
+def run_calculation_line(commands, words):
+    """
+    Handles a calculation line, `<command> <num1> <num2> [decimal|float|fraction] [mp]`,
+    or an N-ary statistic line, and prints the usage for anything else.
+
+    Args:
+        commands (dict): Registered command objects, or None when the line is not a calculation.
+        words (list): The split input line.
+    """
+    arguments = words[1:]
+    if (commands is not None and words and getattr(commands.get(words[0]), 'nary', False)
+            and (arguments[:1] == ['--file'] or len(arguments) == 1
+                 or (len(arguments) > 2 and parse_calculation_options(arguments[2:]) is None))):
+        run_statistic(commands[words[0]], arguments)
+        return
+
+    options = parse_calculation_options(words[3:]) if len(words) >= 3 else None
+    if commands is None or options is None:
+        print("Usage: <command> <num1> <num2> [decimal|float|fraction] [mp]")
+        return
+
+    cmd_name, num1, num2 = words[:3]
+    multiprocessing_flag, backend = options
+
+    if cmd_name not in commands:
+        print(f"Unknown command '{cmd_name}'. Type 'menu' to list commands.")
+        return
+
+    process_calculation_and_output(num1, num2, cmd_name, commands, multiprocessing_flag, backend)
+
+def repl_command_table(commands):
+    """
+    Builds the REPL's command table, mapping the first word of a line to its handler.
+
+    Every handler takes the split line. Lines whose first word is not in the table are
+    calculations, handled by run_calculation_line.
+
+    Args:
+        commands (dict): Registered command objects.
+    """
+    usage = functools.partial(run_calculation_line, None)
+    return {
+        'pool_stats': print_pool_stats,
+        'cache_stats': print_cache_stats,
+        'stats': lambda words: print_stats(words[1:]),
+        'dag': lambda words: run_workload(words[1:], commands) if len(words) in (2, 3) else usage(words),
+        'map': lambda words: run_map(words[1:], commands) if len(words) > 1 else usage(words),
+        'eval': lambda words: run_expression(words[1:], commands),
+        'trace': set_tracing,
+        'backend': lambda words: set_backend(words[1:]),
+        'menu': lambda words: print_menu(commands) if len(words) == 1 else usage(words),
+        'history': print_history,
+        'clear_history': clear_history,
+        'save_history': save_history,
+        'load_history': load_history,
+        'latest': print_latest,
+        'delete_history': delete_history,
+        'filter_with_operation': filter_history,
+        'query': run_query,
+        'explain': run_query,
+    }
+
 @execution_logger
 def start_repl(commands):
     """
@@ -123,86 +601,59 @@ def start_repl(commands):
     """
     print("Calculator REPL started. Type 'exit' to quit.")
     print("Append 'mp' at the end of a command to use multiprocessing.")
+    print("Append 'decimal', 'float' or 'fraction' (before 'mp') to pick the numeric backend.")
 
+    table = repl_command_table(commands)
     while True:
         user_input = input(">> ").strip()
 
         if user_input.lower() == 'exit':
+            WorkerPool.shutdown()
             print("Exiting REPL mode.")
             break
 
-        if user_input == 'menu':
-            print("Available Commands:")
-            for cmd in commands:
-                print(f"- {cmd}")
-            continue
-
-        if user_input == 'history':
-            history = Calculations.get_all_calculations()
-            if history.empty:
-                print("No calculations recorded.")
-            else:
-                print(history)
-            continue
-
-        if user_input == 'clear_history':
-            Calculations.clear_history()
-            print("Calculation history cleared.")
-            continue
-
-        if user_input.startswith('save_history'):
-            _, filename = user_input.split(maxsplit=1)
-            Calculations.save_history(filename)
-            print(f"History saved to {filename}")
-            continue
-
-        if user_input.startswith('load_history'):
-            _, filename = user_input.split(maxsplit=1)
-            if os.path.exists(filename):
-                Calculations.load_history(filename)
-                print(f"History loaded from {filename}")
-            else:
-                print(f"File '{filename}' not found.")
-            continue
-
-        if user_input == 'latest':
-            latest = Calculations.get_latest()
-            print(f"Latest calculation: {latest}" if latest else "No history available.")
-            continue
-
-        if user_input.startswith('delete_history'):
-            try:
-                _, index = user_input.split(maxsplit=1)
-                Calculations.delete_history(int(index))
-            except (ValueError, IndexError):
-                print("Usage: delete_history <index>")
-            continue
-
-        if user_input.startswith('filter_with_operation'):
-            try:
-                _, operation = user_input.split(maxsplit=1)
-                filtered = Calculations.filter_with_operation(operation)
-                if filtered.empty:
-                    print(f"No records found for operation '{operation}'.")
-                else:
-                    print(filtered)
-            except ValueError:
-                print("Usage: filter_with_operation <operation>")
-            continue
-
-        parts = user_input.split()
-        if len(parts) not in [3, 4]:
-            print("Usage: <command> <num1> <num2> [mp]")
-            continue
-
-        cmd_name, num1, num2 = parts[:3]
-        multiprocessing_flag = len(parts) == 4 and parts[3].lower() == 'mp'
-
-        if cmd_name not in commands:
-            print(f"Unknown command '{cmd_name}'. Type 'menu' to list commands.")
-            continue
-
-        process_calculation_and_output(num1, num2, cmd_name, commands, multiprocessing_flag)
+        words = user_input.split()
+        handler = table.get(words[0]) if words else None
+        if handler is not None:
+            handler(words)
+        else:
+            run_calculation_line(commands, words)
+
+@execution_logger
+def run_pipe_mode(commands, arguments):
+    """
+    Runs REPL commands from standard input without prompts, then reports the throughput.
+
+    Args:
+        commands (dict): Registered command objects.
+        arguments (list): Optional `--flush N` (input lines between output flushes, 0 for
+            once per input block) and `--block-size BYTES`.
+    """
+    options = {'--flush': DEFAULT_FLUSH_LINES, '--block-size': DEFAULT_BLOCK_SIZE}
+    try:
+        for option, value in zip(arguments[::2], arguments[1::2]):
+            if option not in options or int(value) < 0:
+                raise ValueError(option)
+            options[option] = int(value)
+        if len(arguments) % 2 or options['--block-size'] == 0:
+            raise ValueError(arguments)
+    except ValueError:
+        print("Usage: python main.py pipe [--flush N] [--block-size BYTES]")
+        return
+
+    # Pin the settings that otherwise fall back to an environment lookup on every line.
+    NumericBackend.configure(NumericBackend.current())
+    ResultCache.configure(ResultCache.max_size())
+
+    output = BufferedOutput(sys.stdout)
+    fallback = functools.partial(run_calculation_line, commands)
+    table = {name: calculation_handler(commands, name, output.write, fallback) for name in commands}
+    table.update(repl_command_table(commands))
+    table['exit'] = lambda words: True
+    summary = run_pipe(table, fallback, output=output, block_size=options['--block-size'],
+                       flush_lines=options['--flush'])
+    print(f"Processed {summary['lines']} lines in {summary['seconds']:.3f}s "
+          f"({summary['lines_per_sec']:.0f} lines/sec)", file=sys.stderr)
 
 @execution_logger
 def main():
@@ -215,20 +666,62 @@ def main():
         start_repl(commands)
         return
 
+    if len(sys.argv) >= 2 and sys.argv[1] == 'pipe':
+        run_pipe_mode(commands, sys.argv[2:])
+        return
+
+    if len(sys.argv) in (3, 4) and sys.argv[1] == 'dag':
+        run_workload(sys.argv[2:], commands)
+        return
+
+    if len(sys.argv) in (5, 6) and sys.argv[1] == 'map':
+        run_map(sys.argv[2:], commands)
+        return
+
+    if len(sys.argv) >= 3 and sys.argv[1] == 'eval':
+        run_expression(sys.argv[2:], commands)
+        return
+
+    if len(sys.argv) >= 3 and getattr(commands.get(sys.argv[1]), 'nary', False):
+        run_statistic(commands[sys.argv[1]], sys.argv[2:])
+        return
+
+    if len(sys.argv) in (2, 4) and sys.argv[1].lower() == 'serve':
+        option, value = sys.argv[2:4] if len(sys.argv) == 4 else ("--port", str(server.DEFAULT_PORT))
+        if option == '--unix':
+            server.run_server(commands, path=value)
+            return
+        if option == '--port' and value.isdigit():
+            server.run_server(commands, host=os.getenv("SERVER_HOST", server.DEFAULT_HOST), port=int(value))
+            return
+
+    if len(sys.argv) in (4, 5, 6) and sys.argv[1].lower() == 'batch':
+        run_batch_job(sys.argv[2:], commands)
+        return
+
     if len(sys.argv) == 4:
         _, num1, num2, operation_type = sys.argv
         process_calculation_and_output(num1, num2, operation_type, commands)
         return
 
-    if len(sys.argv) == 5:
-        _, num1, num2, operation_type, flag = sys.argv
-        use_parallel = flag.lower() == "mp"
-        process_calculation_and_output(num1, num2, operation_type, commands, use_parallel)
+    options = parse_calculation_options(sys.argv[4:]) if len(sys.argv) in (5, 6) else None
+    if options is not None:
+        _, num1, num2, operation_type = sys.argv[:4]
+        use_parallel, backend = options
+        process_calculation_and_output(num1, num2, operation_type, commands, use_parallel, backend)
         return
 
     print("Usage:")
     print("  python main.py repl")
-    print("  python main.py <number1> <number2> <operation> [mp]")
+    print("  python main.py pipe [--flush N] [--block-size BYTES] < commands.txt")
+    print("  python main.py <number1> <number2> <operation> [decimal|float|fraction] [mp]")
+    print("  python main.py batch <input.csv|.jsonl> <output.csv|.jsonl> [decimal|float [mp]]")
+    print("  python main.py serve [--port N | --unix PATH]")
+    print("  python main.py <mean|variance|standard_deviation|min|max> <numbers... | --file PATH | ->")
+    print('  python main.py eval "<expression>" [name=v1,v2,... | --file bindings.csv]')
+    print("  python main.py dag <workload.txt> [--serial]")
+    print("  python main.py map <operation> <a1,a2,...> <b1,b2,...> [decimal|float|fraction]")
+    print("  python main.py map <operation> --file pairs.csv [decimal|float|fraction]")
 
 if __name__ == '__main__':
     # Setup environment variables and logging configuration
@@ -239,4 +732,33 @@ if __name__ == '__main__':
     logging.info(f"Environment mode: {env_settings.get('ENVIRONMENT', 'Unknown')}")
     logging.info("Calculator Application Launched.")
 
-    main()
\ No newline at end of file
+    precision = env_settings.get("DECIMAL_PRECISION")
+    NumericBackend.configure(env_settings.get("NUMERIC_BACKEND"), int(precision) if precision else None)
+
+    max_rows, max_bytes = env_settings.get("HISTORY_MAX_ROWS"), env_settings.get("HISTORY_MAX_BYTES")
+    if max_rows or max_bytes:
+        Calculations.configure_retention(int(max_rows) if max_rows else None,
+                                         int(max_bytes) if max_bytes else None,
+                                         env_settings.get("HISTORY_SPILL_DIR"))
+
+    journal_path = env_settings.get("HISTORY_JOURNAL")
+    if journal_path:
+        Calculations.enable_journal(
+            journal_path,
+            commit_interval=float(env_settings.get("HISTORY_JOURNAL_INTERVAL", "1.0")),
+            commit_size=int(env_settings.get("HISTORY_JOURNAL_BATCH", "256"))
+        )
+
+    metrics_file = env_settings.get("METRICS_FILE")
+    if metrics_file or env_settings.get("METRICS", "").lower() in ("1", "true", "yes"):
+        Metrics.enable()
+    if metrics_file:
+        Metrics.start_exporter(metrics_file, float(env_settings.get("METRICS_INTERVAL",
+                                                                    str(DEFAULT_EXPORT_INTERVAL))))
+
+    try:
+        main()
+    finally:
+        WorkerPool.shutdown()
+        Calculations.disable_journal()
+        Metrics.stop_exporter()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import csv
+import json
+import pytest
+from app.batch import process_chunk, run_batch
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.plugins.multiply_command import MultiplyCommand
+from main import parse_batch_options, run_batch_job
+
+@pytest.fixture
+def commands():
+    return {"add": AddCommand(), "divide": DivideCommand(), "multiply": MultiplyCommand()}
+
+def test_process_chunk_preserves_input_order(commands):
+    rows = [
+        {"operand1": "1", "operand2": "2", "operation": "add"},
+        {"operand1": "6", "operand2": "3", "operation": "divide"},
+        {"operand1": "4", "operand2": "5", "operation": "add"},
+        {"operand1": "2", "operand2": "7", "operation": "multiply"},
+    ]
+    results = process_chunk(rows, commands)
+    assert [row["result"] for row in results] == ["3", "2", "9", "14"]
+    assert all(row["error"] == "" for row in results)
+
+def test_process_chunk_reports_row_errors(commands):
+    rows = [
+        {"operand1": "6", "operand2": "0", "operation": "divide"},
+        {"operand1": "6", "operand2": "2", "operation": "divide"},
+        {"operand1": "x", "operand2": "2", "operation": "add"},
+        {"operand1": "1", "operand2": "2", "operation": "power"},
+    ]
+    results = process_chunk(rows, commands)
+    assert results[0]["error"] == "Division by zero is not allowed."
+    assert results[1]["result"] == "3"
+    assert results[2]["error"] == "Invalid number"
+    assert results[3]["error"] == "Unknown operation 'power'"
+
+def test_run_batch_csv(commands, tmp_path):
+    source = tmp_path / "input.csv"
+    source.write_text("operand1,operand2,operation\n1,2,add\n5,0,divide\n3,3,multiply\n")
+    destination = tmp_path / "output.csv"
+
+    summary = run_batch(str(source), str(destination), commands, chunk_size=2)
+
+    with open(destination, newline="", encoding="utf-8") as stream:
+        rows = list(csv.DictReader(stream))
+    assert [row["result"] for row in rows] == ["3", "", "9"]
+    assert summary["rows"] == 3
+    assert summary["errors"] == 1
+    assert summary["rows_per_sec"] > 0
+
+def test_run_batch_jsonl(commands, tmp_path):
+    source = tmp_path / "input.jsonl"
+    source.write_text(
+        json.dumps({"operand1": "10", "operand2": "4", "operation": "divide"}) + "\n"
+        + json.dumps({"operand1": 2, "operand2": 3, "operation": "add"}) + "\n"
+    )
+    destination = tmp_path / "output.jsonl"
+
+    run_batch(str(source), str(destination), commands)
+
+    rows = [json.loads(line) for line in destination.read_text().splitlines()]
+    assert [row["result"] for row in rows] == ["2.5", "5"]
+
+def test_process_chunk_isolates_undefined_decimal_results(commands):
+    rows = [
+        {"operand1": "6", "operand2": "3", "operation": "divide"},
+        {"operand1": "Infinity", "operand2": "Infinity", "operation": "divide"},
+        {"operand1": "8", "operand2": "2", "operation": "divide"},
+        {"operand1": "2", "operand2": "7", "operation": "multiply"},
+        {"operand1": "1e999999", "operand2": "1e999999", "operation": "multiply"},
+        {"operand1": "3", "operand2": "3", "operation": "multiply"},
+    ]
+    results = process_chunk(rows, commands)
+    assert [row["result"] for row in results] == ["2", "", "4", "14", "", "9"]
+    assert results[1]["error"] == "InvalidOperation"
+    assert results[4]["error"] == "Overflow"
+    assert all(results[position]["error"] == "" for position in (0, 2, 3, 5))
+
+def test_parse_batch_options():
+    assert parse_batch_options([]) == ("decimal", False)
+    assert parse_batch_options(["FLOAT"]) == ("float", False)
+    assert parse_batch_options(["float", "mp"]) == ("float", True)
+    assert parse_batch_options(["fraction"]) is None
+    assert parse_batch_options(["decimal", "mp"]) is None
+    assert parse_batch_options(["mp"]) is None
+
+def test_run_batch_job_rejects_bad_options(commands, tmp_path, capsys):
+    destination = tmp_path / "output.csv"
+    run_batch_job([str(tmp_path / "input.csv"), str(destination), "fraction"], commands)
+    assert capsys.readouterr().out.startswith("Usage: batch")
+    assert not destination.exists()
+
+def test_run_batch_missing_input_creates_no_output(commands, tmp_path, capsys):
+    destination = tmp_path / "output.csv"
+    with pytest.raises(FileNotFoundError):
+        run_batch(str(tmp_path / "missing.csv"), str(destination), commands)
+    assert list(tmp_path.iterdir()) == []
+    run_batch_job([str(tmp_path / "missing.csv"), str(destination)], commands)
+    assert capsys.readouterr().out.startswith("Error: ")
+    assert not destination.exists()
+
+def test_run_batch_refuses_to_overwrite_its_input(commands, tmp_path, capsys):
+    source = tmp_path / "input.csv"
+    source.write_text("operand1,operand2,operation\n1,2,add\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        run_batch(str(source), str(source), commands)
+    run_batch_job([str(source), str(source)], commands)
+    assert capsys.readouterr().out.startswith("Error: ")
+    assert source.read_text(encoding="utf-8") == "operand1,operand2,operation\n1,2,add\n"
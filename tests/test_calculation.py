@@ -70,4 +70,9 @@ def test_divide_operation(divide_calculation):
 
 def test_divide_by_zero_operation(divide_by_zero_calculation):
     with pytest.raises(ValueError, match="Cannot divide by zero"):
-        divide_by_zero_calculation.operate()
\ No newline at end of file
+        divide_by_zero_calculation.operate()
+
+def test_calculation_has_no_instance_dict(add_calculation):
+    assert not hasattr(add_calculation, "__dict__")
+    with pytest.raises(AttributeError):
+        add_calculation.note = "extra"
@@ -87,3 +87,79 @@ def test_delete_invalid_index(reset_calculations, capsys):
 def test_empty_history_on_start(reset_calculations):
     history = Calculations.get_all_calculations()
     assert history.empty
+
+def add_numbers(num1, num2):
+    calc = Calculation(Decimal(num1), Decimal(num2), AddCommand())
+    calc.operate()
+    Calculations.add_calculation(calc)
+
+def read_results(path):
+    return [line.split(",")[3] for line in path.read_text().splitlines()[1:]]
+
+def test_save_history_appends_only_new_rows(reset_calculations, tmp_path, monkeypatch):
+    save_file = tmp_path / "history.csv"
+    add_numbers(1, 2)
+    Calculations.save_history(str(save_file))
+    add_numbers(3, 4)
+
+    full_writes = []
+    monkeypatch.setattr(Calculations._history_facade, "save_to_file", full_writes.append)
+    Calculations.save_history(str(save_file))
+
+    assert full_writes == []
+    assert read_results(save_file) == ["3", "7"]
+
+def test_save_history_rewrites_legacy_csv(reset_calculations, tmp_path):
+    save_file = tmp_path / "history.csv"
+    save_file.write_text("operation,operand1,operand2,result\nadd,1,2,3\n", encoding="utf-8")
+    Calculations.load_history(str(save_file))
+    add_numbers(3, 4)
+    Calculations.save_history(str(save_file))
+
+    lines = save_file.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "operation,operand1,operand2,result,backend"
+    assert read_results(save_file) == ["3", "7"]
+    Calculations.load_history(str(save_file))
+    assert len(Calculations.get_all_calculations()) == 2
+
+def test_save_history_rewrites_after_earlier_delete(reset_calculations, tmp_path):
+    save_file = tmp_path / "history.csv"
+    add_numbers(1, 2)
+    add_numbers(3, 4)
+    Calculations.save_history(str(save_file))
+    Calculations.delete_history(0)
+    add_numbers(5, 6)
+    Calculations.save_history(str(save_file))
+
+    assert read_results(save_file) == ["7", "11"]
+
+def test_save_history_appends_after_delete_of_unsaved_row(reset_calculations, tmp_path):
+    save_file = tmp_path / "history.csv"
+    add_numbers(1, 2)
+    Calculations.save_history(str(save_file))
+    add_numbers(3, 4)
+    add_numbers(5, 6)
+    Calculations.delete_history(1)
+    Calculations.save_history(str(save_file))
+
+    assert read_results(save_file) == ["3", "11"]
+
+def test_save_history_rewrites_externally_changed_file(reset_calculations, tmp_path):
+    save_file = tmp_path / "history.csv"
+    add_numbers(1, 2)
+    Calculations.save_history(str(save_file))
+    save_file.write_text("operation,operand1,operand2,result\n")
+    add_numbers(3, 4)
+    Calculations.save_history(str(save_file))
+
+    assert read_results(save_file) == ["3", "7"]
+
+def test_save_history_rewrites_after_clear(reset_calculations, tmp_path):
+    save_file = tmp_path / "history.csv"
+    add_numbers(1, 2)
+    Calculations.save_history(str(save_file))
+    Calculations.clear_history()
+    add_numbers(3, 4)
+    Calculations.save_history(str(save_file))
+
+    assert read_results(save_file) == ["7"]
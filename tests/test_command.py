@@ -1,7 +1,7 @@
 # tests/test_command.py
 import pytest
 from decimal import Decimal
-from app.command import Command
+from app.command import Command, as_batch_arrays
 from multiprocessing import Queue
 
 class MockCommand(Command):
@@ -37,4 +37,28 @@ def test_mock_command_execute_multiprocessing():
     # Perform an execution using multiprocessing and check the result
     mock_command.execute_multiprocessing(Decimal(2), Decimal(3), result_queue)
     result = result_queue.get()  # Get the result from the queue
-    assert result == Decimal(5)
\ No newline at end of file
+    assert result == Decimal(5)
+
+def test_default_execute_batch_loops_over_execute():
+    results = MockCommand().execute_batch([Decimal(1), Decimal(2)], [Decimal(3), Decimal(4)])
+    assert results.tolist() == [Decimal(4), Decimal(6)]
+    assert not results.mask.any()
+
+def test_default_execute_batch_masks_arithmetic_errors():
+    class FailingCommand(MockCommand):
+        def execute(self, num1, num2):
+            if num2 == 0:
+                raise ArithmeticError("bad operand")
+            return num1 + num2
+
+    results = FailingCommand().execute_batch(["1", "2"], ["0", "5"], backend="float")
+    assert results.mask.tolist() == [True, False]
+    assert results[1] == 7.0
+
+def test_execute_batch_rejects_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown batch backend"):
+        MockCommand().execute_batch([1], [2], backend="quad")
+
+def test_as_batch_arrays_requires_equal_lengths():
+    with pytest.raises(ValueError):
+        as_batch_arrays([1, 2], [3])
@@ -0,0 +1,71 @@
+import pytest
+from decimal import Decimal
+from app.dag_scheduler import DagScheduler, parse_workload
+from app.expression import ExpressionError
+from app.worker_pool import WorkerPool
+from main import discover_plugins
+
+WORKLOAD = """
+# totals
+total = subtotal + tax
+subtotal = add(120.50, 79.50)
+tax = subtotal * 0.2
+again = 120.50 + 79.50
+average = mean(subtotal, total, 1)
+"""
+
+@pytest.fixture
+def commands():
+    return discover_plugins()
+
+@pytest.fixture
+def pool():
+    WorkerPool.configure(max_workers=2)
+    yield WorkerPool
+    WorkerPool.configure()
+
+def test_parse_workload_rejects_bad_lines():
+    with pytest.raises(ExpressionError):
+        parse_workload(["a = 1", "a = 2"])
+    with pytest.raises(ExpressionError):
+        parse_workload(["not a definition"])
+
+def test_builds_deduplicated_waves(commands):
+    scheduler = DagScheduler(parse_workload(WORKLOAD.splitlines()), commands, "decimal")
+    assert scheduler.calls == 5
+    assert scheduler.task_count == 4
+    assert [len(wave) for wave in scheduler.waves] == [1, 1, 1, 1]
+
+def test_serial_run_reports_results_and_critical_path(commands):
+    report = DagScheduler(parse_workload(WORKLOAD.splitlines()), commands, "decimal").run(parallel=False)
+    assert report["results"]["total"] == Decimal("240.000")
+    assert report["results"]["again"] == Decimal("200.00")
+    assert report["results"]["average"] == Decimal("147")
+    assert report["critical_path_tasks"] == 4
+    assert 0 < report["critical_path_seconds"] <= report["work_seconds"]
+
+def test_parallel_run_matches_serial(commands, pool):
+    lines = [f"x{i} = {i} * 3" for i in range(20)] + ["y = mean(" + ", ".join(f"x{i}" for i in range(20)) + ")"]
+    serial = DagScheduler(parse_workload(lines), commands, "decimal").run(parallel=False)
+    parallel = DagScheduler(parse_workload(lines), commands, "decimal").run(parallel=True)
+    assert parallel["results"] == serial["results"]
+    assert parallel["waves"] == 2
+
+def test_errors_propagate_to_dependents(commands):
+    report = DagScheduler(parse_workload(["a = 1 / 0", "b = a + 1", "c = 2 + 2"]), commands).run(parallel=False)
+    assert report["results"]["b"].startswith("Error:")
+    assert report["results"]["c"] == Decimal(4)
+
+@pytest.mark.parametrize("lines", [["a = b + 1", "b = a + 1"], ["a = missing + 1"], ["a = nothing(1, 2)"]])
+def test_invalid_graphs_are_rejected(commands, lines):
+    with pytest.raises(ExpressionError):
+        DagScheduler(parse_workload(lines), commands)
+
+def test_long_chain_in_reverse_order(commands):
+    steps = 3000
+    lines = [f"x{step} = x{step - 1} + 1" for step in range(steps, 0, -1)] + ["x0 = 0"]
+    scheduler = DagScheduler(parse_workload(lines), commands)
+    assert len(scheduler.waves) == steps
+    assert scheduler.run(parallel=False)["results"][f"x{steps}"] == Decimal(steps)
+    with pytest.raises(ExpressionError):
+        DagScheduler(parse_workload(lines[:-1] + [f"x0 = x{steps} + 1"]), commands)
@@ -0,0 +1,87 @@
+import pytest
+from decimal import Decimal
+from fractions import Fraction
+from app.calculations import Calculations
+from app.expression import Call, ExpressionError, Expressions, Negate, Number, Variable, parse
+from main import discover_plugins, run_expression
+
+@pytest.fixture
+def commands():
+    Calculations.clear_history()
+    Expressions.configure()
+    yield discover_plugins()
+    Expressions.enable_tracing(False)
+    Calculations.clear_history()
+
+def numbers(**values):
+    return {name: Decimal(value) for name, value in values.items()}
+
+def test_parse_follows_precedence():
+    assert parse("a + b * -2") == Call("add", (Variable("a"), Call("multiply", (Variable("b"), Negate(Number("2"))))))
+    assert parse("mean(1, (2))") == Call("mean", (Number("1"), Number("2")))
+
+@pytest.mark.parametrize("source", ["", "1 +", "(1", "1 2", "1 $ 2", "foo(1, 2)", "add(1)", "lambda * 2"])
+def test_invalid_expressions_are_rejected(commands, source):
+    with pytest.raises(ExpressionError):
+        Expressions.compile(source, commands)
+
+def test_evaluates_plugins_and_nary_calls(commands):
+    expression = Expressions.compile("(a + b) * mean(c, d) / 3", commands)
+    assert expression.variables == ["a", "b", "c", "d"]
+    assert expression.evaluate(numbers(a=1, b=2, c=3, d=4)) == Decimal("3.5")
+    assert Expressions.compile("max(1, 5, 3) - -mean(2, 4, 6)", commands).evaluate() == Decimal(9)
+
+def test_compiled_expressions_are_cached_by_source(commands):
+    first = Expressions.compile("a  +  1", commands)
+    assert Expressions.compile("a + 1", commands) is first
+    assert Expressions.compile("a + 1", commands, "fraction") is not first
+    assert Expressions.stats() == {"size": 2, "hits": 1, "misses": 2}
+
+def test_backend_applies_to_literals(commands):
+    assert Expressions.compile("1 / 3", commands, "fraction").evaluate() == Fraction(1, 3)
+    assert Expressions.compile("1 / 4", commands, "float").evaluate() == 0.25
+
+def test_evaluate_many_over_bindings(commands):
+    expression = Expressions.compile("a * b + 1", commands)
+    results = expression.evaluate_many({"a": [Decimal(1), Decimal(2)], "b": [Decimal(3), Decimal(4)]})
+    assert results == [Decimal(4), Decimal(9)]
+    with pytest.raises(ExpressionError):
+        expression.evaluate_many({"a": [Decimal(1)]})
+
+def test_only_top_level_result_is_recorded(commands):
+    Expressions.compile("(a + b) * 2", commands).evaluate(numbers(a=1, b=2), record=True)
+    history = Calculations.get_all_calculations()
+    assert history["operation"].tolist() == ["multiply"]
+    assert history["operand1"].tolist() == [Decimal(3)]
+    assert history["result"].tolist() == [Decimal(6)]
+
+def test_tracing_records_every_call(commands):
+    Expressions.enable_tracing()
+    Expressions.compile("(a + b) * 2", commands).evaluate(numbers(a=1, b=2), record=True)
+    assert Calculations.get_all_calculations()["operation"].tolist() == ["add", "multiply"]
+
+@pytest.mark.parametrize("source", ["(" * 5000 + "1" + ")" * 5000, "-" * 5000 + "1",
+                                    "add(1, " * 300 + "1" + ")" * 300])
+def test_deep_nesting_is_an_expression_error(commands, source):
+    with pytest.raises(ExpressionError):
+        Expressions.compile(source, commands)
+
+@pytest.mark.parametrize("tracing", [False, True])
+def test_failed_binding_records_nothing(commands, tracing):
+    Expressions.enable_tracing(tracing)
+    expression = Expressions.compile("(a + 1) / b", commands)
+    with pytest.raises(ArithmeticError):
+        expression.evaluate_many({"a": [Decimal(1), Decimal(2)], "b": [Decimal(2), Decimal(0)]}, record=True)
+    assert len(Calculations.get_all_calculations()) == 0
+    assert expression.evaluate_many({"a": [Decimal(1)] * 2, "b": [Decimal(2)] * 2}, record=True) == [1, 1]
+    assert len(Calculations.get_all_calculations()) == (4 if tracing else 2)
+
+def test_eval_command_with_bindings(commands, capsys, tmp_path):
+    run_expression(["a", "/", "b", "a=1,3", "b=4,4"], commands)
+    assert capsys.readouterr().out.splitlines()[:2] == ["0.25", "0.75"]
+    path = tmp_path / "bindings.csv"
+    path.write_text("a,b\n1,2\n")
+    run_expression(["a", "-", "b", "--file", str(path)], commands)
+    assert capsys.readouterr().out == "a - b = -1\n"
+    run_expression(["1", "/", "0"], commands)
+    assert capsys.readouterr().out.startswith("Error:")
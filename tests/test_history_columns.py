@@ -0,0 +1,90 @@
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from app.history_columns import HistoryColumns, decode_fixed, encode_fixed
+from app.history_format import HistorySegment, write_history
+
+@pytest.mark.parametrize("text", ["0", "10", "-3.25", "0.000001", "123456789012.5", "999999999999.999999"])
+def test_fixed_point_round_trip_keeps_text(text):
+    scaled = encode_fixed(Decimal(text))
+    assert scaled is not None
+    assert str(decode_fixed(scaled)) == text
+
+@pytest.mark.parametrize("value", [Decimal("2.50"), Decimal("1E+1"), Decimal("1E-7"), Decimal("-0"),
+                                   Decimal("NaN"), Decimal("1000000000000"), Decimal(1) / Decimal(3),
+                                   2.5, Fraction(1, 3)])
+def test_values_outside_fixed_point_overflow(value):
+    assert encode_fixed(value) is None
+
+def mixed_store():
+    store = HistoryColumns()
+    store.append("add", Decimal("1.5"), 2.0, Fraction(1, 3), "float")
+    store.append("divide", Decimal(1), Decimal(3), Decimal(1) / Decimal(3))
+    store.append("add", Decimal("2.50"), Decimal(2), Decimal("4.50"))
+    return store
+
+def test_store_returns_exact_values_and_types():
+    columns = mixed_store().to_columns()
+    assert columns["operation"] == ["add", "divide", "add"]
+    assert columns["backend"] == ["float", "decimal", "decimal"]
+    assert columns["operand2"] == [2.0, Decimal(3), Decimal(2)]
+    assert type(columns["operand2"][0]) is float
+    assert columns["result"] == [Fraction(1, 3), Decimal(1) / Decimal(3), Decimal("4.50")]
+    assert [str(value) for value in columns["operand1"]] == ["1.5", "1", "2.50"]
+
+def test_take_and_operation_rows():
+    store = mixed_store()
+    assert store.operation_rows() == {"add": [0, 2], "divide": [1]}
+    assert store.take([2, 0])["result"] == [Decimal("4.50"), Fraction(1, 3)]
+
+def test_delete_renumbers_overflow_rows():
+    store = mixed_store()
+    store.delete(0)
+    assert store.to_columns()["result"] == [Decimal(1) / Decimal(3), Decimal("4.50")]
+    store.delete_prefix(1)
+    assert len(store) == 1
+    assert str(store.to_columns()["operand1"][0]) == "2.50"
+
+def test_extend_matches_append():
+    columns = mixed_store().to_columns()
+    assert HistoryColumns(columns).to_columns() == columns
+
+def test_fixed_point_rows_are_compact():
+    store = HistoryColumns()
+    for value in range(1000):
+        store.append("add", Decimal(value), Decimal("0.5"), Decimal(value) + Decimal("0.5"))
+    assert store.nbytes() < 30 * 1000
+
+def test_extend_segment_copies_fixed_point_blocks(tmp_path):
+    path = str(tmp_path / "history.calchist")
+    columns = mixed_store().to_columns()
+    write_history(path, columns)
+    store = HistoryColumns()
+    store.append("subtract", Decimal(5), Decimal(3), Decimal(2))
+    store.extend_segment(HistorySegment(path))
+    decoded = store.to_columns()
+    assert decoded["operation"] == ["subtract", "add", "divide", "add"]
+    assert decoded["operand2"] == [Decimal(3), 2.0, Decimal(3), Decimal(2)]
+    assert type(decoded["operand2"][1]) is float
+    # Rows of the float backend come back as floats, as from any binary history.
+    assert decoded["result"][1:3] == [1 / 3, Decimal(1) / Decimal(3)]
+    assert decoded["result"][3] == Decimal("4.5")
+
+def test_write_matches_write_history(tmp_path):
+    store = mixed_store()
+    store.append("multiply", Decimal("1E+30"), Decimal("-0"), Decimal("-0"))
+    store.write(str(tmp_path / "direct.calchist"))
+    write_history(str(tmp_path / "decoded.calchist"), store.to_columns())
+    direct = HistorySegment(str(tmp_path / "direct.calchist")).to_columns()
+    assert direct == HistorySegment(str(tmp_path / "decoded.calchist")).to_columns()
+    assert [str(value) for value in direct["operand1"]] == ["1.5", "1", "2.50", "1E+30"]
+    assert str(direct["result"][3]) == "-0"
+
+def test_write_range_renumbers_overflow_rows(tmp_path):
+    store = mixed_store()
+    path = str(tmp_path / "tail.calchist")
+    store.write(path, 1, 3)
+    decoded = HistorySegment(path).to_columns()
+    assert decoded["operation"] == ["divide", "add"]
+    assert decoded["result"] == [Decimal(1) / Decimal(3), Decimal("4.50")]
+    assert str(decoded["result"][1]) == "4.50"
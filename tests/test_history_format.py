@@ -0,0 +1,109 @@
+import pytest
+from decimal import Decimal, localcontext
+from app.history_format import HistorySegment, merge_history, write_history
+from app.pandas_facade import PandasFacade
+
+@pytest.fixture
+def columns():
+    return {
+        "operation": ["add", "divide", "add", "multiply"],
+        "operand1": [Decimal("1.5"), Decimal(1), Decimal("-20000000000000"), Decimal("0.0000001")],
+        "operand2": [Decimal(2), Decimal(3), Decimal("1E+30"), Decimal(3)],
+        "result": [Decimal("3.5"), Decimal(1) / Decimal(3), Decimal("1E+30"), Decimal("3E-7")],
+        "backend": ["decimal"] * 4,
+    }
+
+def test_round_trip_is_exact(tmp_path, columns):
+    path = str(tmp_path / "history.calchist")
+    write_history(path, columns)
+    segment = HistorySegment(path)
+    assert len(segment) == 4
+    assert segment.operations == ["add", "divide", "multiply"]
+    assert segment.to_columns() == columns
+
+def test_overflow_values_survive(tmp_path, columns):
+    path = str(tmp_path / "history.calchist")
+    write_history(path, columns, scale=2)
+    decoded = HistorySegment(path).to_columns()
+    assert decoded["result"][1] == Decimal(1) / Decimal(3)
+    assert decoded["operand1"][3] == Decimal("0.0000001")
+    assert str(decoded["result"][0]) == "3.5"
+
+def test_round_trip_ignores_session_precision(tmp_path):
+    columns = {
+        "operation": ["add", "add"],
+        "operand1": [Decimal("123.456789"), Decimal("12345678901234")],
+        "operand2": [Decimal("1.00000000000000000000000000000000000000000000000001"), Decimal(1)],
+        "result": [Decimal("98765.4321"), Decimal("12345678901235")],
+        "backend": ["decimal"] * 2,
+    }
+    path = str(tmp_path / "history.calchist")
+    with localcontext() as context:
+        context.prec = 3
+        write_history(path, columns)
+        decoded = HistorySegment(path).to_columns()
+    assert decoded == columns
+    assert [str(value) for value in decoded["operand1"]] == ["123.456789", "12345678901234"]
+
+def test_columns_decode_selected_rows(tmp_path, columns):
+    path = str(tmp_path / "history.calchist")
+    write_history(path, columns)
+    segment = HistorySegment(path)
+    rows = segment.operation_positions("add")
+    assert rows.tolist() == [0, 2]
+    assert segment.numeric_column("operand2", rows) == [Decimal(2), Decimal("1E+30")]
+    assert segment.operation_positions("power").tolist() == []
+
+def test_empty_history(tmp_path):
+    path = str(tmp_path / "empty.calchist")
+    write_history(path, {"operation": [], "operand1": [], "operand2": [], "result": []})
+    assert HistorySegment(path).to_columns() == {"operation": [], "operand1": [], "operand2": [],
+                                                 "result": [], "backend": []}
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "history.calchist"
+    path.write_text("operation,operand1\n")
+    with pytest.raises(ValueError):
+        HistorySegment(str(path))
+
+def test_facade_loads_binary_lazily(tmp_path, columns):
+    path = str(tmp_path / "history.calchist")
+    write_history(path, columns)
+    facade = PandasFacade()
+    facade.load_from_file(path)
+    facade.add_record({"operation": "add", "operand1": Decimal(1), "operand2": Decimal(1), "result": Decimal(2)})
+
+    assert len(facade) == 5
+    filtered = facade.filter_by_operation("add")
+    assert facade._segment is not None
+    assert filtered.index.tolist() == [0, 2, 4]
+    assert filtered["result"].tolist() == [Decimal("3.5"), Decimal("1E+30"), Decimal(2)]
+
+    assert facade.dataframe["operation"].tolist() == ["add", "divide", "add", "multiply", "add"]
+    assert facade._segment is None
+
+def test_facade_saves_binary(tmp_path, columns):
+    path = str(tmp_path / "history.calchist")
+    facade = PandasFacade()
+    facade.load_columns(columns)
+    facade.save_to_file(path)
+    facade.clear()
+    facade.load_from_file(path)
+    facade.delete_record(0)
+    assert facade.columns["operation"] == ["divide", "add", "multiply"]
+
+def test_merge_concatenates_segments(tmp_path, columns):
+    first, second, merged = (str(tmp_path / f"{name}.calchist") for name in ("first", "second", "merged"))
+    write_history(first, columns)
+    tail = {"operation": ["subtract", "add"], "operand1": [Decimal(5), Decimal("1E+40")],
+            "operand2": [Decimal(3), Decimal(1)], "result": [Decimal(2), Decimal("1E+40")],
+            "backend": ["decimal", "float"]}
+    write_history(second, tail)
+    merge_history(merged, [HistorySegment(first), HistorySegment(second)])
+    segment = HistorySegment(merged)
+    assert len(segment) == 6
+    assert segment.operations == ["add", "divide", "multiply", "subtract"]
+    expected = {name: columns[name] + tail[name] for name in columns}
+    expected["operand1"][5] = expected["result"][5] = 1e40
+    expected["operand2"][5] = 1.0
+    assert segment.to_columns() == expected
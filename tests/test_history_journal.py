@@ -0,0 +1,92 @@
+import pytest
+from decimal import Decimal
+from app.calculation import Calculation
+from app.calculations import Calculations
+from app.history_journal import HistoryJournal
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+def record(operation, operand1, operand2, result):
+    return {"operation": operation, "operand1": Decimal(operand1),
+            "operand2": Decimal(operand2), "result": Decimal(result)}
+
+@pytest.fixture
+def journal_path(tmp_path):
+    yield str(tmp_path / "history.journal")
+    Calculations.disable_journal()
+    Calculations.clear_history()
+
+def test_replay_applies_adds_deletes_and_clears(journal_path):
+    journal = HistoryJournal(journal_path)
+    journal.append_add(record("add", "1", "2", "3"))
+    journal.append_clear()
+    journal.append_add(record("add", "1.5", "2", "3.5"))
+    journal.append_add(record("divide", "1", "3", "0.3333333333333333333333333333"))
+    journal.append_add(record("add", "4", "4", "8"))
+    journal.append_delete(1)
+    journal.close()
+
+    columns = HistoryJournal.replay(journal_path)
+    assert columns["operation"] == ["add", "add"]
+    assert columns["operand1"] == [Decimal("1.5"), Decimal("4")]
+    assert str(columns["result"][0]) == "3.5"
+
+def test_replay_preserves_decimal_precision(journal_path):
+    journal = HistoryJournal(journal_path)
+    journal.append_add(record("divide", "1", "3", "0.3333333333333333333333333333"))
+    journal.close()
+    assert HistoryJournal.replay(journal_path)["result"] == [Decimal("0.3333333333333333333333333333")]
+
+def test_replay_ignores_torn_final_line(journal_path):
+    with open(journal_path, "w") as stream:
+        stream.write("A\tadd\t1\t2\t3\nA\tadd\t4\t")
+    assert HistoryJournal.replay(journal_path)["operation"] == ["add"]
+
+def test_replay_rejects_malformed_add(journal_path):
+    with open(journal_path, "w") as stream:
+        stream.write("A\tadd\t1\t2\nX\n")
+    with pytest.raises(ValueError):
+        HistoryJournal.replay(journal_path)
+
+def test_group_commit_by_size(journal_path):
+    journal = HistoryJournal(journal_path, commit_interval=60, commit_size=3)
+    journal.append_add(record("add", "1", "1", "2"))
+    journal.append_add(record("add", "1", "1", "2"))
+    assert journal._pending == 2
+    journal.append_add(record("add", "1", "1", "2"))
+    assert journal._pending == 0
+    assert len(HistoryJournal.replay(journal_path)["operation"]) == 3
+    journal.close()
+
+@pytest.mark.parametrize("settings", [{"commit_interval": 0}, {"commit_interval": -1},
+                                      {"commit_interval": float("nan")}, {"commit_size": 0}])
+def test_rejects_non_positive_commit_settings(journal_path, settings):
+    with pytest.raises(ValueError):
+        HistoryJournal(journal_path, **settings)
+
+def test_calculations_rebuild_history_from_journal(journal_path):
+    Calculations.clear_history()
+    Calculations.enable_journal(journal_path)
+    for num1, num2, command in [(1, 2, AddCommand()), (1, 4, DivideCommand()), (5, 5, AddCommand())]:
+        calc = Calculation(Decimal(num1), Decimal(num2), command)
+        calc.operate()
+        Calculations.add_calculation(calc)
+    Calculations.delete_history(0)
+    Calculations.delete_history(10)
+    Calculations.disable_journal()
+
+    Calculations._history_facade.clear()
+    Calculations.enable_journal(journal_path)
+    history = Calculations.get_all_calculations()
+    assert history["operation"].tolist() == ["divide", "add"]
+    assert history["result"].tolist() == [Decimal("0.25"), Decimal(10)]
+
+def test_load_history_checkpoints_journal(journal_path, tmp_path):
+    csv_path = tmp_path / "history.csv"
+    csv_path.write_text("operation,operand1,operand2,result\nadd,1,2,3\n")
+    Calculations.enable_journal(journal_path)
+    Calculations.add_calculation(Calculation(Decimal(9), Decimal(9), AddCommand()))
+    Calculations.load_history(str(csv_path))
+    Calculations.disable_journal()
+
+    assert HistoryJournal.replay(journal_path)["operation"] == ["add"]
@@ -0,0 +1,93 @@
+import pytest
+from decimal import Decimal
+from app.history_loader import load_csv
+from app.pandas_facade import PandasFacade
+from app.worker_pool import WorkerPool
+
+def write_history_csv(path, rows, trailing_newline=True):
+    lines = ["operation,operand1,operand2,result"]
+    lines += [",".join(row) for row in rows]
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""), encoding="utf-8")
+    return str(path)
+
+def make_rows(count):
+    return [("add", f"{i}.10", "0.000000000000000000001", f"{i}.100000000000000000001")
+            for i in range(count)]
+
+def test_load_keeps_exact_decimals(tmp_path):
+    path = write_history_csv(tmp_path / "history.csv", make_rows(3))
+    columns = load_csv(path)
+    assert columns["operation"] == ["add"] * 3
+    assert columns["result"][2] == Decimal("2.100000000000000000001")
+    assert str(columns["operand1"][1]) == "1.10"
+
+def test_serial_chunks_match_single_read(tmp_path):
+    path = write_history_csv(tmp_path / "history.csv", make_rows(500))
+    assert load_csv(path, chunk_bytes=64, parallel=False) == load_csv(path, parallel=False)
+
+def test_parallel_chunks_keep_file_order(tmp_path):
+    path = write_history_csv(tmp_path / "history.csv", make_rows(500))
+    WorkerPool.configure(2)
+    try:
+        columns = load_csv(path, chunk_bytes=1024, parallel=True)
+    finally:
+        WorkerPool.configure()
+    assert columns["operand1"] == [Decimal(f"{i}.10") for i in range(500)]
+
+def test_progress_reaches_file_size(tmp_path):
+    path = write_history_csv(tmp_path / "history.csv", make_rows(100))
+    reports = []
+    load_csv(path, chunk_bytes=256, parallel=False, progress=lambda done, total: reports.append((done, total)))
+    assert len(reports) > 1
+    assert reports[-1][0] == reports[-1][1]
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+
+def test_final_line_without_newline(tmp_path):
+    path = write_history_csv(tmp_path / "history.csv", make_rows(5), trailing_newline=False)
+    assert len(load_csv(path, chunk_bytes=32, parallel=False)["operation"]) == 5
+
+def test_missing_column_raises(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text("operation,operand1,result\nadd,1,2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="operand2"):
+        load_csv(str(path))
+
+def test_facade_loads_csv_through_streaming_loader(tmp_path):
+    path = write_history_csv(tmp_path / "history.csv", make_rows(2))
+    facade = PandasFacade()
+    facade.load_from_file(path)
+    assert len(facade) == 2
+    assert facade.columns["operand2"][0] == Decimal("0.000000000000000000001")
+
+def test_quoted_fields_are_parsed(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text('operation,operand1,operand2,result\n"add","1.5",2,3.5\n', encoding="utf-8")
+    columns = load_csv(str(path))
+    assert columns["operation"] == ["add"]
+    assert columns["result"] == [Decimal("3.5")]
+
+def test_ragged_row_raises(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text("operation,operand1,operand2,result\nadd,1,2\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_csv(str(path))
+
+def test_nan_round_trips_through_csv(tmp_path):
+    path = str(tmp_path / "history.csv")
+    facade = PandasFacade()
+    facade.add_record({"operation": "subtract", "operand1": Decimal("Infinity"),
+                       "operand2": Decimal("Infinity"), "result": Decimal("NaN")})
+    facade.add_record({"operation": "add", "operand1": Decimal(1), "operand2": Decimal(2),
+                       "result": Decimal(3)})
+    facade.save_to_file(path)
+    assert "NaN" in open(path, encoding="utf-8").read().splitlines()[1]
+    loaded = PandasFacade()
+    loaded.load_from_file(path)
+    assert loaded.columns["result"][0].is_nan()
+    assert loaded.columns["result"][1] == Decimal(3)
+
+def test_empty_numeric_field_loads_as_nan(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text('operation,operand1,operand2,result\nsubtract,Infinity,Infinity,""\n',
+                    encoding="utf-8")
+    assert load_csv(str(path))["result"][0].is_nan()
@@ -0,0 +1,103 @@
+from decimal import Decimal
+from fractions import Fraction
+import operator
+import pytest
+from app.history_format import write_history
+from app.history_query import QueryError, parse_query
+from app.pandas_facade import PandasFacade
+
+OPERATIONS = ["add", "divide", "multiply"]
+
+def value(number, backend):
+    return {"decimal": Decimal(number), "float": float(number), "fraction": Fraction(number)}[backend]
+
+def record(row):
+    backend = ["decimal", "decimal", "float", "fraction"][row % 4]
+    operation = OPERATIONS[row % 3]
+    operand1, operand2 = value(row % 17, backend), value(row % 5 + 1, backend)
+    result = {"add": operand1 + operand2, "divide": operand1 / operand2, "multiply": operand1 * operand2}[operation]
+    return {"operation": operation, "operand1": operand1, "operand2": operand2, "result": result, "backend": backend}
+
+@pytest.fixture
+def facade(tmp_path):
+    loaded = [record(row) for row in range(60)]
+    path = str(tmp_path / "loaded.calchist")
+    write_history(path, {name: [row[name] for row in loaded] for name in loaded[0]})
+    facade = PandasFacade()
+    facade.load_from_file(path)
+    facade.configure_retention(max_rows=25, spill_directory=str(tmp_path))
+    for row in range(60, 200):
+        facade.add_record(record(row))
+    assert facade.storage_stats()["spilled_segments"] > 0
+    return facade
+
+def expected_rows(facade, predicates, order_by=None, descending=False, limit=None):
+    columns = facade.columns
+    rows = [row for row in range(len(facade)) if all(test(columns, row) for test in predicates)]
+    if order_by is not None:
+        rows.sort(key=lambda row: columns[order_by][row], reverse=descending)
+    return rows[:limit]
+
+def test_parse_query_normalizes_the_text():
+    query = parse_query("operation=divide AND result>100 and operand1 between 1 and 10 ORDER BY result desc LIMIT 50")
+    assert query.describe() == ("operation = divide and result > 100 and operand1 between 1 and 10 "
+                                "order by result desc limit 50")
+    assert parse_query("").describe() == "(all rows)"
+    assert parse_query("result >= 1/3").predicates[0].values == (Fraction(1, 3),)
+
+@pytest.mark.parametrize("text", ["operation > add", "result = abc", "result between 1", "colour = red",
+                                  "order by operation", "limit -1", "result > 1 extra", "result ! 2"])
+def test_invalid_queries_raise(text):
+    with pytest.raises(QueryError):
+        parse_query(text)
+
+def test_filters_match_a_row_by_row_scan(facade):
+    frame = facade.query(parse_query("operation = divide and result > 1 and operand1 between 3 and 12"))
+    expected = expected_rows(facade, [lambda c, r: c["operation"][r] == "divide", lambda c, r: c["result"][r] > 1,
+                                      lambda c, r: 3 <= c["operand1"][r] <= 12])
+    assert frame.index.tolist() == expected
+    assert frame.equals(facade.dataframe.loc[expected])
+
+@pytest.mark.parametrize("symbol", ["=", "!=", "<", "<=", ">", ">="])
+def test_comparisons_are_exact_on_fixed_and_overflow_numbers(facade, symbol):
+    for bound in ("2", "1/3", "2.5"):
+        frame = facade.query(parse_query(f"result {symbol} {bound} and backend != fraction"))
+        compare = {"=": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+                   ">": operator.gt, ">=": operator.ge}[symbol]
+        number = Fraction(bound)
+        assert frame.index.tolist() == expected_rows(facade, [
+            lambda c, r: compare(Fraction(c["result"][r]), number), lambda c, r: c["backend"][r] != "fraction"])
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_top_k_matches_a_full_sort(facade, descending):
+    direction = "desc" if descending else "asc"
+    for limit in (0, 1, 7, 500):
+        frame = facade.query(parse_query(f"operation != add order by result {direction} limit {limit}"))
+        assert frame.index.tolist() == expected_rows(facade, [lambda c, r: c["operation"][r] != "add"],
+                                                     "result", descending, limit)
+
+def test_limit_without_order_keeps_row_order(facade):
+    assert facade.query(parse_query("operand2 = 2 limit 5")).index.tolist() == \
+        expected_rows(facade, [lambda c, r: c["operand2"][r] == 2], limit=5)
+    assert facade.query(parse_query("operation = missing")).empty
+
+def test_explain_shows_the_plan(facade):
+    plan = facade.explain(parse_query("result > 2 and backend = float and operation = divide order by result limit 3"))
+    lines = plan.splitlines()
+    assert lines[1].startswith("segment ") and "operation index lookup 'divide'" in lines[1]
+    assert lines[2] == "  filter backend = float: code comparison"
+    assert "int64 comparison at scale 6" in lines[3]
+    assert lines[-1].startswith("Order: top 3 by result with partial selection")
+    assert any(line.startswith("memory: operation index lookup") for line in lines)
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_nan_results_are_ordered_last(descending):
+    facade = PandasFacade()
+    results = [Decimal(2), Decimal("NaN"), Decimal("0.1"), Decimal(1) / Decimal(3), Decimal("NaN"), Decimal(5)]
+    for result in results:
+        facade.add_record({"operation": "add", "operand1": result, "operand2": Decimal(1), "result": result})
+    direction = "desc" if descending else "asc"
+    numbers = [5, 0, 3, 2] if descending else [2, 3, 0, 5]
+    assert facade.query(parse_query(f"order by result {direction}")).index.tolist() == numbers + [1, 4]
+    assert facade.query(parse_query(f"order by result {direction} limit 1")).index.tolist() == numbers[:1]
+    assert facade.query(parse_query("result > 1 order by result limit 5")).index.tolist() == [0, 5]
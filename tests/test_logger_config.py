@@ -0,0 +1,76 @@
+import logging
+import queue
+import pytest
+import logger_config
+from logger_config import BoundedQueueHandler, configure_logging, stop_queue_logging
+
+def make_record(message):
+    return logging.makeLogRecord({"msg": message, "levelno": logging.INFO, "levelname": "INFO"})
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    monkeypatch.setenv("LOG_FILE", str(path))
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield path
+    stop_queue_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def test_queued_logging_flushes_every_record(log_file):
+    configure_logging(log_level="INFO", use_queue=True)
+    for number in range(500):
+        logging.info("record %d", number)
+    stop_queue_logging()
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 500
+    assert lines[-1].endswith("INFO - record 499")
+
+def test_queued_logging_respects_level(log_file):
+    configure_logging(log_level="WARNING", use_queue=True)
+    logging.info("hidden")
+    logging.warning("shown")
+    stop_queue_logging()
+    assert "hidden" not in log_file.read_text()
+    assert "shown" in log_file.read_text()
+
+def test_arguments_are_merged_when_enqueued():
+    handler = BoundedQueueHandler(queue.Queue())
+    values = ["before"]
+    record = logging.makeLogRecord({"msg": "value %s", "args": (values,)})
+    handler.emit(record)
+    values[0] = "after"
+    assert handler.queue.get_nowait().getMessage() == "value ['before']"
+
+def test_drop_new_keeps_queued_records():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow="drop_new")
+    for message in ("a", "b", "c"):
+        handler.emit(make_record(message))
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == ["a", "b"]
+    assert handler.dropped == 1
+
+def test_drop_oldest_keeps_newest_records():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow="drop_oldest")
+    for message in ("a", "b", "c"):
+        handler.emit(make_record(message))
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == ["b", "c"]
+    assert handler.dropped == 1
+
+def test_unknown_overflow_policy_raises():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), overflow="spill")
+
+def test_overflow_count_is_logged_on_stop(log_file, monkeypatch):
+    monkeypatch.setenv("LOG_QUEUE_SIZE", "1")
+    monkeypatch.setenv("LOG_QUEUE_OVERFLOW", "drop_new")
+    configure_logging(log_level="INFO", use_queue=True)
+    handler = next(h for h in logging.getLogger().handlers if isinstance(h, BoundedQueueHandler))
+    handler.dropped = 3
+    stop_queue_logging()
+    assert "Log queue overflow dropped 3 records." in log_file.read_text()
+    assert logger_config._listener is None
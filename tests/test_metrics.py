@@ -0,0 +1,62 @@
+import pytest
+from decimal import Decimal
+from app.metrics import LatencyHistogram, Metrics
+from app.result_cache import ResultCache
+from app.plugins.add_command import AddCommand
+
+@pytest.fixture
+def metrics():
+    Metrics.reset()
+    Metrics.enable()
+    yield Metrics
+    Metrics.enable(False)
+    Metrics.reset()
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.record(3e-6)
+    histogram.record(0.5)
+    assert histogram.count == 100
+    assert histogram.percentile(0.5) == pytest.approx(4e-6)
+    assert histogram.percentile(0.99) == pytest.approx(4e-6)
+    assert histogram.percentile(1.0) == 0.5
+    assert histogram.max == 0.5
+
+def test_disabled_metrics_record_nothing():
+    Metrics.reset()
+    with Metrics.stage("parse", "add"):
+        pass
+    Metrics.observe("execute", 0.1, "add")
+    assert Metrics.summary() == []
+
+def test_stages_are_recorded_per_command(metrics):
+    with metrics.stage("parse", "add"):
+        pass
+    with metrics.stage("parse", "add"):
+        pass
+    metrics.observe("execute", 0.002, "divide")
+    rows = {(row["stage"], row["command"]): row for row in metrics.summary()}
+    assert rows[("parse", "add")]["count"] == 2
+    assert rows[("execute", "divide")]["max"] == 0.002
+
+def test_result_cache_records_execute_stage(metrics):
+    ResultCache.configure(0)
+    ResultCache.execute(AddCommand(), Decimal(1), Decimal(2))
+    ResultCache.configure()
+    assert [(row["stage"], row["command"]) for row in metrics.summary()] == [("execute", "add")]
+
+def test_render_uses_text_exposition_format(metrics):
+    metrics.observe("execute", 3e-6, "add")
+    text = metrics.render()
+    assert "# TYPE calculator_stage_seconds histogram" in text
+    assert 'calculator_stage_seconds_bucket{stage="execute",command="add",le="4e-06"} 1' in text
+    assert 'calculator_stage_seconds_bucket{stage="execute",command="add",le="+Inf"} 1' in text
+    assert 'calculator_stage_seconds_count{stage="execute",command="add"} 1' in text
+
+def test_exporter_writes_final_snapshot(metrics, tmp_path):
+    path = tmp_path / "metrics.prom"
+    metrics.start_exporter(str(path), interval=60)
+    metrics.observe("output", 0.001)
+    metrics.stop_exporter()
+    assert 'calculator_stage_seconds_count{stage="output",command=""} 1' in path.read_text()
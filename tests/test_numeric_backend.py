@@ -0,0 +1,100 @@
+import pytest
+from decimal import Decimal, InvalidOperation, getcontext, localcontext
+from fractions import Fraction
+from app.calculation import Calculation
+from app.calculations import Calculations
+from app.history_format import write_history, HistorySegment
+from app.history_journal import HistoryJournal
+from app.numeric_backend import NumericBackend, parse_operand, validate_backend
+from app.plugins.divide_command import DivideCommand
+from app.plugins.mean_command import MeanCommand
+from app.plugins.variance_command import VarianceCommand
+from app.result_cache import ResultCache
+
+@pytest.fixture
+def session_backend():
+    precision = getcontext().prec
+    yield NumericBackend
+    NumericBackend.reset()
+    getcontext().prec = precision
+    Calculations.clear_history()
+
+def mixed_columns():
+    return {
+        "operation": ["divide", "divide", "mean"],
+        "operand1": [Decimal(1), 1.0, Fraction(1)],
+        "operand2": [Decimal(3), 3.0, Fraction(3)],
+        "result": [Decimal(1) / Decimal(3), 1.0 / 3.0, Fraction(2)],
+        "backend": ["decimal", "float", "fraction"],
+    }
+
+def test_parse_operand_per_backend():
+    assert parse_operand("0.1", "decimal") == Decimal("0.1")
+    assert parse_operand("0.1", "float") == 0.1
+    assert parse_operand("1/3", "fraction") == Fraction(1, 3)
+    assert parse_operand("0.25", "fraction") == Fraction(1, 4)
+    for backend in ("decimal", "float", "fraction"):
+        with pytest.raises(InvalidOperation):
+            parse_operand("abc", backend)
+
+def test_unknown_backend_is_rejected(session_backend):
+    with pytest.raises(ValueError):
+        validate_backend("complex")
+    with pytest.raises(ValueError):
+        session_backend.configure("complex")
+
+def test_configure_sets_backend_and_precision(session_backend, monkeypatch):
+    monkeypatch.setenv("NUMERIC_BACKEND", "float")
+    assert session_backend.current() == "float"
+    session_backend.configure("Fraction", precision=50)
+    assert session_backend.current() == "fraction"
+    assert str(Decimal(1) / Decimal(3)) == "0." + "3" * 50
+
+def test_builtin_plugins_run_on_every_backend():
+    assert MeanCommand().execute(2.0, 7.0) == 4.5
+    assert MeanCommand().execute(Fraction(1), Fraction(2)) == Fraction(3, 2)
+    assert VarianceCommand().execute(Fraction(1), Fraction(2)) == Fraction(1, 4)
+    assert DivideCommand().execute(Fraction(1), Fraction(3)) == Fraction(1, 3)
+    with localcontext() as context:
+        context.prec = 5
+        assert DivideCommand().execute(Decimal(1), Decimal(3)) == Decimal("0.33333")
+
+def test_cache_keeps_backends_apart():
+    ResultCache.configure(max_size=8)
+    try:
+        assert isinstance(ResultCache.execute(DivideCommand(), Decimal(1), Decimal(3)), Decimal)
+        assert isinstance(ResultCache.execute(DivideCommand(), 1.0, 3.0), float)
+    finally:
+        ResultCache.configure()
+
+def test_history_records_backend(session_backend):
+    calculation = Calculation(Fraction(1), Fraction(3), DivideCommand(), "fraction")
+    calculation.operate()
+    Calculations.add_calculation(calculation)
+    history = Calculations.get_all_calculations()
+    assert history["backend"].tolist() == ["fraction"]
+    assert history["result"].tolist() == [Fraction(1, 3)]
+
+def test_csv_round_trip_restores_types(session_backend, tmp_path):
+    path = str(tmp_path / "history.csv")
+    Calculations._history_facade.load_columns(mixed_columns())
+    Calculations.save_history(path)
+    Calculations.load_history(path)
+    assert Calculations.get_all_calculations().to_dict("list") == mixed_columns()
+
+def test_binary_round_trip_restores_types(tmp_path):
+    path = str(tmp_path / "history.calchist")
+    write_history(path, mixed_columns())
+    assert HistorySegment(path).to_columns() == mixed_columns()
+
+def test_journal_replays_backends_and_legacy_records(tmp_path):
+    path = str(tmp_path / "history.journal")
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write("A\tadd\t1\t2\t3\n")
+    journal = HistoryJournal(path)
+    journal.append_add({"operation": "divide", "operand1": Fraction(1), "operand2": Fraction(3),
+                        "result": Fraction(1, 3), "backend": "fraction"})
+    journal.close()
+    columns = HistoryJournal.replay(path)
+    assert columns["backend"] == ["decimal", "fraction"]
+    assert columns["result"] == [Decimal(3), Fraction(1, 3)]
@@ -0,0 +1,142 @@
+from decimal import Decimal
+from app.pandas_facade import PandasFacade
+
+def make_record(operation="add", operand1=1, operand2=2, result=3):
+    return {"operation": operation, "operand1": Decimal(operand1),
+            "operand2": Decimal(operand2), "result": Decimal(result)}
+
+def test_add_record_defers_materialization():
+    facade = PandasFacade()
+    facade.add_record(make_record())
+    assert facade._frame is None
+    assert len(facade) == 1
+
+    frame = facade.dataframe
+    assert list(frame.columns) == ["operation", "operand1", "operand2", "result", "backend"]
+    assert frame.iloc[0]["result"] == Decimal(3)
+    assert facade.dataframe is frame
+
+def test_add_record_invalidates_cached_frame():
+    facade = PandasFacade()
+    facade.add_record(make_record())
+    first = facade.dataframe
+    facade.add_record(make_record("subtract", 5, 3, 2))
+    second = facade.dataframe
+    assert second is not first
+    assert second["operation"].tolist() == ["add", "subtract"]
+
+def test_empty_facade_has_columns():
+    frame = PandasFacade().dataframe
+    assert frame.empty
+    assert list(frame.columns) == ["operation", "operand1", "operand2", "result", "backend"]
+
+def test_delete_record_keeps_columns_aligned():
+    facade = PandasFacade()
+    for value in range(3):
+        facade.add_record(make_record(operand1=value, result=value + 2))
+    facade.delete_record(1)
+    assert facade.dataframe["operand1"].tolist() == [Decimal(0), Decimal(2)]
+    assert facade.dataframe.index.tolist() == [0, 1]
+
+def mask_scan(facade, operation):
+    frame = facade.dataframe
+    return frame[frame["operation"] == operation]
+
+def test_filter_uses_index_after_add_delete_and_clear():
+    facade = PandasFacade()
+    for value, operation in enumerate(["add", "multiply", "add", "divide", "add"]):
+        facade.add_record(make_record(operation, value))
+    assert facade.filter_by_operation("add").index.tolist() == [0, 2, 4]
+    facade.delete_record(1)
+    facade.delete_record(0)
+    filtered = facade.filter_by_operation("add")
+    assert filtered.index.tolist() == [0, 2]
+    assert filtered["operand1"].tolist() == [Decimal(2), Decimal(4)]
+    assert facade.filter_by_operation("multiply").empty
+    facade.clear()
+    facade.add_record(make_record("divide"))
+    assert facade.filter_by_operation("divide").index.tolist() == [0]
+
+def test_indexed_filter_matches_mask_scan():
+    facade = PandasFacade()
+    for value in range(30):
+        facade.add_record(make_record(["add", "subtract", "multiply"][value % 3], value))
+    for index in (25, 10, 0, 3):
+        facade.delete_record(index)
+    for operation in ("add", "subtract", "multiply", "power"):
+        assert facade.filter_by_operation(operation).equals(mask_scan(facade, operation))
+
+def test_removals_stay_bounded_and_track_prefix():
+    facade = PandasFacade()
+    for value in range(10):
+        facade.add_record(make_record(operand1=value))
+    for _ in range(5):
+        facade.delete_record(len(facade) - 1)
+    assert len(facade._removals) == 1
+    assert facade.removal_count == 5
+    assert facade.is_prefix_unchanged(5, 0)
+    assert not facade.is_prefix_unchanged(6, 0)
+    facade.delete_record(1)
+    assert facade.is_prefix_unchanged(1, 5)
+    assert not facade.is_prefix_unchanged(2, 5)
+    facade.clear()
+    assert facade._removals == [(7, 0)]
+    assert facade.is_prefix_unchanged(0, 6)
+    assert not facade.is_prefix_unchanged(1, 6)
+
+def test_filter_after_load_rebuilds_index():
+    facade = PandasFacade()
+    facade.load_columns({"operation": ["add", "subtract"], "operand1": [Decimal(1), Decimal(2)],
+                         "operand2": [Decimal(1), Decimal(1)], "result": [Decimal(2), Decimal(1)]})
+    facade.add_record(make_record("subtract"))
+    assert facade.filter_by_operation("subtract").index.tolist() == [1, 2]
+
+def test_retention_spills_oldest_rows(tmp_path):
+    facade = PandasFacade()
+    facade.configure_retention(max_rows=8, spill_directory=str(tmp_path))
+    for value in range(50):
+        facade.add_record(make_record("add" if value % 3 else "divide", value, 1, value + 1))
+    stats = facade.storage_stats()
+    assert stats["memory_rows"] <= 8
+    assert stats["memory_rows"] + stats["segment_rows"] == len(facade) == 50
+    assert facade.dataframe["operand1"].tolist() == [Decimal(value) for value in range(50)]
+    assert facade.filter_by_operation("divide").index.tolist() == list(range(0, 50, 3))
+    facade.clear()
+    assert not list(tmp_path.rglob("*.calchist"))
+
+def test_spilled_segments_are_merged(tmp_path):
+    facade = PandasFacade()
+    facade.configure_retention(max_rows=4, spill_directory=str(tmp_path))
+    for value in range(1000):
+        facade.add_record(make_record(operand1=value))
+    assert facade.storage_stats()["spilled_segments"] <= 10
+    assert len(list(tmp_path.rglob("*.calchist"))) == facade.storage_stats()["spilled_segments"]
+
+def test_spilled_rows_match_in_memory_rows(tmp_path):
+    values = ["2.50", "2.5", "10", "1E+2", "-0", "0.000", "7.0", "-3.25"]
+    records = [make_record("add", value, "1.10", value) for value in values]
+    memory, spilled = PandasFacade(), PandasFacade()
+    spilled.configure_retention(max_rows=2, spill_directory=str(tmp_path))
+    for record in records:
+        memory.add_record(record)
+        spilled.add_record(record)
+    assert spilled.storage_stats()["segment_rows"] > 0
+    for name in ("operand1", "operand2", "result"):
+        assert list(map(str, spilled.dataframe[name])) == list(map(str, memory.dataframe[name]))
+    assert list(map(str, spilled.dataframe["result"])) == values
+
+def test_spilled_history_saves_and_deletes(tmp_path):
+    facade = PandasFacade()
+    facade.configure_retention(max_bytes=500, spill_directory=str(tmp_path))
+    for value in range(40):
+        facade.add_record(make_record("multiply", value, 2, value * 2))
+    assert facade.storage_stats()["segment_rows"] > 0
+    expected = facade.dataframe
+    for name in ("history.csv", "history.calchist"):
+        copy = PandasFacade()
+        facade.save_to_file(str(tmp_path / name))
+        copy.load_from_file(str(tmp_path / name))
+        assert copy.dataframe.equals(expected)
+    facade.delete_record(0)
+    assert facade.dataframe["operand1"].tolist() == [Decimal(value) for value in range(1, 40)]
+    assert facade.storage_stats()["memory_rows"] < 39
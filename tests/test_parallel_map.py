@@ -0,0 +1,55 @@
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from app.parallel_map import ParallelMap, MAX_CHUNK_ITEMS
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.worker_pool import WorkerPool
+
+@pytest.fixture(autouse=True)
+def fresh_tuning():
+    ParallelMap.reset()
+    yield
+    ParallelMap.reset()
+
+@pytest.fixture
+def pool():
+    WorkerPool.configure(max_workers=2)
+    yield WorkerPool
+    WorkerPool.configure()
+
+def test_map_preserves_order_and_matches_scalar_results(pool):
+    command = DivideCommand()
+    operands1 = [Decimal(value) for value in range(1, 301)]
+    operands2 = [Decimal(value % 7 + 1) for value in range(300)]
+    results = ParallelMap.map(command, operands1, operands2)
+    assert results == [command.execute(num1, num2) for num1, num2 in zip(operands1, operands2)]
+    assert ParallelMap.stats()["divide"]["chunks"] >= 1
+
+def test_failed_pairs_hold_their_error(pool):
+    results = ParallelMap.map(DivideCommand(), [Fraction(1), Fraction(2), Fraction(3)],
+                              [Fraction(3), Fraction(0), Fraction(4)])
+    assert results[0] == Fraction(1, 3) and results[2] == Fraction(3, 4)
+    assert isinstance(results[1], ZeroDivisionError)
+
+def test_single_worker_runs_in_process():
+    WorkerPool.configure(max_workers=1)
+    try:
+        assert ParallelMap.map(AddCommand(), [1.0, 2.0], [3.0, 4.0]) == [4.0, 6.0]
+        assert WorkerPool.stats()["running"] is False
+        assert ParallelMap.stats() == {}
+    finally:
+        WorkerPool.configure()
+
+def test_mismatched_operands_are_rejected():
+    with pytest.raises(ValueError):
+        ParallelMap.map(AddCommand(), [1.0], [1.0, 2.0])
+
+def test_chunk_size_balances_latency_and_workers():
+    ParallelMap._tuning["add"] = {"item_seconds": 1e-6, "latency": 1e-4, "chunk": 0, "chunks": 0}
+    # 0.1ms latency at 1us per item: 2,000 items keep the overhead at 5%.
+    assert ParallelMap.chunk_size("add", 1_000_000, 4) == 2000
+    # Few remaining items are split so that every worker still gets two chunks.
+    assert ParallelMap.chunk_size("add", 800, 4) == 100
+    ParallelMap._tuning["add"]["item_seconds"] = 1e-12
+    assert ParallelMap.chunk_size("add", 10_000_000, 2) == MAX_CHUNK_ITEMS
@@ -0,0 +1,66 @@
+import io
+import pytest
+from app.calculations import Calculations
+from app.pipe_mode import BufferedOutput, calculation_handler, read_blocks, run_pipe
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+@pytest.fixture(autouse=True)
+def empty_history():
+    Calculations.clear_history()
+    yield
+    Calculations.clear_history()
+
+def run(text, flush_lines=0, block_size=4):
+    output = BufferedOutput(io.StringIO())
+    fallback_lines = []
+    fallback = lambda words: fallback_lines.append(words)
+    commands = {"add": AddCommand(), "divide": DivideCommand()}
+    table = {name: calculation_handler(commands, name, output.write, fallback) for name in commands}
+    table["say"] = lambda words: print(" ".join(words[1:]))
+    table["exit"] = lambda words: True
+    summary = run_pipe(table, fallback, io.BytesIO(text.encode("utf-8")), output,
+                       block_size=block_size, flush_lines=flush_lines)
+    return output.stream.getvalue(), fallback_lines, summary
+
+def test_read_blocks_joins_lines_split_across_blocks():
+    lines = [line for block in read_blocks(io.BytesIO("add 1 2\nsay é\nlast".encode("utf-8")), 3)
+             for line in block]
+    assert lines == ["add 1 2", "say é", "last"]
+
+def test_invalid_utf8_line_does_not_stop_the_block():
+    output = BufferedOutput(io.StringIO())
+    fallback_lines = []
+    table = {"add": calculation_handler({"add": AddCommand()}, "add", output.write, fallback_lines.append)}
+    summary = run_pipe(table, fallback_lines.append, io.BytesIO(b"add 1 2\n\xff\xfe\nadd 3 4"), output)
+    assert output.stream.getvalue() == "1 add 2 = 3\n3 add 4 = 7\n"
+    assert fallback_lines == [["\ufffd\ufffd"]]
+    assert summary["lines"] == 3
+
+def test_calculations_print_in_input_order_and_reach_history():
+    output, fallback_lines, summary = run("add 1 2\nsay hello\n\ndivide 1 4\n")
+    assert output == "1 add 2 = 3\nhello\n1 divide 4 = 0.25\n"
+    assert fallback_lines == []
+    assert summary["lines"] == 4
+    assert Calculations.get_all_calculations()["result"].tolist() == [3, 0.25]
+
+def test_errors_and_other_forms_do_not_stop_the_input():
+    output, fallback_lines, _ = run("divide 1 0\nadd x 2\nadd 1 2 float\nfoo 1\nadd 2 2\n")
+    assert output.splitlines() == ["Unexpected error occurred: Division by zero is not allowed.",
+                                   "Error: One or both inputs are not valid numbers.", "2 add 2 = 4"]
+    assert fallback_lines == [["add", "1", "2", "float"], ["foo", "1"]]
+    assert len(Calculations.get_all_calculations()) == 1
+
+def test_exit_ends_the_input():
+    output, _, summary = run("add 1 1\nexit\nadd 2 2\n")
+    assert output == "1 add 1 = 2\n"
+    assert summary["lines"] == 2
+
+def test_output_is_flushed_every_flush_lines():
+    stream = io.StringIO()
+    output = BufferedOutput(stream)
+    writes = []
+    stream.write = writes.append
+    table = {"say": lambda words: print(words[1])}
+    run_pipe(table, None, io.BytesIO(b"say a\nsay b\nsay c\n"), output, flush_lines=2)
+    assert writes == ["a\nb\n", "c\n"]
@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+from decimal import Decimal
+from app.plugin_registry import PluginRegistry, load_registry
+from app.plugins.add_command import AddCommand
+
+PLUGIN_PATH = os.path.join("app", "plugins")
+
+def test_load_registry_builds_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    registry = load_registry(PLUGIN_PATH, manifest_path=str(manifest_path))
+
+    assert "add" in registry
+    assert "divide" in registry
+    manifest = json.loads(manifest_path.read_text())
+    assert manifest["plugins"]["add"] == ["add_command", "AddCommand"]
+    assert "add_command.py" in manifest["files"]
+
+def test_registry_reuses_current_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    load_registry(PLUGIN_PATH, manifest_path=str(manifest_path))
+    manifest = json.loads(manifest_path.read_text())
+    manifest["plugins"] = {"add": ["add_command", "AddCommand"]}
+    manifest_path.write_text(json.dumps(manifest))
+
+    registry = load_registry(PLUGIN_PATH, manifest_path=str(manifest_path))
+    assert list(registry) == ["add"]
+
+def test_registry_rebuilds_stale_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    load_registry(PLUGIN_PATH, manifest_path=str(manifest_path))
+    manifest = json.loads(manifest_path.read_text())
+    manifest["files"]["add_command.py"] -= 1
+    manifest["plugins"] = {}
+    manifest_path.write_text(json.dumps(manifest))
+
+    registry = load_registry(PLUGIN_PATH, manifest_path=str(manifest_path))
+    assert "add" in registry
+
+def test_registry_instantiates_on_lookup():
+    registry = PluginRegistry({"add": ("add_command", "AddCommand")})
+    assert registry._instances == {}
+    command = registry["add"]
+    assert isinstance(command, AddCommand)
+    assert registry.get("add") is command
+    assert registry.get("missing") is None
+    assert command.execute(Decimal(1), Decimal(2)) == Decimal(3)
+
+def test_main_import_does_not_load_pandas():
+    code = "import sys, main; print('pandas.core.frame' in sys.modules, 'numpy.core' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == "False False"
@@ -1,5 +1,6 @@
 import pytest
 import multiprocessing
+import numpy as np
 from decimal import Decimal, DivisionByZero
 from multiprocessing import Queue
 
@@ -9,6 +10,9 @@ from app.plugins.multiply_command import MultiplyCommand
 from app.plugins.divide_command import DivideCommand
 from app.plugins.mean_command import MeanCommand
 from app.plugins.standard_deviation_command import Standard_deviationCommand
+from app.plugins.variance_command import VarianceCommand
+from app.plugins.min_command import MinCommand
+from app.plugins.max_command import MaxCommand
 
 # ---------- AddCommand Tests ----------
 
@@ -226,3 +230,67 @@ def test_standard_deviation_command_multiprocessing_with_opposite_numbers():
     result_queue = Queue()
     command.execute_multiprocessing(Decimal(-100), Decimal(100), result_queue)
     assert result_queue.get() == Decimal(100)
+
+# ---------- Batch Execution Tests ----------
+
+@pytest.mark.parametrize("command, expected", [
+    (AddCommand(), [Decimal(5), Decimal("0.3")]),
+    (SubtractCommand(), [Decimal(-1), Decimal("-0.1")]),
+    (MultiplyCommand(), [Decimal(6), Decimal("0.02")]),
+    (MeanCommand(), [Decimal("2.5"), Decimal("0.15")]),
+    (Standard_deviationCommand(), [Decimal("0.5"), Decimal("0.05")]),
+    (VarianceCommand(), [Decimal("0.25"), Decimal("0.0025")]),
+    (MinCommand(), [Decimal(2), Decimal("0.1")]),
+    (MaxCommand(), [Decimal(3), Decimal("0.2")]),
+])
+def test_execute_batch_decimal_backend(command, expected):
+    operands1, operands2 = [Decimal(2), Decimal("0.1")], [Decimal(3), Decimal("0.2")]
+    results = command.execute_batch(operands1, operands2)
+    assert results.tolist() == expected
+    assert [command.execute(a, b) for a, b in zip(operands1, operands2)] == expected
+
+@pytest.mark.parametrize("command", [
+    AddCommand(), SubtractCommand(), MultiplyCommand(), MeanCommand(), Standard_deviationCommand(),
+    VarianceCommand(), MinCommand(), MaxCommand()
+])
+def test_execute_batch_float_backend(command):
+    results = command.execute_batch([2, 10], [3, 20], backend="float")
+    assert results.dtype == np.float64
+    assert results.tolist() == [float(command.execute(Decimal(2), Decimal(3))),
+                                float(command.execute(Decimal(10), Decimal(20)))]
+
+@pytest.mark.parametrize("backend", ["decimal", "float"])
+def test_divide_execute_batch_masks_zero_divisors(backend):
+    results = DivideCommand().execute_batch([6, 1, 9], [3, 0, 2], backend=backend)
+    assert results.mask.tolist() == [False, True, False]
+    assert results.compressed().tolist() == [2, 4.5]
+
+# ---------- N-ary Statistic Tests ----------
+
+VALUES = [Decimal(v) for v in ("2", "4", "4", "4", "5", "5", "7", "9")]
+
+@pytest.mark.parametrize("command, expected", [
+    (MeanCommand(), Decimal(5)),
+    (VarianceCommand(), Decimal(4)),
+    (Standard_deviationCommand(), Decimal(2)),
+    (MinCommand(), Decimal(2)),
+    (MaxCommand(), Decimal(9)),
+])
+def test_statistic_commands_accept_many_operands(command, expected):
+    assert command.nary
+    assert command.execute_many(VALUES) == expected
+
+def test_standard_deviation_keeps_decimal_precision():
+    result = Standard_deviationCommand().execute_many([Decimal(0), Decimal(1), Decimal(2)])
+    assert result == Decimal("0.8164965809277260327324280249")
+    assert Standard_deviationCommand().execute(Decimal("0.1"), Decimal("0.2")) == Decimal("0.05")
+
+def test_statistic_commands_need_values():
+    with pytest.raises(ValueError):
+        MeanCommand().execute_many([])
+
+@pytest.mark.parametrize("command", [MinCommand(), MaxCommand(), VarianceCommand()])
+def test_statistic_commands_multiprocessing(command):
+    result_queue = Queue()
+    command.execute_multiprocessing(Decimal(1), Decimal(3), result_queue)
+    assert result_queue.get() == command.execute(Decimal(1), Decimal(3))
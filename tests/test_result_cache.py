@@ -0,0 +1,89 @@
+import pytest
+from decimal import Decimal, Inexact, localcontext
+from app.command import Command
+from app.result_cache import ResultCache
+from app.plugins.divide_command import DivideCommand
+
+class CountingDivideCommand(Command):
+    operation_name = "divide"
+    pure = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, num1: Decimal, num2: Decimal) -> Decimal:
+        self.calls += 1
+        return DivideCommand().execute(num1, num2)
+
+    def execute_multiprocessing(self, num1: Decimal, num2: Decimal, result_queue):
+        result_queue.put(self.execute(num1, num2))
+
+@pytest.fixture
+def cache():
+    ResultCache.configure(max_size=2)
+    yield ResultCache
+    ResultCache.configure()
+
+def test_repeated_inputs_are_served_from_cache(cache):
+    command = CountingDivideCommand()
+    assert cache.execute(command, Decimal(1), Decimal(4)) == Decimal("0.25")
+    assert cache.execute(command, Decimal(1), Decimal(4)) == Decimal("0.25")
+    assert command.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+def test_operand_representation_is_part_of_key(cache):
+    command = CountingDivideCommand()
+    cache.execute(command, Decimal("1"), Decimal("4"))
+    cache.execute(command, Decimal("1.0"), Decimal("4"))
+    assert command.calls == 2
+
+def test_both_operand_types_are_part_of_key(cache):
+    command = CountingDivideCommand()
+    cache.execute(command, Decimal(1), Decimal(4))
+    cache.execute(command, Decimal(1), 4)
+    assert command.calls == 2
+
+def test_decimal_context_is_part_of_key(cache):
+    command = CountingDivideCommand()
+    full = cache.execute(command, Decimal(1), Decimal(3))
+    with localcontext() as context:
+        context.prec = 5
+        short = cache.execute(command, Decimal(1), Decimal(3))
+    assert short == Decimal("0.33333")
+    assert full != short
+
+def test_decimal_traps_are_part_of_key(cache):
+    command = CountingDivideCommand()
+    cache.execute(command, Decimal(1), Decimal(3))
+    with localcontext() as context:
+        context.traps[Inexact] = True
+        with pytest.raises(Inexact):
+            cache.execute(command, Decimal(1), Decimal(3))
+
+def test_least_recently_used_entry_is_evicted(cache):
+    command = CountingDivideCommand()
+    cache.execute(command, Decimal(1), Decimal(1))
+    cache.execute(command, Decimal(2), Decimal(1))
+    cache.execute(command, Decimal(1), Decimal(1))
+    cache.execute(command, Decimal(3), Decimal(1))
+    assert cache.stats()["evictions"] == 1
+    cache.execute(command, Decimal(1), Decimal(1))
+    assert command.calls == 3
+
+def test_errors_are_not_cached(cache):
+    command = CountingDivideCommand()
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            cache.execute(command, Decimal(1), Decimal(0))
+    assert command.calls == 2
+    assert cache.stats()["size"] == 0
+
+def test_impure_commands_bypass_cache(cache):
+    command = CountingDivideCommand()
+    command.pure = False
+    cache.execute(command, Decimal(1), Decimal(2))
+    cache.execute(command, Decimal(1), Decimal(2))
+    assert command.calls == 2
+    assert cache.stats()["misses"] == 0
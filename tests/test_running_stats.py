@@ -0,0 +1,71 @@
+import io
+import pytest
+from decimal import Decimal, localcontext
+from app.running_stats import RunningStats, parse_numbers, stats_from_path, stats_from_stream
+from app.worker_pool import WorkerPool
+
+def test_welford_matches_textbook_values():
+    stats = RunningStats.of(["2", "4", "4", "4", "5", "5", "7", "9"])
+    assert stats.count == 8
+    assert stats.mean() == Decimal(5)
+    assert stats.variance() == Decimal(4)
+    assert stats.standard_deviation() == Decimal(2)
+    assert (stats.minimum(), stats.maximum()) == (Decimal(2), Decimal(9))
+
+def test_large_offset_does_not_cancel():
+    offset = Decimal("1E+20")
+    stats = RunningStats.of([offset + 4, offset + 7, offset + 13, offset + 16])
+    assert stats.variance() == Decimal("22.5")
+
+def test_merge_equals_single_pass():
+    values = [Decimal(value) / 7 for value in range(1, 200)]
+    merged = RunningStats.of(values[:50]).merge(RunningStats.of(values[50:120])).merge(RunningStats.of(values[120:]))
+    single = RunningStats.of(values)
+    assert merged.count == single.count
+    assert merged.mean() == single.mean()
+    assert merged.variance() == single.variance()
+    assert merged.minimum() == single.minimum()
+
+def test_merge_with_empty_partials():
+    stats = RunningStats().merge(RunningStats.of([1, 3])).merge(RunningStats())
+    assert stats.mean() == Decimal(2)
+
+def test_state_exposes_accumulators():
+    count, mean, m2, low, high = RunningStats.of([1, 2, 3]).state()
+    assert (count, mean, m2, low, high) == (3, Decimal(2), Decimal(2), Decimal(1), Decimal(3))
+
+def test_results_follow_context_precision():
+    with localcontext() as context:
+        context.prec = 50
+        assert str(RunningStats.of([1, 2, 2]).mean()) == "1." + "6" * 48 + "7"
+
+def test_push_matches_extend():
+    pushed = RunningStats()
+    for value in ("1.5", "2.25", "-3"):
+        pushed.push(value)
+    assert pushed.variance() == RunningStats.of(["1.5", "2.25", "-3"]).variance()
+
+def test_parse_numbers_accepts_commas_and_whitespace():
+    assert list(parse_numbers("1, 2\n3\t4.5")) == [Decimal(1), Decimal(2), Decimal(3), Decimal("4.5")]
+
+def test_stream_in_small_chunks():
+    data = "\n".join(str(value) for value in range(1, 1001)).encode()
+    stats = stats_from_stream(io.BytesIO(data), chunk_bytes=64)
+    assert stats.count == 1000
+    assert stats.mean() == Decimal("500.5")
+    assert stats.maximum() == Decimal(1000)
+
+def test_file_split_across_worker_pool(tmp_path):
+    path = tmp_path / "numbers.txt"
+    path.write_text("\n".join(str(value) for value in range(1, 2001)) + "\n")
+    WorkerPool.configure(max_workers=2)
+    try:
+        stats = stats_from_path(str(path), parallel=True, chunk_bytes=256)
+    finally:
+        WorkerPool.configure()
+    assert stats.count == 2000
+    assert stats.variance() == RunningStats.of(range(1, 2001)).variance()
+
+def test_empty_statistics_raise():
+    with pytest.raises(ValueError):
+        RunningStats().variance()
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from decimal import Decimal
+from app.calculations import Calculations
+from app.server import CalculationServer
+from app.worker_pool import WorkerPool
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+class HeavyAddCommand(AddCommand):
+    operation_name = "heavy_add"
+    cpu_heavy = True
+
+COMMANDS = {"add": AddCommand(), "divide": DivideCommand(), "heavy_add": HeavyAddCommand()}
+
+@pytest.fixture
+def server():
+    Calculations.clear_history()
+    yield CalculationServer(COMMANDS, pipeline_depth=4)
+    Calculations.clear_history()
+
+async def exchange(server, lines):
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("".join(f"{line}\n" for line in lines).encode("utf-8"))
+    await writer.drain()
+    responses = [(await reader.readline()).decode("utf-8").rstrip("\n") for _ in lines]
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return responses
+
+def test_pipelined_responses_keep_request_order(server):
+    lines = [f"add {value} 1" for value in range(20)]
+    responses = asyncio.run(exchange(server, lines))
+    assert responses == [f"OK {value + 1}" for value in range(20)]
+
+def test_errors_are_reported_per_request(server):
+    responses = asyncio.run(exchange(server, ["divide 1 0", "power 2 3", "add x 1", "add 1", "add 2 2"]))
+    assert responses[0].startswith("ERR")
+    assert responses[1] == "ERR Unknown operation 'power'"
+    assert responses[2] == "ERR One or both inputs are not valid numbers."
+    assert responses[3].startswith("ERR Usage")
+    assert responses[4] == "OK 4"
+    assert server.stats["errors"] == 4
+
+def test_results_are_recorded_in_history(server):
+    asyncio.run(exchange(server, ["add 2 3", "divide 1 0", "add 1.5 1"]))
+    history = Calculations.get_all_calculations()
+    assert history["result"].tolist() == [Decimal(5), Decimal("2.5")]
+
+def test_cpu_heavy_commands_run_on_worker_pool(server):
+    WorkerPool.configure(max_workers=1)
+    WorkerPool.reset_stats()
+    try:
+        responses = asyncio.run(exchange(server, ["heavy_add 2 3", "add 1 1"]))
+        assert responses == ["OK 5", "OK 2"]
+        assert WorkerPool.stats()["tasks"] == 1
+    finally:
+        WorkerPool.configure()
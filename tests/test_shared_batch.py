@@ -0,0 +1,44 @@
+import os
+import numpy as np
+import pytest
+import app.shared_batch
+from app.batch import process_chunk
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+from app.shared_batch import execute_batch_shared
+from app.worker_pool import WorkerPool
+
+@pytest.fixture
+def pool():
+    WorkerPool.configure(max_workers=2)
+    yield WorkerPool
+    WorkerPool.configure()
+
+def shared_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+def test_shared_batch_matches_in_process(pool):
+    operands1 = np.arange(1000, dtype=np.float64)
+    operands2 = np.arange(1000, dtype=np.float64) % 7
+    before = shared_blocks()
+    shared = execute_batch_shared(DivideCommand(), operands1, operands2, slices=3, min_pairs=0)
+    expected = DivideCommand().execute_batch(operands1, operands2, "float")
+    assert np.array_equal(np.ma.getmaskarray(shared), np.ma.getmaskarray(expected))
+    assert np.array_equal(shared.filled(0), expected.filled(0))
+    assert shared_blocks() == before
+
+def test_small_batches_stay_in_process(pool):
+    result = execute_batch_shared(AddCommand(), [1.0, 2.0], [3.0, 4.0])
+    assert result.tolist() == [4.0, 6.0]
+    assert pool.stats()["running"] is False
+
+def test_mismatched_operands_are_rejected():
+    with pytest.raises(ValueError):
+        execute_batch_shared(AddCommand(), [1.0], [1.0, 2.0], min_pairs=0)
+
+def test_parallel_float_chunk_matches_serial(pool, monkeypatch):
+    monkeypatch.setattr(app.shared_batch, "MIN_SHARED_PAIRS", 0)
+    commands = {"add": AddCommand(), "divide": DivideCommand()}
+    rows = [{"operand1": str(value), "operand2": str(value % 3), "operation": "divide" if value % 2 else "add"}
+            for value in range(50)]
+    assert process_chunk(rows, commands, "float", parallel=True) == process_chunk(rows, commands, "float")
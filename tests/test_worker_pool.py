@@ -0,0 +1,47 @@
+import pytest
+from decimal import Decimal, DivisionByZero
+from app.worker_pool import WorkerPool
+from app.plugins.add_command import AddCommand
+from app.plugins.divide_command import DivideCommand
+
+@pytest.fixture
+def pool():
+    WorkerPool.configure(max_workers=1)
+    WorkerPool.reset_stats()
+    yield WorkerPool
+    WorkerPool.configure()
+
+def test_pool_is_created_lazily(pool):
+    assert pool.stats()["running"] is False
+    assert pool.run_command(AddCommand(), Decimal(2), Decimal(3)) == Decimal(5)
+    assert pool.stats()["running"] is True
+
+def test_pool_is_reused_across_tasks(pool):
+    pool.run_command(AddCommand(), Decimal(1), Decimal(1))
+    executor = pool.executor()
+    pool.run_command(AddCommand(), Decimal(1), Decimal(2))
+    assert pool.executor() is executor
+
+def test_pool_records_latencies(pool):
+    pool.run_command(AddCommand(), Decimal(1), Decimal(1))
+    pool.run_command(AddCommand(), Decimal(2), Decimal(2))
+    stats = pool.stats()
+    assert stats["tasks"] == 2
+    assert stats["workers"] == 1
+    assert stats["queueing_max"] >= stats["queueing_mean"] >= 0
+    assert stats["execution_max"] >= stats["execution_mean"] >= 0
+
+def test_pool_returns_plugin_queue_value(pool):
+    result = pool.run_command(DivideCommand(), Decimal(6), Decimal(0))
+    assert isinstance(result, DivisionByZero)
+
+def test_shutdown_stops_pool(pool):
+    pool.run_command(AddCommand(), Decimal(1), Decimal(1))
+    pool.shutdown()
+    assert pool.stats()["running"] is False
+    pool.shutdown()
+
+def test_worker_count_from_environment(monkeypatch):
+    WorkerPool.configure()
+    monkeypatch.setenv("WORKER_POOL_SIZE", "3")
+    assert WorkerPool.worker_count() == 3